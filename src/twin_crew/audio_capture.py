@@ -0,0 +1,179 @@
+"""
+Session-long microphone capture with a pre-roll ring buffer.
+
+Opening an input stream per turn adds device-open latency to every turn and
+clips the first syllables spoken right after the trigger. `AudioCaptureService`
+instead keeps one input stream open for the whole session, writing into a
+circular buffer; a turn starts with the last `pre_roll_seconds` of audio from
+before the trigger and then collects everything until the turn ends.
+
+The audio backend is injectable: anything with a sounddevice-compatible
+`InputStream(samplerate=..., channels=..., dtype=..., callback=...)` works,
+such as `twin_crew_testing.fakes.FakeSoundDevice`, which replays WAV files.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from types import TracebackType
+from typing import Any, Protocol
+
+import numpy as np
+
+from twin_crew.resilience import metrics
+
+DEFAULT_PRE_ROLL_SECONDS = 0.5
+
+
+class InputStream(Protocol):
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class AudioBackend(Protocol):
+    def InputStream(  # noqa: N802
+        self,
+        *,
+        samplerate: float,
+        channels: int,
+        dtype: str,
+        callback: Callable[[np.ndarray, int, Any, Any], None],
+    ) -> InputStream: ...
+
+
+class AudioRingBuffer:
+    """Fixed-size circular buffer of float32 frames, shape (frames, channels)."""
+
+    def __init__(self, capacity_frames: int, channels: int = 1) -> None:
+        self.capacity_frames = max(1, capacity_frames)
+        self._data = np.zeros((self.capacity_frames, channels), dtype=np.float32)
+        self.frames_written = 0
+
+    def write(self, block: np.ndarray) -> None:
+        block = block[-self.capacity_frames :]
+        start = self.frames_written % self.capacity_frames
+        first = min(len(block), self.capacity_frames - start)
+        self._data[start : start + first] = block[:first]
+        self._data[: len(block) - first] = block[first:]
+        self.frames_written += len(block)
+
+    def clear(self) -> None:
+        """Forget everything written so far; `latest` returns nothing until new audio."""
+        self.frames_written = 0
+
+    def latest(self, frame_count: int) -> np.ndarray:
+        """Copy of the most recent `frame_count` frames (fewer if not yet written)."""
+        frame_count = min(frame_count, self.capacity_frames, self.frames_written)
+        end = self.frames_written % self.capacity_frames
+        indices = np.arange(end - frame_count, end) % self.capacity_frames
+        return self._data[indices].copy()
+
+
+class AudioCaptureService:
+    """
+    One warm input stream per session. Call `begin_turn` when the user triggers
+    recording and `end_turn` to get the turn's audio, pre-roll included.
+    """
+
+    def __init__(
+        self,
+        sample_rate_hz: int = 16000,
+        pre_roll_seconds: float = DEFAULT_PRE_ROLL_SECONDS,
+        buffer_seconds: float = 5.0,
+        channels: int = 1,
+        backend: AudioBackend | None = None,
+    ) -> None:
+        self.sample_rate_hz = sample_rate_hz
+        self.channels = channels
+        self.pre_roll_frames = int(max(0.0, pre_roll_seconds) * sample_rate_hz)
+        self._ring = AudioRingBuffer(
+            max(self.pre_roll_frames, int(buffer_seconds * sample_rate_hz)), channels
+        )
+        self._backend = backend
+        self._stream: InputStream | None = None
+        self._turn_frames: list[np.ndarray] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    def start(self) -> None:
+        """Open and start the input stream; a no-op when it is already running."""
+        if self._stream is not None:
+            return
+        backend = self._backend
+        if backend is None:
+            # Imported lazily so the service (and its fakes) work without PortAudio
+            import sounddevice
+
+            backend = sounddevice
+        stream = backend.InputStream(
+            samplerate=self.sample_rate_hz,
+            channels=self.channels,
+            dtype="float32",
+            callback=self._on_audio,
+        )
+        stream.start()
+        self._stream = stream
+
+    def close(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        try:
+            stream.stop()
+        finally:
+            stream.close()
+
+    def __enter__(self) -> AudioCaptureService:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _on_audio(
+        self,
+        indata: np.ndarray,
+        frames_count: int,  # noqa: ARG002
+        time_info: Any,  # noqa: ARG002
+        status: Any,
+    ) -> None:
+        if status:
+            metrics.increment("Audio capture", "stream_status_flags")
+        with self._lock:
+            self._ring.write(indata)
+            if self._turn_frames is not None:
+                self._turn_frames.append(indata.copy())
+
+    def begin_turn(self) -> None:
+        """Start collecting a turn, seeded with the pre-roll from before the trigger."""
+        self.start()
+        with self._lock:
+            self._turn_frames = [self._ring.latest(self.pre_roll_frames)]
+
+    def clear_pre_roll(self) -> None:
+        """
+        Drop the buffered audio, e.g. after playing a reply, so the next turn's
+        pre-roll cannot contain the assistant's own speech.
+        """
+        with self._lock:
+            self._ring.clear()
+
+    def end_turn(self) -> np.ndarray:
+        """Stop collecting and return the turn's audio, shape (frames, channels)."""
+        with self._lock:
+            turn_frames, self._turn_frames = self._turn_frames, None
+        if not turn_frames:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        return np.concatenate(turn_frames, axis=0)
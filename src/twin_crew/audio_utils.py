@@ -3,216 +3,326 @@ from __future__ import annotations
 import platform
 import shutil
 import subprocess
-import threading
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, TypeGuard
 
 import click
 import numpy as np
-import sounddevice as sd
 from openai import OpenAI
 from scipy.io import wavfile
 
-
-def _with_retries(
-    operation_name: str,
-    func: Callable[[], str] | Callable[[], None],
-    max_attempts: int = 3,
-    base_delay_seconds: float = 0.8,
-) -> str | None:
-    """Run a callable with simple exponential backoff and jitter; return string if provided."""
-    last_exception: Exception | None = None
-    for attempt in range(1, max_attempts + 1):
-        try:
-            result = func()
-            # type: ignore[return-value]
-            return result  # can be None or str depending on func
-        except Exception as exc:  # noqa: BLE001
-            last_exception = exc
-            sleep_seconds = base_delay_seconds * (2 ** (attempt - 1)) + (0.1 * attempt)
-            click.secho(
-                f"{operation_name} failed (attempt {attempt}/{max_attempts}): {exc}",
-                fg="yellow",
-            )
-            if attempt < max_attempts:
-                time.sleep(sleep_seconds)
-    if last_exception is not None:
-        raise last_exception
-    return None
-
-
-def record_audio(output_wav_path: str, sample_rate_hz: int = 16000) -> None:
+from twin_crew.audio_capture import AudioCaptureService
+from twin_crew.rate_limiter import estimate_tokens, get_governor
+from twin_crew.resilience import (
+    STT_POLICY,
+    TTS_POLICY,
+    call_with_resilience,
+    metrics,
+)
+from twin_crew.session_trace import is_replaying, traced
+from twin_crew.stt_encoding import SttAudioFormat, encode_wav_for_stt
+from twin_crew.tts_cache import get_phrase_cache, phrase_key
+
+AudioPlayer = Callable[[Path], None]
+
+# Swappable for offline runs (see `audio_backends`); OpenAI and the system player
+_client_factory: Callable[[], Any] = OpenAI
+_audio_player: AudioPlayer | None = None
+
+
+@contextmanager
+def audio_backends(
+    client_factory: Callable[[], Any] | None = None,
+    player: AudioPlayer | None = None,
+) -> Iterator[None]:
+    """
+    Route STT/TTS calls through `client_factory` (an OpenAI-compatible client)
+    and playback through `player` for the duration of the block, e.g. to run
+    voice sessions offline against fakes.
+    """
+    global _client_factory, _audio_player
+    previous = (_client_factory, _audio_player)
+    if client_factory is not None:
+        _client_factory = client_factory
+    if player is not None:
+        _audio_player = player
+    try:
+        yield
+    finally:
+        _client_factory, _audio_player = previous
+
+
+def record_audio(
+    output_wav_path: str,
+    sample_rate_hz: int = 16000,
+    capture: AudioCaptureService | None = None,
+) -> None:
     """
     Record audio from the default microphone using Enter-to-start and Enter-to-stop.
     Audio is saved as a mono WAV file at the given sample rate.
+    With a running `capture` service the session's warm stream is used and the
+    turn includes its pre-roll; otherwise a stream is opened for this turn only.
+    When replaying a recorded session the microphone is skipped and a short
+    silent clip is written instead; the transcript comes from the cassette.
     """
-    click.secho("Press Enter to start recording, and Enter again to stop.", fg="blue")
-    input()
-
-    click.secho("\n🔴 Recording... Press Enter to stop.", fg="red")
+    if is_replaying():
+        silence = np.zeros(sample_rate_hz // 10, dtype=np.int16)
+        wavfile.write(Path(output_wav_path), sample_rate_hz, silence)
+        return
 
-    frames: list[np.ndarray] = []
-    stop_event = threading.Event()
+    owns_capture = capture is None
+    if capture is None:
+        capture = AudioCaptureService(sample_rate_hz, pre_roll_seconds=0.0)
+    try:
+        capture.start()
+        click.secho(
+            "Press Enter to start recording, and Enter again to stop.", fg="blue"
+        )
+        input()
 
-    def on_keyboard() -> None:
+        capture.begin_turn()
+        click.secho("\n🔴 Recording... Press Enter to stop.", fg="red")
         input()
-        stop_event.set()
-
-    keyboard_thread = threading.Thread(target=on_keyboard, daemon=True)
-    keyboard_thread.start()
-
-    def audio_callback(
-        indata: np.ndarray, frames_count: int, time_info: dict, status: sd.CallbackFlags
-    ) -> None:  # noqa: ARG001
-        # indata shape: (frames, channels)
-        frames.append(indata.copy())
-
-    with sd.InputStream(
-        samplerate=sample_rate_hz,
-        channels=1,
-        dtype="float32",
-        callback=audio_callback,
-    ):
-        while not stop_event.is_set():
-            time.sleep(0.05)
-
-    if not frames:
+        audio_data = capture.end_turn()
+    finally:
+        if owns_capture:
+            capture.close()
+
+    if not len(audio_data):
         raise RuntimeError("No audio captured from microphone.")
 
-    audio_data = np.concatenate(frames, axis=0)
     audio_int16 = np.int16(np.clip(audio_data, -1.0, 1.0) * 32767)
-
-    output_path = Path(output_wav_path)
-    wavfile.write(output_path, sample_rate_hz, audio_int16)
+    wavfile.write(Path(output_wav_path), capture.sample_rate_hz, audio_int16)
 
 
-def transcribe_audio(audio_wav_path: str, model_name: str = "whisper-1") -> str:
-    """Transcribe a WAV file using OpenAI Whisper with retries and basic timing."""
-    client = OpenAI()
-
+def transcribe_audio(
+    audio_wav_path: str,
+    model_name: str = "whisper-1",
+    audio_format: SttAudioFormat | None = None,
+) -> str:
+    """
+    Transcribe a WAV file using OpenAI Whisper with retries, hedging and basic timing.
+    The audio is downmixed, resampled to the model's native rate and encoded
+    (`audio_format`, default from `default_stt_format`) once, before upload.
+    """
     audio_path = Path(audio_wav_path)
     if not audio_path.exists():
         raise FileNotFoundError(f"Audio file not found: {audio_wav_path}")
 
-    def _transcribe() -> str:
+    encode_start = time.monotonic()
+    upload = encode_wav_for_stt(audio_path, model_name, audio_format)
+    metrics.record_latency("STT encode", time.monotonic() - encode_start)
+
+    def _transcribe(timeout_seconds: float | None) -> str:
+        # Counted per attempt, so retries and hedged duplicates show up as traffic
+        metrics.increment("Speech-to-Text", "bytes_sent", len(upload[1]))
+        # SDK retries are disabled; the shared policy owns retries and timeouts
+        client = _client_factory().with_options(timeout=timeout_seconds, max_retries=0)
         start_time = time.monotonic()
-        with audio_path.open("rb") as audio_file:
+        with get_governor().acquire(estimate_tokens()):
             response = client.audio.transcriptions.create(
                 model=model_name,
-                file=audio_file,
+                file=upload,
             )
         duration_ms = int((time.monotonic() - start_time) * 1000)
-        click.secho(f"STT complete in {duration_ms} ms", fg="white")
+        click.secho(
+            f"STT complete in {duration_ms} ms ({len(upload[1]) / 1024:.0f} KiB "
+            f"{upload[0].rsplit('.', 1)[-1]})",
+            fg="white",
+        )
         return response.text or ""
 
-    return str(_with_retries("Speech-to-Text", _transcribe))
+    # An exhausted cassette ends the replayed session like an empty utterance
+    return traced(
+        "stt",
+        {"model": model_name},
+        lambda: call_with_resilience("Speech-to-Text", _transcribe, STT_POLICY),
+        on_exhausted="",
+    )
 
 
-def speak_text(
+def synthesize_speech(
     text: str,
+    output_path: Path,
     model_name: str = "tts-1",
     voice_name: str = "alloy",
-    playback_speed: float | None = None,
 ) -> None:
-    """Convert text to speech using OpenAI TTS, optionally speed up playback, then play it.
+    """Synthesize `text` to an MP3 file with OpenAI TTS under the shared retry policy."""
 
-    If playback_speed is provided and ffmpeg is available, we apply an atempo filter to
-    the generated MP3 to speed up playback (pitch-preserving). If ffmpeg is not found
-    or the speed is invalid, we fall back to normal speed.
-    """
-    if not text.strip():
-        return
-
-    client = OpenAI()
-
-    def _synthesize_and_play() -> None:
+    def _synthesize(timeout_seconds: float | None) -> None:
+        client = _client_factory().with_options(timeout=timeout_seconds, max_retries=0)
         start_time = time.monotonic()
         # Use streaming response API when available to reduce memory spikes
-        speech_file = Path.cwd() / f"tts_{int(time.time() * 1000)}.mp3"
-        try:
+        with get_governor().acquire(estimate_tokens(text)):
             with client.audio.speech.with_streaming_response.create(
                 model=model_name,
                 voice=voice_name,
                 input=text,
             ) as response:
-                response.stream_to_file(speech_file)
-            tts_ms = int((time.monotonic() - start_time) * 1000)
-            click.secho(f"TTS synthesis in {tts_ms} ms", fg="white")
+                response.stream_to_file(output_path)
+        tts_ms = int((time.monotonic() - start_time) * 1000)
+        click.secho(f"TTS synthesis in {tts_ms} ms", fg="white")
 
-            # Optionally generate a speed-adjusted file using ffmpeg atempo
-            file_to_play = speech_file
-            try:
-                if playback_speed and playback_speed > 0 and shutil.which("ffmpeg"):
-                    # atempo supports 0.5..2.0, chain if outside range
-                    speed_filters: list[str] = []
-                    remaining = playback_speed
-                    # Decompose into factors within [0.5, 2.0]
-                    while remaining > 2.0:
-                        speed_filters.append("atempo=2.0")
-                        remaining /= 2.0
-                    while remaining < 0.5:
-                        speed_filters.append("atempo=0.5")
-                        remaining *= 2.0
-                    speed_filters.append(f"atempo={remaining}")
-                    filter_arg = ",".join(speed_filters)
-
-                    sped_file = (
-                        Path.cwd()
-                        / f"tts_{int(time.time() * 1000)}_x{playback_speed}.mp3"
-                    )
-                    subprocess.run(
-                        [
-                            "ffmpeg",
-                            "-y",
-                            "-i",
-                            str(speech_file),
-                            "-filter:a",
-                            filter_arg,
-                            "-vn",
-                            str(sped_file),
-                        ],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        check=True,
-                    )
-                    file_to_play = sped_file
-            except Exception as e:
-                click.secho(f"Playback speed adjustment skipped: {e}", fg="yellow")
+    call_with_resilience("Text-to-Speech", _synthesize, TTS_POLICY)
 
-            play_start = time.monotonic()
-            played = False
-            try:
-                if platform.system() == "Darwin":
-                    # Use native macOS player; -q 1 reduces console noise
-                    subprocess.run(["afplay", "-q", "1", str(file_to_play)], check=True)
-                    played = True
-            except Exception:
-                played = False
-
-            if not played:
-                # Fallback to playsound only if needed, import lazily to avoid AppKit requirement during import
-                try:
-                    from playsound import playsound as _playsound  # type: ignore
 
-                    _playsound(str(file_to_play))
-                    played = True
-                except Exception as playback_exc:  # noqa: BLE001
-                    raise playback_exc
+def can_adjust_playback_speed(playback_speed: float | None) -> TypeGuard[float]:
+    return bool(playback_speed and playback_speed > 0 and shutil.which("ffmpeg"))
 
-            play_ms = int((time.monotonic() - play_start) * 1000)
-            click.secho(f"Audio playback in {play_ms} ms", fg="white")
-        finally:
-            try:
-                speech_file.unlink(missing_ok=True)
-            except Exception:  # noqa: BLE001
-                # If cleanup fails, continue without blocking the UX
-                pass
-            # Also attempt to remove any speed-adjusted artifact
+
+def adjust_playback_speed(speech_file: Path, playback_speed: float | None) -> Path:
+    """
+    Return a pitch-preserving sped-up copy of `speech_file` made with ffmpeg's
+    atempo filter, or `speech_file` itself when ffmpeg or the speed is unavailable.
+    """
+    sped_file: Path | None = None
+    try:
+        if can_adjust_playback_speed(playback_speed):
+            # atempo supports 0.5..2.0, chain if outside range
+            speed_filters: list[str] = []
+            remaining = playback_speed
+            # Decompose into factors within [0.5, 2.0]
+            while remaining > 2.0:
+                speed_filters.append("atempo=2.0")
+                remaining /= 2.0
+            while remaining < 0.5:
+                speed_filters.append("atempo=0.5")
+                remaining *= 2.0
+            speed_filters.append(f"atempo={remaining}")
+            filter_arg = ",".join(speed_filters)
+
+            sped_file = speech_file.with_name(
+                f"{speech_file.stem}_x{playback_speed}{speech_file.suffix}"
+            )
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(speech_file),
+                    "-filter:a",
+                    filter_arg,
+                    "-vn",
+                    str(sped_file),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            return sped_file
+    except Exception as e:
+        click.secho(f"Playback speed adjustment skipped: {e}", fg="yellow")
+        if sped_file is not None:
+            # A failed ffmpeg run can leave partial output behind
             try:
-                for p in Path.cwd().glob("tts_*_x*.mp3"):
-                    p.unlink(missing_ok=True)
-            except Exception:
+                sped_file.unlink(missing_ok=True)
+            except OSError:
                 pass
+    return speech_file
+
+
+def play_audio_file(file_to_play: Path) -> None:
+    """
+    Play an audio file with the player installed by `audio_backends`, else
+    afplay on macOS, falling back to playsound.
+    """
+    play_start = time.monotonic()
+    played = False
+    if _audio_player is not None:
+        _audio_player(file_to_play)
+        played = True
+    try:
+        if not played and platform.system() == "Darwin":
+            # Use native macOS player; -q 1 reduces console noise
+            subprocess.run(["afplay", "-q", "1", str(file_to_play)], check=True)
+            played = True
+    except Exception:
+        played = False
 
-    _with_retries("Text-to-Speech", _synthesize_and_play)
+    if not played:
+        # Fallback to playsound only if needed, import lazily to avoid AppKit requirement during import
+        from playsound import playsound as _playsound  # type: ignore
+
+        _playsound(str(file_to_play))
+
+    play_ms = int((time.monotonic() - play_start) * 1000)
+    click.secho(f"Audio playback in {play_ms} ms", fg="white")
+
+
+def speak_text(
+    text: str,
+    model_name: str = "tts-1",
+    voice_name: str = "alloy",
+    playback_speed: float | None = None,
+) -> None:
+    """Convert text to speech using OpenAI TTS, optionally speed up playback, then play it.
+
+    If playback_speed is provided and ffmpeg is available, we apply an atempo filter to
+    the generated MP3 to speed up playback (pitch-preserving). If ffmpeg is not found
+    or the speed is invalid, we fall back to normal speed. Only synthesis is retried;
+    a playback failure is reported once instead of re-synthesizing the audio.
+
+    With the phrase cache enabled, short phrases spoken a second time are
+    cached, keyed by (text, model, voice, speed actually applied), so later
+    repeats play without a network call.
+    """
+    if not text.strip():
+        return
+
+    def _synthesize_and_play() -> None:
+        cache = get_phrase_cache()
+        if cache and not cache.accepts(text):
+            cache = None
+        expected_speed = (
+            playback_speed if can_adjust_playback_speed(playback_speed) else None
+        )
+        cache_key = phrase_key(text, model_name, voice_name, expected_speed)
+        if cache:
+            cached_file = cache.get(cache_key)
+            if cached_file is not None:
+                click.secho("TTS served from phrase cache", fg="white")
+                play_audio_file(cached_file)
+                return
+            if not cache.admit(cache_key):
+                cache = None
+
+        speech_file = Path.cwd() / f"tts_{int(time.time() * 1000)}.mp3"
+        sped_file = speech_file
+        try:
+            synthesize_speech(text, speech_file, model_name, voice_name)
+            sped_file = adjust_playback_speed(speech_file, playback_speed)
+            file_to_play = sped_file
+            if cache:
+                # Key on the speed actually applied: without ffmpeg (or when
+                # it fails) the file plays at normal speed
+                applied_speed = playback_speed if sped_file != speech_file else None
+                try:
+                    file_to_play = cache.put(
+                        phrase_key(text, model_name, voice_name, applied_speed),
+                        sped_file,
+                    )
+                except OSError as e:
+                    click.secho(f"Phrase cache write skipped: {e}", fg="yellow")
+            play_audio_file(file_to_play)
+        finally:
+            # Cached entries are copies, so both working files always go
+            for artifact in {speech_file, sped_file}:
+                try:
+                    artifact.unlink(missing_ok=True)
+                except Exception:  # noqa: BLE001
+                    # If cleanup fails, continue without blocking the UX
+                    pass
+
+    traced(
+        "tts",
+        {
+            "text": text,
+            "model": model_name,
+            "voice": voice_name,
+            "speed": playback_speed,
+        },
+        _synthesize_and_play,
+    )
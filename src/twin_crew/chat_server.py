@@ -0,0 +1,328 @@
+"""
+Multi-session HTTP server mode for the custom chat.
+
+One process serves many concurrent sessions. Sessions share the warm
+`ChatContext` (crew analysis, tool schema, system prompt and greeting) and each
+keeps its own `messages` transcript. Crew runs are admitted through a bounded
+job queue so a burst of confirmations cannot start unbounded crew work. A
+turn that fails for any reason is undone, so the client can resend it; a
+rejected crew run is reported as 429 and other failures as 500.
+Sessions idle for longer than the session TTL are dropped when new sessions
+are created, so abandoned clients cannot use up the session limit. When the
+limit is reached anyway, new sessions get 503. The server speaks plain HTTP;
+there is no WebSocket transport.
+
+Endpoints (JSON in, JSON out):
+    POST   /sessions                  -> {"session_id", "message"}
+    POST   /sessions/<id>/messages    {"content"} -> {"reply", "latency_ms"}
+    DELETE /sessions/<id>
+    GET    /healthz, /metrics
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypeVar
+
+import click
+
+from twin_crew.custom_chat import ChatContext, create_tool_function, handle_user_input
+from twin_crew.rate_limiter import get_governor
+from twin_crew.resilience import metrics
+
+T = TypeVar("T")
+
+
+class CrewQueueFullError(RuntimeError):
+    """Raised when the crew job queue has no room for another job."""
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when the server already holds its maximum number of sessions."""
+
+
+class CrewJobQueue:
+    """Admits at most `max_running` crew jobs at once and `max_waiting` in line."""
+
+    def __init__(self, max_running: int = 2, max_waiting: int = 8) -> None:
+        self.max_running = max_running
+        self.max_waiting = max_waiting
+        self._slots = threading.BoundedSemaphore(max_running)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+
+    def run(self, job: Callable[[], T]) -> T:
+        with self._lock:
+            if self.waiting >= self.max_waiting:
+                metrics.increment("Crew job", "rejected")
+                raise CrewQueueFullError("Crew job queue is full, try again shortly.")
+            self.waiting += 1
+
+        enqueued_at = time.monotonic()
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+        metrics.record_latency("Crew job queue wait", time.monotonic() - enqueued_at)
+        try:
+            return job()
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "waiting": self.waiting,
+                "max_running": self.max_running,
+                "max_waiting": self.max_waiting,
+            }
+
+
+@dataclass
+class ChatSession:
+    """Per-user conversation state; turns of one session are serialized."""
+
+    session_id: str
+    messages: list[dict[str, str]]
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.monotonic)
+
+
+class ChatServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the shared context and all live sessions."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        context: ChatContext,
+        jobs: CrewJobQueue | None = None,
+        max_sessions: int = 1000,
+        session_ttl_seconds: float = 1800.0,
+    ) -> None:
+        super().__init__(address, ChatRequestHandler)
+        self.context = context
+        self.jobs = jobs or CrewJobQueue()
+        self.max_sessions = max_sessions
+        self.session_ttl_seconds = session_ttl_seconds
+        self.sessions: dict[str, ChatSession] = {}
+        self._sessions_lock = threading.Lock()
+
+    def _evict_idle_sessions(self) -> None:
+        """Drop sessions idle past the TTL; callers hold `_sessions_lock`."""
+        cutoff = time.monotonic() - self.session_ttl_seconds
+        idle = [
+            session_id
+            for session_id, session in self.sessions.items()
+            # A session mid-turn is in use however long the turn takes
+            if session.last_active < cutoff and not session.lock.locked()
+        ]
+        for session_id in idle:
+            del self.sessions[session_id]
+        if idle:
+            metrics.increment("Chat session", "expired", len(idle))
+
+    def create_session(self) -> ChatSession:
+        with self._sessions_lock:
+            self._evict_idle_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                metrics.increment("Chat session", "rejected")
+                raise SessionLimitError("Too many open sessions, try again later.")
+            session = ChatSession(uuid.uuid4().hex, self.context.new_messages())
+            self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id: str) -> ChatSession | None:
+        with self._sessions_lock:
+            return self.sessions.get(session_id)
+
+    def close_session(self, session_id: str) -> bool:
+        with self._sessions_lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def crew_tool(
+        self, session: ChatSession, failures: list[Exception]
+    ) -> Callable[..., str]:
+        """
+        The session's crew tool: a fresh crew copy per job, admitted by the
+        queue. Errors are also appended to `failures`, because crewAI's
+        `LLM.call` logs tool exceptions and returns an empty reply instead of
+        raising them.
+        """
+
+        def run_crew_job(**kwargs: Any) -> str:
+            def job() -> str:
+                tool = create_tool_function(self.context.crew.copy(), session.messages)
+                try:
+                    return str(tool(**kwargs))
+                except SystemExit as exc:
+                    # run_crew_tool exits the CLI on failure; only fail this turn here
+                    raise RuntimeError("The crew run failed.") from exc
+
+            try:
+                return self.jobs.run(job)
+            except Exception as exc:
+                failures.append(exc)
+                raise
+
+        return run_crew_job
+
+    def handle_turn(self, session: ChatSession, content: str) -> str:
+        with session.lock:
+            start_time = time.monotonic()
+            session.last_active = start_time
+            turn_start = len(session.messages)
+            failures: list[Exception] = []
+            try:
+                reply = handle_user_input(
+                    content,
+                    self.context.chat_llm,
+                    session.messages,
+                    self.context.tool_schema,
+                    {
+                        self.context.chat_inputs.crew_name: self.crew_tool(
+                            session, failures
+                        )
+                    },
+                    self.context.speaker_label,
+                    suppress_print=True,
+                )
+                if failures:
+                    raise failures[0]
+            except BaseException:
+                # Undo the turn so the client can simply resend the message
+                del session.messages[turn_start:]
+                raise
+            session.last_active = time.monotonic()
+            metrics.record_latency("Chat turn", session.last_active - start_time)
+        return reply or ""
+
+
+class ChatRequestHandler(BaseHTTPRequestHandler):
+    server: ChatServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # Per-request access logs would drown the terminal under load
+        return
+
+    def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        payload = json.loads(self.rfile.read(length))
+        return payload if isinstance(payload, dict) else {}
+
+    def _session_path(self) -> tuple[str, str] | None:
+        parts = [part for part in self.path.split("/") if part]
+        if len(parts) >= 2 and parts[0] == "sessions":
+            return parts[1], "/".join(parts[2:])
+        return None
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/metrics":
+            with self.server._sessions_lock:
+                open_sessions = len(self.server.sessions)
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "sessions": open_sessions,
+                    "max_sessions": self.server.max_sessions,
+                    "crew_jobs": self.server.jobs.stats(),
+                    "governor": get_governor().stats(),
+                    "latency": metrics.snapshot(),
+                },
+            )
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        try:
+            if self.path == "/sessions":
+                session = self.server.create_session()
+                self._send_json(
+                    HTTPStatus.CREATED,
+                    {
+                        "session_id": session.session_id,
+                        "message": self.server.context.introductory_message,
+                    },
+                )
+                return
+
+            route = self._session_path()
+            if route is None or route[1] != "messages":
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+                return
+            session_or_none = self.server.get_session(route[0])
+            if session_or_none is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown session"})
+                return
+            content = str(self._read_json().get("content", ""))
+            start_time = time.monotonic()
+            reply = self.server.handle_turn(session_or_none, content)
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "reply": reply,
+                    "latency_ms": int((time.monotonic() - start_time) * 1000),
+                },
+            )
+        except CrewQueueFullError as e:
+            self._send_json(HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)})
+        except SessionLimitError as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        except json.JSONDecodeError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "invalid JSON"})
+        except Exception as e:  # noqa: BLE001
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        route = self._session_path()
+        if route is not None and not route[1] and self.server.close_session(route[0]):
+            self._send_json(HTTPStatus.OK, {"closed": route[0]})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown session"})
+
+
+def serve_chat(
+    context: ChatContext,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    max_crew_jobs: int = 2,
+    max_queued_crew_jobs: int = 8,
+    session_ttl_seconds: float = 1800.0,
+) -> None:
+    """Serve `context` over HTTP until interrupted."""
+    server = ChatServer(
+        (host, port),
+        context,
+        CrewJobQueue(max_crew_jobs, max_queued_crew_jobs),
+        session_ttl_seconds=session_ttl_seconds,
+    )
+    click.secho(f"Chat server listening on http://{host}:{port}", fg="green")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nShutting down chat server.")
+    finally:
+        server.server_close()
@@ -2,8 +2,12 @@ from typing import Any, Final
 
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
+from crewai.tasks.conditional_task import ConditionalTask
 
+from twin_crew.model_router import ModelRouter, load_model_router
 from twin_crew.named_agent import NamedAgent
+from twin_crew.quality_gate import GatedCrew, QualityGate, load_quality_gate
+from twin_crew.rate_limiter import governed
 from twin_crew.tools.word_counter_tool import WordCounterTool
 
 
@@ -14,24 +18,40 @@ class TwinCrew:
     agents_config: Final[str] = "config/agents.yaml"
     tasks_config: Final[str] = "config/tasks.yaml"
 
+    @property
+    def model_router(self) -> ModelRouter:
+        """Model tiers per agent from config/models.yaml, read on first use."""
+        return load_model_router()
+
+    @property
+    def quality_gate(self) -> QualityGate:
+        """Draft checks from config/quality_gate.yaml, read on first use."""
+        return load_quality_gate()
+
     @agent  # type: ignore
     def chat_manager(self) -> NamedAgent:
         config: dict[str, Any] = self.agents_config["chat_manager"]  # type: ignore
         return NamedAgent(
             name=config["name"],
             config=config,
+            llm=self.model_router.for_agent("chat_manager"),
             verbose=False,
             allow_delegation=True,
         )
 
     @agent  # type: ignore
     def pitch_strategist(self) -> Agent:
-        return Agent(config=self.agents_config["pitch_strategist"], verbose=True)  # type: ignore
+        return Agent(
+            config=self.agents_config["pitch_strategist"],  # type: ignore
+            llm=self.model_router.for_agent("pitch_strategist"),
+            verbose=True,
+        )
 
     @agent  # type: ignore
     def pitch_writer(self) -> Agent:
         return Agent(
             config=self.agents_config["pitch_writer"],  # type: ignore
+            llm=self.model_router.for_agent("pitch_writer"),
             tools=[WordCounterTool()],
             verbose=True,
         )
@@ -40,6 +60,7 @@ class TwinCrew:
     def pitch_refiner(self) -> Agent:
         return Agent(
             config=self.agents_config["pitch_refiner"],  # type: ignore
+            llm=self.model_router.for_agent("pitch_refiner"),
             tools=[WordCounterTool()],
             verbose=True,
         )
@@ -58,8 +79,10 @@ class TwinCrew:
 
     @task  # type: ignore
     def refine_pitch_for_fit_task(self) -> Task:
-        return Task(
+        # Skipped when the draft already passes the quality gate
+        return ConditionalTask(
             config=self.tasks_config["refine_pitch_for_fit_task"],  # type: ignore
+            condition=self.quality_gate.condition_for("refine_pitch_for_fit_task"),
         )
 
     @crew  # type: ignore
@@ -70,12 +93,15 @@ class TwinCrew:
             self.pitch_writer(),
             self.pitch_refiner(),
         ]
+        for worker in worker_agents:
+            # Agents without a routed tier still go through the rate governor
+            worker.llm = governed(worker.llm)
 
-        return Crew(
+        return GatedCrew(
             agents=worker_agents,
             # self.agents,
             tasks=self.tasks,  # type: ignore
             process=Process.sequential,
             verbose=False,
-            chat_llm="gpt-4o",
+            chat_llm=self.model_router.for_call_site("dialogue"),
         )
@@ -1,10 +1,12 @@
+import copy
 import json
 import platform
-import re
 import sys
 import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 import click
@@ -13,44 +15,239 @@ from crewai.llm import LLM
 from crewai.types.crew_chat import ChatInputField, ChatInputs
 from crewai.utilities.llm_utils import create_llm
 
+from twin_crew.audio_capture import DEFAULT_PRE_ROLL_SECONDS, AudioCaptureService
 from twin_crew.audio_utils import record_audio, speak_text, transcribe_audio
+from twin_crew.instrumentation import ResourceMonitor
+from twin_crew.model_router import llm_for_call_site
 from twin_crew.named_agent import NamedAgent
+from twin_crew.prompt_templates import OwnerKind, PromptTemplates
+from twin_crew.rate_limiter import Priority, governed, priority_scope
+from twin_crew.resilience import (
+    CHAT_POLICY,
+    CHAT_TOOL_POLICY,
+    call_with_resilience,
+    is_retryable,
+    metrics,
+    print_metrics_summary,
+)
+from twin_crew.semantic_cache import cache_namespace, get_response_cache
+from twin_crew.session_store import (
+    SessionLog,
+    SessionNotFoundError,
+    StoredSession,
+    open_session_store,
+)
+from twin_crew.session_trace import active_trace, is_replaying, traced
+from twin_crew.speculation import CrewSpeculator, WarmStart
+
+
+@dataclass(frozen=True)
+class ChatContext:
+    """Warm, read-only chat state derived once from the crew and shared by sessions."""
+
+    crew: Crew
+    chat_llm: LLM
+    chat_inputs: ChatInputs
+    tool_schema: dict[str, Any]
+    system_message: str
+    introductory_message: str
+    speaker_label: str
+
+    def new_messages(self) -> list[dict[str, str]]:
+        """Fresh per-session transcript starting with the shared greeting."""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "assistant", "content": self.introductory_message},
+        ]
+
+
+def prepare_chat_context(
+    crew_instance: Crew, manager_agent: NamedAgent | None, chat_llm: LLM
+) -> ChatContext:
+    """Analyze the crew and build the tool schema, system prompt and greeting."""
+    crew_name: str = crew_instance.__class__.__name__
+    chat_inputs: ChatInputs = generate_crew_chat_inputs(
+        crew_instance, crew_name, chat_llm
+    )
+    tool_schema: dict = generate_crew_tool_schema(chat_inputs)
+    system_message: str = build_system_message(chat_inputs, manager_agent)
+    introductory_message: str = call_chat_llm(
+        llm_for_call_site(chat_llm, "intro_message"),
+        messages=[{"role": "system", "content": system_message}],
+    )
+    return ChatContext(
+        crew=crew_instance,
+        chat_llm=chat_llm,
+        chat_inputs=chat_inputs,
+        tool_schema=tool_schema,
+        system_message=system_message,
+        introductory_message=introductory_message,
+        speaker_label=get_agent_display_name(manager_agent),
+    )
+
+
+def context_from_stored_session(
+    crew_instance: Crew, chat_llm: LLM, stored: StoredSession
+) -> ChatContext:
+    """Rebuild the warm chat context saved with a session, without any LLM call."""
+    return ChatContext(
+        crew=crew_instance,
+        chat_llm=chat_llm,
+        chat_inputs=stored.chat_inputs,
+        tool_schema=stored.tool_schema,
+        system_message=stored.system_message,
+        introductory_message=stored.introductory_message,
+        speaker_label=stored.speaker_label,
+    )
 
 
 def run_custom_chat(
     crew_instance: Crew,
     manager_agent: NamedAgent | None = None,
     audio_mode: bool = False,
+    speculative: bool = False,
+    pre_roll_seconds: float = DEFAULT_PRE_ROLL_SECONDS,
+    resume_session_id: str | None = None,
+    save_session: bool = False,
+    instrument_path: str | None = None,
 ) -> None:
     """
     Generic interactive chat that mirrors crewAI's chat behavior while
     allowing a manager persona and manager-defined LLM when provided.
+    With `speculative`, the crew's first task is pre-run while the user
+    is asked to confirm a crew call. In audio mode each spoken turn starts
+    with `pre_roll_seconds` of audio from before Enter was pressed.
+
+    With `save_session`, every turn is appended to the session store as it
+    happens. With `resume_session_id`, the saved context and transcript are
+    restored instead of analyzing the crew again, so resuming costs no LLM
+    calls, and the resumed session keeps being saved.
+
+    With `instrument_path`, per-turn memory, thread, temp-file and transcript
+    metrics are appended to that JSONL file (see `ResourceMonitor`).
     """
     chat_llm: LLM | None = initialize_chat_llm(crew_instance, manager_agent)
     if not chat_llm:
         return
 
-    # Analyze crew to produce dynamic inputs and tool schema
-    loading_complete = threading.Event()
-    loading_thread = threading.Thread(target=show_loading, args=(loading_complete,))
-    loading_thread.start()
+    # Transcripts are only written to disk when the user asked for it
+    store = open_session_store() if save_session or resume_session_id else None
+    stored: StoredSession | None = None
+    if resume_session_id:
+        if store is None:
+            return
+        try:
+            stored = store.load(resume_session_id)
+        except SessionNotFoundError:
+            click.secho(f"No saved session with ID {resume_session_id}.", fg="red")
+            return
 
-    try:
-        crew_name: str = crew_instance.__class__.__name__
-        chat_inputs: ChatInputs = generate_crew_chat_inputs(
-            crew_instance, crew_name, chat_llm
+    if stored is not None:
+        context = context_from_stored_session(crew_instance, chat_llm, stored)
+    else:
+        # Analyze crew to produce dynamic inputs and tool schema
+        loading_complete = threading.Event()
+        loading_thread = threading.Thread(target=show_loading, args=(loading_complete,))
+        loading_thread.start()
+
+        try:
+            context = prepare_chat_context(crew_instance, manager_agent, chat_llm)
+        finally:
+            loading_complete.set()
+            loading_thread.join()
+
+    chat_inputs: ChatInputs = context.chat_inputs
+    tool_schema: dict = context.tool_schema
+    introductory_message: str = context.introductory_message
+    speaker_label: str = context.speaker_label
+
+    messages: list[dict[str, str]]
+    if stored is not None:
+        messages = stored.messages
+        last_reply = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "assistant"),
+            introductory_message,
         )
-        tool_schema: dict = generate_crew_tool_schema(chat_inputs)
-        system_message: str = build_system_message(chat_inputs, manager_agent)
-        introductory_message: str = chat_llm.call(
-            messages=[{"role": "system", "content": system_message}]
+        click.secho(f"\nResumed session {stored.session_id}.", fg="white")
+        click.secho(f"\n{speaker_label}: {last_reply}\n", fg="green")
+    else:
+        messages = context.new_messages()
+        announce_introduction(introductory_message, speaker_label, audio_mode)
+
+    session_log: SessionLog | None = None
+    if store is not None:
+        session_id = (
+            stored.session_id
+            if stored is not None
+            else store.create_session(
+                chat_inputs,
+                tool_schema,
+                context.system_message,
+                introductory_message,
+                speaker_label,
+            )
+        )
+        session_log = SessionLog(store, session_id)
+        session_log.sync(messages)
+        click.secho(
+            f"Session {session_id} is saved to {store.path}; "
+            f"resume it with: chat --resume {session_id}",
+            fg="white",
         )
+
+    speculator: CrewSpeculator | None = None
+    if speculative and active_trace() is not None:
+        # Background calls would make traced sessions non-deterministic
+        click.secho("Speculative crew runs are disabled while tracing.", fg="yellow")
+    elif speculative:
+        speculator = CrewSpeculator(crew_instance, chat_llm, tool_schema)
+
+    # Expose a single callable tool = the crew itself (generic)
+    available_functions: dict[str, Any] = {
+        chat_inputs.crew_name: create_tool_function(
+            crew_instance, messages, speculator
+        ),
+    }
+
+    monitor = ResourceMonitor(Path(instrument_path)) if instrument_path else None
+    try:
+        if audio_mode:
+            audio_chat_loop(
+                chat_llm,
+                messages,
+                tool_schema,
+                available_functions,
+                speaker_label,
+                speculator,
+                pre_roll_seconds=pre_roll_seconds,
+                session_log=session_log,
+                monitor=monitor,
+            )
+        else:
+            chat_loop(
+                chat_llm,
+                messages,
+                tool_schema,
+                available_functions,
+                speaker_label,
+                speculator,
+                session_log=session_log,
+                monitor=monitor,
+            )
     finally:
-        loading_complete.set()
-        loading_thread.join()
+        if monitor is not None:
+            monitor.close()
+            click.secho(f"Resource metrics written to {instrument_path}", fg="white")
+        if session_log is not None:
+            session_log.sync(messages)
+            session_log.store.close()
+        print_metrics_summary()
+
 
-    # Announce intro in persona voice if available
-    speaker_label: str = get_agent_display_name(manager_agent)
+def announce_introduction(
+    introductory_message: str, speaker_label: str, audio_mode: bool
+) -> None:
+    """Print the greeting, speaking it first in audio mode."""
     if audio_mode:
         # Speak first, then show text for clarity (speed up slightly for snappier UX)
         try:
@@ -61,24 +258,6 @@ def run_custom_chat(
     else:
         click.secho(f"\n{speaker_label}: {introductory_message}\n", fg="green")
 
-    messages: list[dict[str, str]] = [
-        {"role": "system", "content": system_message},
-        {"role": "assistant", "content": introductory_message},
-    ]
-
-    # Expose a single callable tool = the crew itself (generic)
-    available_functions: dict[str, Any] = {
-        chat_inputs.crew_name: create_tool_function(crew_instance, messages),
-    }
-
-    if audio_mode:
-        audio_chat_loop(
-            chat_llm, messages, tool_schema, available_functions, speaker_label
-        )
-        return
-
-    chat_loop(chat_llm, messages, tool_schema, available_functions, speaker_label)
-
 
 def initialize_chat_llm(crew: Crew, manager_agent: NamedAgent | None) -> LLM | None:
     """
@@ -88,16 +267,72 @@ def initialize_chat_llm(crew: Crew, manager_agent: NamedAgent | None) -> LLM | N
     3) default "gpt-4o"
     """
     try:
+        # Chat LLMs outside the model router still go through the rate governor
         if manager_agent and getattr(manager_agent, "llm", None):
-            return create_llm(manager_agent.llm)
+            return governed(create_llm(manager_agent.llm))
         if getattr(crew, "chat_llm", None):
-            return create_llm(crew.chat_llm)
-        return create_llm("gpt-4o")
+            return governed(create_llm(crew.chat_llm))
+        return governed(create_llm("gpt-4o"))
     except Exception as e:
         click.secho(f"Unable to initialize chat LLM: {e}", fg="red")
         return None
 
 
+def call_chat_llm(
+    chat_llm: LLM,
+    messages: list[dict[str, str]],
+    tools: list[dict[str, Any]] | None = None,
+    available_functions: dict[str, Any] | None = None,
+) -> str:
+    """
+    Call the chat LLM under the shared retry policy. Once a tool has run inside
+    the call, failures are no longer retried so the crew is never run twice.
+    """
+    if not available_functions:
+        return call_with_resilience(
+            "Chat LLM",
+            lambda timeout: str(
+                with_request_timeout(chat_llm, timeout).call(messages=messages)
+            ),
+            CHAT_POLICY,
+        )
+
+    tool_started = threading.Event()
+
+    def guard(function: Any) -> Any:
+        def guarded(**kwargs: Any) -> Any:
+            tool_started.set()
+            return function(**kwargs)
+
+        return guarded
+
+    guarded_functions = {name: guard(fn) for name, fn in available_functions.items()}
+    return call_with_resilience(
+        "Chat LLM",
+        lambda timeout: str(
+            with_request_timeout(chat_llm, timeout).call(
+                messages=messages,
+                tools=tools,
+                available_functions=guarded_functions,
+            )
+        ),
+        CHAT_TOOL_POLICY,
+        retryable=lambda exc: not tool_started.is_set() and is_retryable(exc),
+    )
+
+
+def with_request_timeout(chat_llm: LLM, timeout_seconds: float | None) -> LLM:
+    """
+    Copy of `chat_llm` whose requests time out with the current attempt, so
+    litellm aborts the HTTP call instead of leaving it running after we give up.
+    """
+    if timeout_seconds is None:
+        return chat_llm
+    bounded = copy.copy(chat_llm)
+    bounded.timeout = max(1.0, timeout_seconds)
+    return bounded
+
+
 def show_loading(event: threading.Event) -> None:
     """Display animated loading dots while processing."""
     click.secho(
@@ -159,7 +394,11 @@ def build_system_message(
     )
 
 
-def create_tool_function(crew: Crew, messages: list[dict[str, str]]) -> Any:
+def create_tool_function(
+    crew: Crew,
+    messages: list[dict[str, str]],
+    speculator: CrewSpeculator | None = None,
+) -> Any:
     """Create a wrapper that runs the crew with the chat transcript included."""
 
     def run_with_messages(**kwargs: Any) -> str:
@@ -172,7 +411,8 @@ def create_tool_function(crew: Crew, messages: list[dict[str, str]]) -> Any:
             }
         )
 
-        result_str = run_crew_tool(crew, messages, **kwargs)
+        warm_start = speculator.claim(kwargs) if speculator else None
+        result_str = run_crew_tool(crew, messages, warm_start=warm_start, **kwargs)
         # Hidden persistent memory for the model about tool usage
         run_time = datetime.now().isoformat(timespec="seconds")
         messages.append(
@@ -187,14 +427,29 @@ def create_tool_function(crew: Crew, messages: list[dict[str, str]]) -> Any:
     return run_with_messages
 
 
-def run_crew_tool(crew: Crew, messages: list[dict[str, str]], **kwargs: Any) -> str:
+def run_crew_tool(
+    crew: Crew,
+    messages: list[dict[str, str]],
+    warm_start: WarmStart | None = None,
+    **kwargs: Any,
+) -> str:
     """
     Runs the crew using crew.kickoff(inputs=kwargs) and returns the output as string.
     Mirrors original behavior and includes serialized chat messages for context.
+    A speculative warm start resumes after the pre-run first task instead.
     """
     try:
         kwargs["crew_chat_messages"] = json.dumps(messages)
-        crew_output = crew.kickoff(inputs=kwargs)
+        # Crew agents yield to interactive chat turns at the rate governor
+        with priority_scope(Priority.BATCH):
+            if warm_start is not None:
+                try:
+                    return str(warm_start.kickoff(kwargs))
+                except Exception as e:  # noqa: BLE001
+                    click.secho(
+                        f"Warm start failed, running full crew: {e}", fg="yellow"
+                    )
+            crew_output = crew.kickoff(inputs=kwargs)
         return str(crew_output)
     except Exception as e:
         click.secho("An error occurred while running the crew:", fg="red")
@@ -208,12 +463,18 @@ def chat_loop(
     crew_tool_schema: dict[str, Any],
     available_functions: dict[str, Any],
     speaker_label: str,
+    speculator: CrewSpeculator | None = None,
+    session_log: SessionLog | None = None,
+    monitor: ResourceMonitor | None = None,
 ) -> None:
     """Main chat loop for interacting with the user."""
     while True:
         try:
             flush_input()
             user_input: str = get_user_input()
+            if user_input.strip().lower() == "exit":
+                click.echo("Exiting chat. Goodbye!")
+                break
             handle_user_input(
                 user_input,
                 chat_llm,
@@ -221,7 +482,11 @@ def chat_loop(
                 crew_tool_schema,
                 available_functions,
                 speaker_label,
+                speculator=speculator,
+                session_log=session_log,
             )
+            if monitor:
+                monitor.sample(messages)
         except KeyboardInterrupt:
             click.echo("\nExiting chat. Goodbye!")
             break
@@ -232,6 +497,12 @@ def chat_loop(
 
 def get_user_input() -> str:
     """Collect multi-line user input with exit handling."""
+    # Recorded so replayed sessions drive the same turns; an exhausted cassette exits.
+    return traced("input", {}, read_user_input, on_exhausted="exit")
+
+
+def read_user_input() -> str:
+    """Read multi-line user input from the terminal."""
     click.secho(
         "\nYou (type your message below. Press 'Enter' twice when you're done, or type 'exit' to quit):",
         fg="blue",
@@ -255,8 +526,16 @@ def handle_user_input(
     available_functions: dict[str, Any],
     speaker_label: str,
     suppress_print: bool = False,
+    speculator: CrewSpeculator | None = None,
+    session_log: SessionLog | None = None,
 ) -> str | None:
-    """Handle user input and generate assistant response."""
+    """
+    Handle user input and generate assistant response. With a `session_log`
+    the transcript is persisted as soon as the user message is added and
+    again once the reply is in. When the response cache is enabled, meta
+    questions are answered from it if they were answered before under the
+    same system message.
+    """
     if user_input.strip().lower() == "exit":
         click.echo("Exiting chat. Goodbye!")
         return
@@ -265,13 +544,34 @@ def handle_user_input(
         click.echo("Empty message. Please provide input or type 'exit' to quit.")
         return
 
+    # Cache hits would skip recorded LLM calls, so traced sessions bypass the cache
+    response_cache = get_response_cache() if active_trace() is None else None
+    if response_cache is not None and not response_cache.eligible(messages, user_input):
+        response_cache = None
+    system_message = (messages[0].get("content") or "") if messages else ""
+    namespace = cache_namespace(system_message)
+
     messages.append({"role": "user", "content": user_input})
+    if session_log:
+        session_log.sync(messages)
+
+    cached = response_cache.lookup(namespace, user_input) if response_cache else None
+    if response_cache is not None:
+        metrics.increment("Response cache", "hits" if cached else "misses")
+    if cached is not None:
+        messages.append({"role": "assistant", "content": cached.response})
+        if session_log:
+            session_log.sync(messages)
+        if not suppress_print:
+            click.secho(f"\n{speaker_label}: {cached.response}\n", fg="green")
+        return cached.response
 
     if not suppress_print:
         click.echo()
         click.secho(f"{speaker_label} is thinking... 🤔", fg="cyan")
 
-    final_response = chat_llm.call(
+    final_response = call_chat_llm(
+        llm_for_call_site(chat_llm, "dialogue"),
         messages=messages,
         tools=[crew_tool_schema],
         available_functions=available_functions,
@@ -292,22 +592,31 @@ def handle_user_input(
             "Craft a message for the user that presents the crew's output. Keep the output of the crew exactly as is."
         )
 
-        formatted_response = chat_llm.call(
+        formatted_response = call_chat_llm(
+            llm_for_call_site(chat_llm, "presenter"),
             messages=messages
             + [
                 {
                     "role": "system",
                     "content": f"{presenter_system_message}\n\n[crew_output]\n{crew_output}",
                 }
-            ]
+            ],
         )
 
         messages.append({"role": "assistant", "content": formatted_response})
+        if session_log:
+            session_log.sync(messages)
         if not suppress_print:
             click.secho(f"\n{speaker_label}: {formatted_response}\n", fg="green")
         return formatted_response
 
     messages.append({"role": "assistant", "content": final_response})
+    if session_log:
+        session_log.sync(messages)
+    if response_cache is not None:
+        response_cache.store(namespace, user_input, final_response)
+    if speculator:
+        speculator.observe(messages)
     if not suppress_print:
         click.secho(f"\n{speaker_label}: {final_response}\n", fg="green")
     return final_response
@@ -319,8 +628,60 @@ def audio_chat_loop(
     crew_tool_schema: dict[str, Any],
     available_functions: dict[str, Any],
     speaker_label: str,
+    speculator: CrewSpeculator | None = None,
+    pre_roll_seconds: float = DEFAULT_PRE_ROLL_SECONDS,
+    capture: AudioCaptureService | None = None,
+    session_log: SessionLog | None = None,
+    monitor: ResourceMonitor | None = None,
+) -> None:
+    """
+    Audio-first chat loop: record speech, transcribe, run model, speak reply, print text.
+    The microphone stream stays open for the whole session. A `monitor` is
+    sampled after every turn.
+    """
+    if capture is None and not is_replaying():
+        capture = AudioCaptureService(pre_roll_seconds=pre_roll_seconds)
+        try:
+            with capture:
+                _audio_chat_turns(
+                    chat_llm,
+                    messages,
+                    crew_tool_schema,
+                    available_functions,
+                    speaker_label,
+                    speculator,
+                    capture,
+                    session_log,
+                    monitor,
+                )
+        except Exception as e:
+            click.secho(f"An error occurred: {e}", fg="red")
+        return
+
+    _audio_chat_turns(
+        chat_llm,
+        messages,
+        crew_tool_schema,
+        available_functions,
+        speaker_label,
+        speculator,
+        capture,
+        session_log,
+        monitor,
+    )
+
+
+def _audio_chat_turns(
+    chat_llm: LLM,
+    messages: list[dict[str, str]],
+    crew_tool_schema: dict[str, Any],
+    available_functions: dict[str, Any],
+    speaker_label: str,
+    speculator: CrewSpeculator | None,
+    capture: AudioCaptureService | None,
+    session_log: SessionLog | None,
+    monitor: ResourceMonitor | None = None,
 ) -> None:
-    """Audio-first chat loop: record speech, transcribe, run model, speak reply, print text."""
     from tempfile import NamedTemporaryFile
 
     while True:
@@ -329,7 +690,7 @@ def audio_chat_loop(
                 prefix="twin_crew_input_", suffix=".wav", delete=True
             ) as tmp_wav:
                 user_audio_path = tmp_wav.name
-                record_audio(user_audio_path)
+                record_audio(user_audio_path, capture=capture)
                 click.secho("Processing your speech...", fg="white")
                 transcribed_text = transcribe_audio(user_audio_path).strip()
 
@@ -349,6 +710,8 @@ def audio_chat_loop(
                     available_functions,
                     speaker_label,
                     suppress_print=True,
+                    speculator=speculator,
+                    session_log=session_log,
                 )
                 or ""
             )
@@ -357,7 +720,12 @@ def audio_chat_loop(
                 try:
                     speak_text(assistant_text, playback_speed=1.2)
                 finally:
+                    if capture is not None:
+                        # The microphone heard the reply; keep it out of the next pre-roll
+                        capture.clear_pre_roll()
                     click.secho(f"\n🔊 {speaker_label}: {assistant_text}\n", fg="green")
+            if monitor:
+                monitor.sample(messages)
 
         except KeyboardInterrupt:
             click.echo("\nExiting chat. Goodbye!")
@@ -369,6 +737,8 @@ def audio_chat_loop(
 
 def flush_input() -> None:
     """Flush any pending input from the user."""
+    if is_replaying():
+        return
     if platform.system() == "Windows":
         import msvcrt
 
@@ -392,69 +762,60 @@ def get_agent_display_name(manager_agent: NamedAgent | None) -> str:
 
 def generate_crew_chat_inputs(crew: Crew, crew_name: str, chat_llm: LLM) -> ChatInputs:
     """Analyze the crew to construct ChatInputs containing name, description, and input fields."""
-    required_inputs: set[str] = fetch_required_inputs(crew)
+    # Compiled once; every lookup below reads the placeholder index
+    templates = PromptTemplates.from_crew(crew)
+    required_inputs: set[str] = fetch_required_inputs(crew, templates)
 
     input_fields: list[ChatInputField] = []
     for input_name in required_inputs:
-        description = generate_input_description_with_ai(input_name, crew, chat_llm)
+        description = generate_input_description_with_ai(
+            input_name, crew, chat_llm, templates
+        )
         input_fields.append(ChatInputField(name=input_name, description=description))
 
-    crew_description: str = generate_crew_description_with_ai(crew, chat_llm)
+    crew_description: str = generate_crew_description_with_ai(crew, chat_llm, templates)
     return ChatInputs(
         crew_name=crew_name, crew_description=crew_description, inputs=input_fields
     )
 
 
-def fetch_required_inputs(crew: Crew) -> set[str]:
+def fetch_required_inputs(
+    crew: Crew, templates: PromptTemplates | None = None
+) -> set[str]:
     """Extract placeholders from the crew's tasks and agents, e.g., {brain_dump}."""
-    placeholder_pattern = re.compile(r"\{(.+?)\}")
-    required_inputs: set[str] = set()
-
-    for task in crew.tasks:
-        text = f"{task.description or ''} {task.expected_output or ''}"
-        required_inputs.update(placeholder_pattern.findall(text))
-
-    for agent in crew.agents:
-        text = f"{agent.role or ''} {agent.goal or ''} {agent.backstory or ''}"
-        required_inputs.update(placeholder_pattern.findall(text))
-
-    return required_inputs
+    templates = templates or PromptTemplates.from_crew(crew)
+    return set(templates.required_inputs)
+
+
+def _owner_context(
+    templates: PromptTemplates, owner_kind: OwnerKind, owner: str
+) -> list[str]:
+    """Context lines for one task or agent, with placeholders shown by name."""
+    if owner_kind == "task":
+        fields = templates.tasks[owner]
+        return [
+            f"Task Description: {fields['description'].plain_text}",
+            f"Expected Output: {fields['expected_output'].plain_text}",
+        ]
+    fields = templates.agents[owner]
+    return [
+        f"Agent Role: {fields['role'].plain_text}",
+        f"Agent Goal: {fields['goal'].plain_text}",
+        f"Agent Backstory: {fields['backstory'].plain_text}",
+    ]
 
 
 def generate_input_description_with_ai(
-    input_name: str, crew: Crew, chat_llm: LLM
+    input_name: str,
+    crew: Crew,
+    chat_llm: LLM,
+    templates: PromptTemplates | None = None,
 ) -> str:
     """Generate a concise input description using AI based on crew context (same behavior as original)."""
+    templates = templates or PromptTemplates.from_crew(crew)
     context_texts: list[str] = []
-    placeholder_pattern = re.compile(r"\{(.+?)\}")
-
-    for task in crew.tasks:
-        if f"{{{input_name}}}" in (task.description or "") or f"{{{input_name}}}" in (
-            task.expected_output or ""
-        ):
-            task_description = placeholder_pattern.sub(
-                lambda m: m.group(1), task.description or ""
-            )
-            expected_output = placeholder_pattern.sub(
-                lambda m: m.group(1), task.expected_output or ""
-            )
-            context_texts.append(f"Task Description: {task_description}")
-            context_texts.append(f"Expected Output: {expected_output}")
-
-    for agent in crew.agents:
-        if (
-            f"{{{input_name}}}" in (agent.role or "")
-            or f"{{{input_name}}}" in (agent.goal or "")
-            or f"{{{input_name}}}" in (agent.backstory or "")
-        ):
-            agent_role = placeholder_pattern.sub(lambda m: m.group(1), agent.role or "")
-            agent_goal = placeholder_pattern.sub(lambda m: m.group(1), agent.goal or "")
-            agent_backstory = placeholder_pattern.sub(
-                lambda m: m.group(1), agent.backstory or ""
-            )
-            context_texts.append(f"Agent Role: {agent_role}")
-            context_texts.append(f"Agent Goal: {agent_goal}")
-            context_texts.append(f"Agent Backstory: {agent_backstory}")
+    for owner_kind, owner in templates.owners_using(input_name):
+        context_texts.extend(_owner_context(templates, owner_kind, owner))
 
     context: str = "\n".join(context_texts)
     if not context:
@@ -466,34 +827,23 @@ def generate_input_description_with_ai(
         "Context:\n"
         f"{context}"
     )
-    response: str = chat_llm.call(messages=[{"role": "user", "content": prompt}])
+    response: str = call_chat_llm(
+        llm_for_call_site(chat_llm, "input_description"),
+        messages=[{"role": "user", "content": prompt}],
+    )
     return response.strip()
 
 
-def generate_crew_description_with_ai(crew: Crew, chat_llm: LLM) -> str:
+def generate_crew_description_with_ai(
+    crew: Crew, chat_llm: LLM, templates: PromptTemplates | None = None
+) -> str:
     """Generate a short crew description from tasks and agents (same behavior as original)."""
+    templates = templates or PromptTemplates.from_crew(crew)
     context_texts: list[str] = []
-    placeholder_pattern = re.compile(r"\{(.+?)\}")
-
-    for task in crew.tasks:
-        task_description = placeholder_pattern.sub(
-            lambda m: m.group(1), task.description or ""
-        )
-        expected_output = placeholder_pattern.sub(
-            lambda m: m.group(1), task.expected_output or ""
-        )
-        context_texts.append(f"Task Description: {task_description}")
-        context_texts.append(f"Expected Output: {expected_output}")
-
-    for agent in crew.agents:
-        agent_role = placeholder_pattern.sub(lambda m: m.group(1), agent.role or "")
-        agent_goal = placeholder_pattern.sub(lambda m: m.group(1), agent.goal or "")
-        agent_backstory = placeholder_pattern.sub(
-            lambda m: m.group(1), agent.backstory or ""
-        )
-        context_texts.append(f"Agent Role: {agent_role}")
-        context_texts.append(f"Agent Goal: {agent_goal}")
-        context_texts.append(f"Agent Backstory: {agent_backstory}")
+    for task_name in templates.tasks:
+        context_texts.extend(_owner_context(templates, "task", task_name))
+    for agent_name in templates.agents:
+        context_texts.extend(_owner_context(templates, "agent", agent_name))
 
     context: str = "\n".join(context_texts)
     if not context:
@@ -505,7 +855,10 @@ def generate_crew_description_with_ai(crew: Crew, chat_llm: LLM) -> str:
         "Context:\n"
         f"{context}"
     )
-    response: str = chat_llm.call(messages=[{"role": "user", "content": prompt}])
+    response: str = call_chat_llm(
+        llm_for_call_site(chat_llm, "crew_description"),
+        messages=[{"role": "user", "content": prompt}],
+    )
     return response.strip()
 
 
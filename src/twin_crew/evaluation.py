@@ -0,0 +1,293 @@
+"""
+Dataset-driven evaluation sweeps for `train` and `test`.
+
+`run_test_sweep` fans every (case, iteration) pair of the dataset out across a
+process pool. Each worker builds its own crew, runs it once under crewAI's
+`CrewEvaluator`, and returns the task scores, wall-clock latency and token
+usage. The results are combined into one JSON report.
+
+`run_training` stays sequential on purpose: crewAI training asks for human
+feedback on every task, and only one run at a time can own the terminal.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import statistics
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import click
+import yaml
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import TRAINING_DATA_FILE
+from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+from crewai.utilities.evaluators.task_evaluator import TaskEvaluator
+from crewai.utilities.training_handler import CrewTrainingHandler
+
+from twin_crew.crew import TwinCrew
+from twin_crew.prompt_templates import load_prompt_templates
+from twin_crew.rate_limiter import LIMITS_SHARE_ENV_VAR, governed
+
+DEFAULT_EVAL_DATASET = Path(__file__).parent / "config" / "eval_inputs.yaml"
+
+
+@dataclass(frozen=True)
+class EvalCase:
+    name: str
+    inputs: dict[str, str]
+
+
+@dataclass
+class IterationResult:
+    case: str
+    iteration: int
+    # Keyed by task name: a gated task that is skipped leaves no score behind
+    task_scores: dict[str, float] = field(default_factory=dict)
+    task_seconds: dict[str, float] = field(default_factory=dict)
+    latency_s: float = 0.0
+    token_usage: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def crew_score(self) -> float | None:
+        scores = list(self.task_scores.values())
+        return statistics.fmean(scores) if scores else None
+
+
+class TaskKeyedEvaluator(CrewEvaluator):
+    """
+    `CrewEvaluator` that scores through the rate governor and remembers which
+    task each score belongs to.
+    """
+
+    def __init__(self, crew: Any, openai_model_name: str) -> None:
+        super().__init__(crew, openai_model_name)
+        # The score tables are class attributes; keep this run's scores separate
+        self.tasks_scores: defaultdict[int, list[float]] = defaultdict(list)
+        self.run_execution_times: defaultdict[int, list[float]] = defaultdict(list)
+        self.scored_tasks: list[str] = []
+
+    def _evaluator_agent(self) -> Any:
+        evaluator_agent = super()._evaluator_agent()
+        evaluator_agent.llm = governed(evaluator_agent.llm)
+        return evaluator_agent
+
+    def evaluate(self, task_output: TaskOutput) -> None:
+        super().evaluate(task_output)
+        self.scored_tasks.append(task_output.name or task_output.description)
+
+
+def load_eval_dataset(path: Path | None = None) -> list[EvalCase]:
+    """
+    Read the evaluation cases, merging `defaults` into each case's inputs, and
+    check every case against the crew's prompt templates before anything runs.
+    """
+    with (path or DEFAULT_EVAL_DATASET).open(encoding="utf-8") as dataset_file:
+        dataset: dict[str, Any] = yaml.safe_load(dataset_file) or {}
+    defaults: dict[str, str] = {
+        name: str(value).strip()
+        for name, value in (dataset.get("defaults") or {}).items()
+    }
+    templates = load_prompt_templates()
+    cases: list[EvalCase] = []
+    for position, case in enumerate(dataset.get("cases") or []):
+        inputs = {
+            **defaults,
+            **{name: str(value).strip() for name, value in case["inputs"].items()},
+        }
+        templates.validate_inputs(inputs)
+        cases.append(EvalCase(case.get("name") or f"case_{position + 1}", inputs))
+    if not cases:
+        raise ValueError("The evaluation dataset has no cases.")
+    return cases
+
+
+def _init_worker(limits_share: float) -> None:
+    # Each worker has its own rate governor; together they stay within the budget
+    os.environ[LIMITS_SHARE_ENV_VAR] = str(limits_share)
+
+
+def run_test_iteration(
+    case: EvalCase, iteration: int, openai_model_name: str
+) -> IterationResult:
+    """One scored crew run; executed inside a pool worker."""
+    result = IterationResult(case=case.name, iteration=iteration)
+    start_time = time.monotonic()
+    try:
+        crew = TwinCrew().crew().copy()
+        evaluator = TaskKeyedEvaluator(crew, openai_model_name)
+        evaluator.set_iteration(1)
+        output = crew.kickoff(inputs=case.inputs)
+        result.task_scores = dict(
+            zip(evaluator.scored_tasks, evaluator.tasks_scores[1], strict=True)
+        )
+        result.task_seconds = dict(
+            zip(evaluator.scored_tasks, evaluator.run_execution_times[1], strict=True)
+        )
+        usage = output.token_usage
+        result.token_usage = {
+            "total_tokens": usage.total_tokens,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "successful_requests": usage.successful_requests,
+        }
+    except Exception as e:  # noqa: BLE001
+        result.error = "".join(traceback.format_exception_only(type(e), e)).strip()
+    result.latency_s = time.monotonic() - start_time
+    return result
+
+
+def _percentile(samples: list[float], quantile: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(quantile * (len(ordered) - 1))))]
+
+
+def _summarize(results: list[IterationResult]) -> dict[str, Any]:
+    succeeded = [result for result in results if result.error is None]
+    scores = [r.crew_score for r in succeeded if r.crew_score is not None]
+    latencies = [result.latency_s for result in succeeded]
+    task_scores: dict[str, list[float]] = defaultdict(list)
+    for result in succeeded:
+        for task_name, score in result.task_scores.items():
+            task_scores[task_name].append(score)
+    return {
+        "iterations": len(results),
+        "failed": len(results) - len(succeeded),
+        "crew_score_avg": statistics.fmean(scores) if scores else None,
+        "task_score_avg": {
+            task_name: statistics.fmean(scores)
+            for task_name, scores in task_scores.items()
+        },
+        "latency_p50_s": _percentile(latencies, 0.50),
+        "latency_p95_s": _percentile(latencies, 0.95),
+        "total_tokens": sum(
+            result.token_usage.get("total_tokens", 0) for result in succeeded
+        ),
+    }
+
+
+def run_test_sweep(
+    cases: list[EvalCase],
+    n_iterations: int,
+    openai_model_name: str,
+    concurrency: int = 4,
+    report_path: Path | None = None,
+) -> dict[str, Any]:
+    """Score every case `n_iterations` times across `concurrency` processes."""
+    jobs = [
+        (case, iteration) for case in cases for iteration in range(1, n_iterations + 1)
+    ]
+    concurrency = max(1, min(concurrency, len(jobs)))
+    click.secho(
+        f"Running {len(jobs)} scored crew runs ({len(cases)} cases x {n_iterations} "
+        f"iterations) across {concurrency} processes...",
+        fg="cyan",
+    )
+
+    results: list[IterationResult] = []
+    sweep_start = time.monotonic()
+    # spawn: workers must not inherit the parent's threads or open connections
+    with ProcessPoolExecutor(
+        max_workers=concurrency,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(1.0 / concurrency,),
+    ) as pool:
+        futures = [
+            pool.submit(run_test_iteration, case, iteration, openai_model_name)
+            for case, iteration in jobs
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = (
+                f"error: {result.error}"
+                if result.error
+                else f"score {result.crew_score or 0:.1f}"
+            )
+            click.secho(
+                f"[{len(results)}/{len(jobs)}] {result.case} #{result.iteration}: "
+                f"{status} in {result.latency_s:.0f}s",
+                fg="red" if result.error else "white",
+            )
+
+    results.sort(key=lambda result: (result.case, result.iteration))
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "evaluator_model": openai_model_name,
+        "concurrency": concurrency,
+        "wall_clock_s": time.monotonic() - sweep_start,
+        "overall": _summarize(results),
+        "cases": {
+            case.name: _summarize([r for r in results if r.case == case.name])
+            for case in cases
+        },
+        "iterations": [
+            {**asdict(result), "crew_score": result.crew_score} for result in results
+        ],
+    }
+    if report_path is not None:
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        click.secho(f"Evaluation report written to {report_path}", fg="green")
+    print_report(report)
+    return report
+
+
+def print_report(report: dict[str, Any]) -> None:
+    click.secho("\nEvaluation summary", fg="cyan", bold=True)
+    rows = [*report["cases"].items(), ("overall", report["overall"])]
+    click.echo(
+        f"{'case':<28} {'runs':>5} {'failed':>6} {'score':>6} "
+        f"{'p50 s':>7} {'p95 s':>7} {'tokens':>9}"
+    )
+    for name, summary in rows:
+        score = summary["crew_score_avg"]
+        p50, p95 = summary["latency_p50_s"], summary["latency_p95_s"]
+        click.echo(
+            f"{name:<28} {summary['iterations']:>5} {summary['failed']:>6} "
+            f"{'-' if score is None else f'{score:.2f}':>6} "
+            f"{'-' if p50 is None else f'{p50:.0f}':>7} "
+            f"{'-' if p95 is None else f'{p95:.0f}':>7} "
+            f"{summary['total_tokens']:>9}"
+        )
+    click.echo(f"Wall clock: {report['wall_clock_s']:.0f}s")
+
+
+def run_training(cases: list[EvalCase], n_iterations: int, filename: str) -> None:
+    """
+    crewAI training over the dataset: `n_iterations` rounds through every case,
+    one run at a time (each task asks for human feedback), then the collected
+    feedback is distilled into `filename` as `Crew.train` does.
+    """
+    train_crew = TwinCrew().crew().copy()
+    train_crew._setup_for_training(filename)
+    schedule = [case for _ in range(n_iterations) for case in cases]
+    for train_iteration, case in enumerate(schedule):
+        click.secho(
+            f"Training run {train_iteration + 1}/{len(schedule)}: {case.name}",
+            fg="cyan",
+        )
+        # Iteration numbers key the feedback file, so they must stay unique
+        train_crew._train_iteration = train_iteration
+        train_crew.kickoff(inputs=case.inputs)
+
+    training_data = CrewTrainingHandler(TRAINING_DATA_FILE).load()
+    for agent in train_crew.agents:
+        if training_data.get(str(agent.id)):
+            result = TaskEvaluator(agent).evaluate_training_data(
+                training_data=training_data, agent_id=str(agent.id)
+            )
+            CrewTrainingHandler(filename).save_trained_data(
+                agent_id=str(agent.role), trained_data=result.model_dump()
+            )
@@ -0,0 +1,262 @@
+"""
+Opt-in per-turn resource instrumentation for long chat sessions.
+
+After every turn the monitor records traced Python memory (tracemalloc), the
+process RSS, live threads (grouped by name), open file descriptors, leftover
+temp files from recording and TTS, and the transcript size. Each sample is one
+JSON line in the metrics file. Once past a warm-up, growth per turn is the
+least-squares slope over the samples so far. A metric whose slope exceeds its
+threshold is flagged as a suspected leak, together with the allocation sites
+that grew most since the warm-up snapshot.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any
+
+import numpy as np
+
+# Files a turn creates and should remove: TTS output in the working directory,
+# recorded microphone input in the temp directory.
+DEFAULT_TEMP_FILE_GLOBS: tuple[str, ...] = (
+    "tts_*.mp3",
+    os.path.join(tempfile.gettempdir(), "twin_crew_input_*.wav"),
+)
+_THREAD_NUMBER = re.compile(r"[-_ ]?\d+")
+
+
+@dataclass(frozen=True)
+class LeakThresholds:
+    """Largest growth per turn that is not reported as a leak."""
+
+    traced_bytes: float = 64 * 1024
+    rss_bytes: float = 256 * 1024
+    threads: float = 0.02
+    open_fds: float = 0.02
+    temp_files: float = 0.01
+
+
+@dataclass
+class TurnSample:
+    turn: int
+    timestamp: float
+    traced_bytes: int
+    traced_peak_bytes: int
+    rss_bytes: int | None
+    threads: int
+    thread_kinds: dict[str, int]
+    open_fds: int | None
+    temp_files: int
+    transcript_messages: int
+    transcript_chars: int
+    growth_per_turn: dict[str, float] = field(default_factory=dict)
+    leaks: dict[str, float] = field(default_factory=dict)
+    top_allocations: list[str] = field(default_factory=list)
+
+
+def current_rss_bytes() -> int | None:
+    """Resident set size; peak RSS where /proc is unavailable (macOS)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def open_fd_count() -> int | None:
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    return None
+
+
+def thread_kinds() -> dict[str, int]:
+    """Live threads grouped by name with numbering removed (Thread-12 -> Thread)."""
+    return dict(
+        Counter(
+            _THREAD_NUMBER.sub("", thread.name) or thread.name
+            for thread in threading.enumerate()
+        )
+    )
+
+
+class ResourceMonitor:
+    """Samples resource usage after each turn and writes it as JSON lines."""
+
+    def __init__(
+        self,
+        metrics_path: Path,
+        thresholds: LeakThresholds | None = None,
+        warmup_turns: int = 10,
+        min_samples: int = 20,
+        snapshot_every: int = 1,
+        top_allocations: int = 3,
+        temp_file_globs: Sequence[str] = DEFAULT_TEMP_FILE_GLOBS,
+        on_sample: Callable[[TurnSample], None] | None = None,
+    ) -> None:
+        self.metrics_path = metrics_path
+        self.thresholds = thresholds or LeakThresholds()
+        self.warmup_turns = warmup_turns
+        self.min_samples = min_samples
+        self.snapshot_every = max(1, snapshot_every)
+        self.top_allocations = top_allocations
+        self.temp_file_globs = tuple(temp_file_globs)
+        self.on_sample = on_sample
+        self.turn = 0
+        self._series: dict[str, list[float]] = {
+            name: [] for name in asdict(self.thresholds)
+        }
+        self._turns: list[int] = []
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._top_allocations: list[str] = []
+        self._owns_tracing = False
+        self._file: IO[str] | None = None
+        self._started_at = 0.0
+
+    def __enter__(self) -> ResourceMonitor:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def start(self) -> None:
+        if self._file is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.metrics_path.open("a", encoding="utf-8")
+        self._started_at = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._write({"type": "summary", **self.summary()})
+        self._file.close()
+        self._file = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def sample(self, messages: list[dict[str, str]]) -> TurnSample:
+        """Record one turn; call after the turn's reply has been delivered."""
+        self.start()
+        self.turn += 1
+        traced_bytes, traced_peak_bytes = tracemalloc.get_traced_memory()
+        sample = TurnSample(
+            turn=self.turn,
+            timestamp=time.time(),
+            traced_bytes=traced_bytes,
+            traced_peak_bytes=traced_peak_bytes,
+            rss_bytes=current_rss_bytes(),
+            threads=threading.active_count(),
+            thread_kinds=thread_kinds(),
+            open_fds=open_fd_count(),
+            temp_files=sum(len(glob.glob(pattern)) for pattern in self.temp_file_globs),
+            transcript_messages=len(messages),
+            transcript_chars=sum(len(m.get("content") or "") for m in messages),
+        )
+        if self.turn == self.warmup_turns:
+            self._baseline = _snapshot()
+        elif self.turn > self.warmup_turns:
+            self._record_growth(sample)
+        self._write({"type": "turn", **asdict(sample)})
+        if self.on_sample is not None:
+            self.on_sample(sample)
+        return sample
+
+    def summary(self) -> dict[str, Any]:
+        growth = self._growth_per_turn()
+        return {
+            "turns": self.turn,
+            "elapsed_s": time.monotonic() - self._started_at,
+            "growth_per_turn": growth,
+            "leaks": self._leaks(growth),
+            "top_allocations": self._top_allocations,
+        }
+
+    def _record_growth(self, sample: TurnSample) -> None:
+        self._turns.append(sample.turn)
+        for name, values in self._series.items():
+            value = getattr(sample, name)
+            values.append(float(value) if value is not None else np.nan)
+        sample.growth_per_turn = self._growth_per_turn()
+        sample.leaks = self._leaks(sample.growth_per_turn)
+        if self._baseline is not None and (
+            sample.leaks or sample.turn % self.snapshot_every == 0
+        ):
+            self._top_allocations = self._allocation_growth()
+        sample.top_allocations = self._top_allocations
+
+    def _growth_per_turn(self) -> dict[str, float]:
+        if len(self._turns) < self.min_samples:
+            return {}
+        turns = np.asarray(self._turns, dtype=np.float64)
+        growth: dict[str, float] = {}
+        for name, values in self._series.items():
+            series = np.asarray(values, dtype=np.float64)
+            known = ~np.isnan(series)
+            if known.sum() >= self.min_samples:
+                growth[name] = float(np.polyfit(turns[known], series[known], 1)[0])
+        return growth
+
+    def _leaks(self, growth: dict[str, float]) -> dict[str, float]:
+        limits = asdict(self.thresholds)
+        return {name: slope for name, slope in growth.items() if slope > limits[name]}
+
+    def _allocation_growth(self) -> list[str]:
+        assert self._baseline is not None
+        snapshot = _snapshot()
+        return [
+            f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+            f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks)"
+            for stat in snapshot.compare_to(self._baseline, "lineno")[
+                : self.top_allocations
+            ]
+        ]
+
+    def _write(self, record: dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # The monitor's own bookkeeping is not what we are looking for
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
@@ -1,15 +1,39 @@
 #!/usr/bin/env python
 import sys
 import warnings
+from datetime import datetime
+from pathlib import Path
 
 import click
 
+from twin_crew.audio_capture import DEFAULT_PRE_ROLL_SECONDS
+from twin_crew.chat_server import serve_chat
 from twin_crew.crew import TwinCrew
-from twin_crew.custom_chat import run_custom_chat
+from twin_crew.custom_chat import (
+    initialize_chat_llm,
+    prepare_chat_context,
+    run_custom_chat,
+)
+from twin_crew.evaluation import load_eval_dataset, run_test_sweep, run_training
 from twin_crew.named_agent import NamedAgent
+from twin_crew.prompt_templates import load_prompt_templates
+from twin_crew.rate_limiter import Priority, priority_scope
+from twin_crew.session_trace import session_trace
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Inputs for running the crew without the chat: one value per prompt placeholder
+SAMPLE_INPUTS: dict[str, str] = {
+    "startup_idea": (
+        "An AI agent marketplace where small businesses hire pre-built agents for "
+        "bookkeeping, scheduling and customer support, paying per completed task."
+    ),
+    "enrique_background": (
+        "Machine Learning Engineer who spent three years at Graphite building "
+        "AI-powered content systems, now focused on agentic systems."
+    ),
+}
+
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
@@ -20,33 +44,26 @@ def run() -> None:
     """
     Run the crew.
     """
-    # TODO: Revise after updates
-    inputs = {
-        "brain_dump": """
-            I would like to write a newsletter around "why is it feels so hard to get a new AI software job or land AI clients".
-            It really comes down to a few idea. They are competing the same way everyone else is by updating their linkedin bio and sending out
-            hundreds of resumes to the same 100 companies that are receiving thousands of applicants which makes them a needle in the hay stack.
-            They aren't opening themselves up to luck by posting their work on YouTube and LinkedIn. Software is one of the only jobs where you can
-            actively demo what you're capabale of in a very public settings. Take advantage of that.
-            """
-    }
+    inputs = dict(SAMPLE_INPUTS)
 
     try:
-        TwinCrew().crew().kickoff(inputs=inputs)
+        # Fail before any agent runs when an input the prompts need is missing
+        load_prompt_templates().validate_inputs(inputs)
+        # Set TWIN_CREW_RECORD / TWIN_CREW_REPLAY to a cassette path to trace the run
+        with session_trace(), priority_scope(Priority.BATCH):
+            TwinCrew().crew().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}") from e
 
 
 def train() -> None:
     """
-    Train the crew for a given number of iterations.
+    Train the crew for a given number of iterations over the evaluation dataset.
+    Usage: train <n_iterations> <filename> [dataset.yaml]
     """
-    # TODO: Revise after updates
-    inputs = {"topic": "AI LLMs"}
     try:
-        TwinCrew().crew().train(
-            n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs
-        )
+        cases = load_eval_dataset(Path(sys.argv[3]) if len(sys.argv) > 3 else None)
+        run_training(cases, n_iterations=int(sys.argv[1]), filename=sys.argv[2])
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}") from e
@@ -64,15 +81,41 @@ def replay() -> None:
         raise Exception(f"An error occurred while replaying the crew: {e}") from e
 
 
-def test() -> None:
+@click.command()
+@click.argument("n_iterations", type=int)
+@click.argument("openai_model_name")
+@click.option(
+    "--dataset",
+    "dataset_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Evaluation dataset to score instead of config/eval_inputs.yaml.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    envvar="TWIN_CREW_TEST_CONCURRENCY",
+    help="Worker processes running scored crew runs at the same time.",
+)
+def test(
+    n_iterations: int,
+    openai_model_name: str,
+    dataset_path: Path | None,
+    concurrency: int,
+) -> None:
     """
-    Test the crew execution and returns the results.
+    Test the crew over the evaluation dataset and report scores, latency and tokens.
     """
-    # TODO: Revise after updates
-    inputs = {"topic": "AI LLMs"}
     try:
-        TwinCrew().crew().test(
-            n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs
+        cases = load_eval_dataset(dataset_path)
+        run_test_sweep(
+            cases,
+            n_iterations=n_iterations,
+            openai_model_name=openai_model_name,
+            concurrency=concurrency,
+            report_path=Path(f"test_report_{datetime.now():%Y%m%d_%H%M%S}.json"),
         )
 
     except Exception as e:
@@ -81,7 +124,71 @@ def test() -> None:
 
 @click.command()
 @click.option("--audio", is_flag=True, default=False, help="Enable voice mode.")
-def chat(audio: bool) -> None:
+@click.option(
+    "--speculative",
+    is_flag=True,
+    default=False,
+    help="Pre-run the crew's first task while you confirm a crew call.",
+)
+@click.option(
+    "--pre-roll-seconds",
+    type=float,
+    default=DEFAULT_PRE_ROLL_SECONDS,
+    show_default=True,
+    help="Audio kept from just before each recording starts (audio mode).",
+)
+@click.option(
+    "--save",
+    "save_session",
+    is_flag=True,
+    default=False,
+    help="Save the transcript to the session store so it can be resumed.",
+)
+@click.option(
+    "--resume",
+    "resume_session_id",
+    default=None,
+    help="Resume a saved session by ID, skipping crew analysis.",
+)
+@click.option(
+    "--record",
+    "record_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Record every LLM/STT/TTS call of this session to a cassette file.",
+)
+@click.option(
+    "--replay",
+    "replay_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Replay a recorded cassette offline instead of calling the providers.",
+)
+@click.option(
+    "--replay-latency-scale",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Multiplier applied to recorded latencies on replay (0 disables sleeps).",
+)
+@click.option(
+    "--instrument",
+    "instrument_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Append per-turn memory, thread and temp-file metrics to this JSONL file.",
+)
+def chat(
+    audio: bool,
+    speculative: bool,
+    pre_roll_seconds: float,
+    save_session: bool,
+    resume_session_id: str | None,
+    record_path: str | None,
+    replay_path: str | None,
+    replay_latency_scale: float,
+    instrument_path: str | None,
+) -> None:
     """
     Start interactive chat with Enrique, your AI newsletter strategy assistant.
     """
@@ -90,7 +197,71 @@ def chat(audio: bool) -> None:
         # Get the manager agent
         manager_agent: NamedAgent = crew_instance.chat_manager()
 
-        run_custom_chat(crew_instance.crew(), manager_agent, audio_mode=audio)
+        with session_trace(record_path, replay_path, replay_latency_scale):
+            run_custom_chat(
+                crew_instance.crew(),
+                manager_agent,
+                audio_mode=audio,
+                speculative=speculative,
+                pre_roll_seconds=pre_roll_seconds,
+                resume_session_id=resume_session_id,
+                save_session=save_session,
+                instrument_path=instrument_path,
+            )
 
     except Exception as e:
         raise Exception(f"An error occurred while starting chat: {e}") from e
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8765, show_default=True, type=int)
+@click.option(
+    "--max-crew-jobs",
+    default=2,
+    show_default=True,
+    help="Crew runs allowed to execute at the same time.",
+)
+@click.option(
+    "--max-queued-crew-jobs",
+    default=8,
+    show_default=True,
+    help="Crew runs allowed to wait for a slot before requests are rejected.",
+)
+@click.option(
+    "--session-ttl-seconds",
+    default=1800.0,
+    show_default=True,
+    help="Idle time after which a session is dropped to make room for new ones.",
+)
+def serve(
+    host: str,
+    port: int,
+    max_crew_jobs: int,
+    max_queued_crew_jobs: int,
+    session_ttl_seconds: float,
+) -> None:
+    """
+    Serve the chat over HTTP to many concurrent sessions from one process.
+    """
+    try:
+        crew_instance: TwinCrew = TwinCrew()
+        manager_agent: NamedAgent = crew_instance.chat_manager()
+        crew = crew_instance.crew()
+        chat_llm = initialize_chat_llm(crew, manager_agent)
+        if not chat_llm:
+            return
+
+        click.secho("Analyzing crew and required inputs...", fg="white")
+        context = prepare_chat_context(crew, manager_agent, chat_llm)
+        serve_chat(
+            context,
+            host,
+            port,
+            max_crew_jobs,
+            max_queued_crew_jobs,
+            session_ttl_seconds,
+        )
+
+    except Exception as e:
+        raise Exception(f"An error occurred while starting the chat server: {e}") from e
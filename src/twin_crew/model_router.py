@@ -0,0 +1,171 @@
+"""
+Per-call-site and per-agent model routing configured in `config/models.yaml`.
+
+Lightweight chat calls (input descriptions, crew description, greeting,
+presenter) go to a small, low-latency tier; the dialogue and the agents use
+the flagship tier. A tier can declare a latency budget and a fallback tier:
+the budget is sent as the request timeout, and calls that exceed it are
+aborted and answered by the fallback instead.
+"""
+
+import copy
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import click
+import yaml
+from crewai.llm import LLM
+
+from twin_crew.rate_limiter import GovernedLLM
+from twin_crew.resilience import metrics
+
+MODELS_CONFIG_ENV_VAR = "TWIN_CREW_MODELS_CONFIG"
+DEFAULT_MODELS_CONFIG = Path(__file__).parent / "config" / "models.yaml"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    latency_budget_seconds: float | None = None
+    fallback: str | None = None
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """True for timeouts raised by litellm/openai/httpx or the standard library."""
+    return isinstance(exc, TimeoutError) or any(
+        "Timeout" in klass.__name__ for klass in type(exc).__mro__
+    )
+
+
+class RoutedLLM(GovernedLLM):
+    """LLM bound to a tier; falls back to another tier when over its latency budget."""
+
+    def __init__(
+        self,
+        tier: ModelTier,
+        router: "ModelRouter",
+        fallback: LLM | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(model=tier.model, **kwargs)
+        self.tier = tier
+        self.router = router
+        self.fallback = fallback
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str:
+        budget = self.tier.latency_budget_seconds
+        # Calls with tools may run the crew inside, so they are never cut short
+        if self.fallback is None or budget is None or tools:
+            return super().call(messages, tools, callbacks, available_functions)
+        # Abort the primary request at the budget, so it is not left running
+        # (and billed) next to the fallback call
+        bounded = copy.copy(self)
+        bounded.fallback = None
+        bounded.timeout = min(budget, self.timeout) if self.timeout else budget
+        try:
+            return bounded.call(messages, tools, callbacks, available_functions)
+        except Exception as exc:
+            if not is_timeout(exc):
+                raise
+            metrics.increment(f"LLM tier {self.tier.name}", "latency_fallbacks")
+            click.secho(
+                f"{self.model} exceeded its {budget:.0f}s budget; "
+                f"falling back to {self.fallback.model}",
+                fg="yellow",
+            )
+            return str(
+                self.fallback.call(messages, tools, callbacks, available_functions)
+            )
+
+
+class ModelRouter:
+    """Resolves call sites and agents to tiers and builds one LLM per tier."""
+
+    def __init__(
+        self,
+        tiers: dict[str, ModelTier],
+        call_sites: dict[str, str],
+        agents: dict[str, str],
+    ) -> None:
+        for owner, tier_name in {**call_sites, **agents}.items():
+            if tier_name not in tiers:
+                raise ValueError(f"'{owner}' is routed to unknown tier '{tier_name}'.")
+        for tier in tiers.values():
+            if tier.fallback is not None and tier.fallback not in tiers:
+                raise ValueError(
+                    f"Tier '{tier.name}' falls back to unknown tier '{tier.fallback}'."
+                )
+        self.tiers = tiers
+        self.call_sites = call_sites
+        self.agents = agents
+        self._llms: dict[str, RoutedLLM] = {}
+
+    @classmethod
+    def from_yaml(cls, path: Path) -> "ModelRouter":
+        with path.open(encoding="utf-8") as config_file:
+            config: dict[str, Any] = yaml.safe_load(config_file) or {}
+        tiers = {
+            name: ModelTier(
+                name=name,
+                model=str(spec["model"]),
+                latency_budget_seconds=spec.get("latency_budget_seconds"),
+                fallback=spec.get("fallback"),
+            )
+            for name, spec in (config.get("tiers") or {}).items()
+        }
+        return cls(tiers, config.get("call_sites") or {}, config.get("agents") or {})
+
+    def llm_for_tier(self, tier_name: str, _seen: frozenset[str] = frozenset()) -> LLM:
+        if tier_name in _seen:
+            raise ValueError(f"Fallback cycle through tier '{tier_name}'.")
+        if tier_name not in self._llms:
+            tier = self.tiers[tier_name]
+            fallback = (
+                self.llm_for_tier(tier.fallback, _seen | {tier_name})
+                if tier.fallback
+                else None
+            )
+            self._llms[tier_name] = RoutedLLM(tier, self, fallback)
+        return self._llms[tier_name]
+
+    def tier_for_call_site(self, call_site: str) -> ModelTier | None:
+        tier_name = self.call_sites.get(call_site)
+        return self.tiers[tier_name] if tier_name else None
+
+    def for_call_site(self, call_site: str) -> LLM | None:
+        tier_name = self.call_sites.get(call_site)
+        return self.llm_for_tier(tier_name) if tier_name else None
+
+    def for_agent(self, agent_name: str) -> LLM | None:
+        """The agent's LLM, or None to keep crewAI's default for unmapped agents."""
+        tier_name = self.agents.get(agent_name)
+        return self.llm_for_tier(tier_name) if tier_name else None
+
+
+@lru_cache(maxsize=1)
+def load_model_router() -> ModelRouter:
+    """Process-wide router from TWIN_CREW_MODELS_CONFIG or config/models.yaml."""
+    configured = os.getenv(MODELS_CONFIG_ENV_VAR)
+    return ModelRouter.from_yaml(
+        Path(configured) if configured else DEFAULT_MODELS_CONFIG
+    )
+
+
+def llm_for_call_site(chat_llm: LLM, call_site: str) -> LLM:
+    """
+    The LLM a chat call site should use. Routing applies only when the chat LLM
+    itself came from the router; otherwise (custom or mock LLMs) it is used as is.
+    """
+    if isinstance(chat_llm, RoutedLLM):
+        return chat_llm.router.for_call_site(call_site) or chat_llm
+    return chat_llm
@@ -0,0 +1,165 @@
+"""
+Prompt templates compiled once from the agents' and tasks' text fields.
+
+Each field (agent role/goal/backstory, task description/expected_output) is
+parsed a single time into literal and placeholder segments, and an index maps
+every placeholder to the (owner, field) pairs that use it. Crew analysis then
+answers "which inputs are required" and "where is this input used" by lookup
+instead of rescanning every string, and missing inputs are reported up front
+instead of failing inside `kickoff`.
+
+Placeholders keep the `{name}` semantics used by crew analysis: the shortest
+`{...}` run on one line.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal
+
+import yaml
+from crewai import Crew
+
+PLACEHOLDER_PATTERN = re.compile(r"\{(.+?)\}")
+
+AGENT_FIELDS: tuple[str, ...] = ("role", "goal", "backstory")
+TASK_FIELDS: tuple[str, ...] = ("description", "expected_output")
+CONFIG_DIR = Path(__file__).parent / "config"
+
+OwnerKind = Literal["agent", "task"]
+
+
+class MissingInputsError(ValueError):
+    """Raised when inputs needed by the crew's prompts are not provided."""
+
+    def __init__(self, missing: dict[str, tuple[TemplateField, ...]]) -> None:
+        self.missing = missing
+        details = "; ".join(
+            f"{name} (used in {', '.join(str(usage) for usage in usages)})"
+            for name, usages in sorted(missing.items())
+        )
+        super().__init__(f"Missing crew inputs: {details}")
+
+
+@dataclass(frozen=True)
+class TemplateField:
+    owner_kind: OwnerKind
+    owner: str
+    field: str
+
+    def __str__(self) -> str:
+        return f"{self.owner_kind} {self.owner}.{self.field}"
+
+
+class PromptTemplate:
+    """One text field split into literals (even indexes) and placeholders (odd)."""
+
+    __slots__ = ("text", "_segments", "placeholders", "plain_text")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._segments: list[str] = PLACEHOLDER_PATTERN.split(text)
+        self.placeholders: frozenset[str] = frozenset(self._segments[1::2])
+        # Placeholders shown by name, as crew analysis presents them to the LLM
+        self.plain_text: str = "".join(self._segments)
+
+
+class PromptTemplates:
+    """Compiled templates for every agent and task plus the placeholder index."""
+
+    def __init__(
+        self,
+        agents: Mapping[str, Mapping[str, str]],
+        tasks: Mapping[str, Mapping[str, str]],
+    ) -> None:
+        self.agents = {
+            name: {
+                field: PromptTemplate(str(fields.get(field) or ""))
+                for field in AGENT_FIELDS
+            }
+            for name, fields in agents.items()
+        }
+        self.tasks = {
+            name: {
+                field: PromptTemplate(str(fields.get(field) or ""))
+                for field in TASK_FIELDS
+            }
+            for name, fields in tasks.items()
+        }
+        index: dict[str, list[TemplateField]] = {}
+        for owner_kind, owners in (("agent", self.agents), ("task", self.tasks)):
+            for owner, templates in owners.items():
+                for field, template in templates.items():
+                    for name in template.placeholders:
+                        index.setdefault(name, []).append(
+                            TemplateField(owner_kind, owner, field)  # type: ignore[arg-type]
+                        )
+        self.index: dict[str, tuple[TemplateField, ...]] = {
+            name: tuple(usages) for name, usages in index.items()
+        }
+        self.required_inputs: frozenset[str] = frozenset(self.index)
+
+    @classmethod
+    def from_yaml(cls, agents_path: Path, tasks_path: Path) -> PromptTemplates:
+        return cls(_load_yaml(agents_path), _load_yaml(tasks_path))
+
+    @classmethod
+    def from_crew(cls, crew: Crew) -> PromptTemplates:
+        """Compile the (already loaded) text of a crew's agents and tasks."""
+        agents: dict[str, dict[str, str]] = {}
+        for position, agent in enumerate(crew.agents):
+            key = agent.role if agent.role not in agents else f"{agent.role}_{position}"
+            agents[key] = {field: getattr(agent, field) for field in AGENT_FIELDS}
+        tasks = {
+            task.name or f"task_{position}": {
+                field: getattr(task, field) for field in TASK_FIELDS
+            }
+            for position, task in enumerate(crew.tasks)
+        }
+        return cls(agents, tasks)
+
+    def usages(self, input_name: str) -> tuple[TemplateField, ...]:
+        return self.index.get(input_name, ())
+
+    def template(self, usage: TemplateField) -> PromptTemplate:
+        owners = self.agents if usage.owner_kind == "agent" else self.tasks
+        return owners[usage.owner][usage.field]
+
+    def owners_using(self, input_name: str) -> list[tuple[OwnerKind, str]]:
+        """(kind, owner) pairs that mention `input_name`: tasks, then agents."""
+        owners = {(usage.owner_kind, usage.owner) for usage in self.usages(input_name)}
+        ordered: list[tuple[OwnerKind, str]] = [("task", name) for name in self.tasks]
+        ordered += [("agent", name) for name in self.agents]
+        return [owner for owner in ordered if owner in owners]
+
+    def missing_inputs(
+        self, inputs: Iterable[str]
+    ) -> dict[str, tuple[TemplateField, ...]]:
+        provided = set(inputs)
+        return {
+            name: usages for name, usages in self.index.items() if name not in provided
+        }
+
+    def validate_inputs(self, inputs: Mapping[str, Any]) -> None:
+        """Raise `MissingInputsError` naming every absent input and where it is used."""
+        missing = self.missing_inputs(inputs)
+        if missing:
+            raise MissingInputsError(missing)
+
+
+def _load_yaml(path: Path) -> dict[str, dict[str, str]]:
+    with path.open(encoding="utf-8") as config_file:
+        loaded: dict[str, dict[str, str]] = yaml.safe_load(config_file) or {}
+    return loaded
+
+
+@lru_cache(maxsize=1)
+def load_prompt_templates() -> PromptTemplates:
+    """Templates compiled once per process from config/agents.yaml and tasks.yaml."""
+    return PromptTemplates.from_yaml(
+        CONFIG_DIR / "agents.yaml", CONFIG_DIR / "tasks.yaml"
+    )
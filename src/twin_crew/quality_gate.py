@@ -0,0 +1,277 @@
+"""
+Local quality gate between the pitch draft and the refinement task.
+
+The draft is checked for its length (a word range and a minimum number of
+paragraphs), a heading or a telling phrase for every required section, and
+enough co-founder-fit keywords. When every check passes, `refine_pitch_for_fit_task`
+(a crewAI `ConditionalTask`) is skipped and the draft becomes the crew's final
+output. Each decision is printed and counted in the shared metrics, so the
+saved agent runs can be measured; with TWIN_CREW_QUALITY_GATE_LOG set, it is
+also appended to that JSONL file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import click
+import yaml
+from crewai import Crew, Task
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+
+from twin_crew.resilience import metrics
+from twin_crew.tools.word_counter_tool import count_words
+
+QUALITY_GATE_CONFIG_ENV_VAR = "TWIN_CREW_QUALITY_GATE_CONFIG"
+QUALITY_GATE_LOG_ENV_VAR = "TWIN_CREW_QUALITY_GATE_LOG"
+DEFAULT_QUALITY_GATE_CONFIG = Path(__file__).parent / "config" / "quality_gate.yaml"
+
+
+# Blocks shorter than this (headings, sign-offs) are not counted as paragraphs
+PARAGRAPH_MIN_WORDS = 12
+
+
+def _alternatives(cues: Sequence[str]) -> str:
+    # Any run of whitespace between the words of a cue matches
+    return "|".join(
+        r"\s+".join(re.escape(word) for word in cue.split())
+        for cue in cues
+        if cue.strip()
+    )
+
+
+def _cue_pattern(cues: Sequence[str]) -> re.Pattern[str]:
+    return re.compile(rf"\b(?:{_alternatives(cues)})\b", re.IGNORECASE)
+
+
+def _section_pattern(name: str, cues: Mapping[str, Sequence[str]]) -> re.Pattern[str]:
+    """
+    A section is present when a line opens with one of its `headings` (as a
+    Markdown heading, in bold, numbered, or as a label followed by a colon) or
+    the text uses one of its `phrases`. Single words are too common in any
+    pitch to show a section, so phrases must have at least two.
+    """
+    headings = [cue for cue in cues.get("headings") or [] if cue.strip()]
+    phrases = [cue for cue in cues.get("phrases") or [] if cue.strip()]
+    single_words = [phrase for phrase in phrases if len(phrase.split()) < 2]
+    if single_words:
+        raise ValueError(
+            f"Quality gate section '{name}' has single-word phrases: "
+            f"{', '.join(single_words)}"
+        )
+    if not headings and not phrases:
+        raise ValueError(f"Quality gate section '{name}' has no headings or phrases.")
+    patterns: list[str] = []
+    if headings:
+        heading = _alternatives(headings)
+        patterns.append(
+            rf"^[ \t]*(?:(?:\#{{1,6}}|\*\*|__|\d+[.)])[ \t]*)+(?:{heading})\b"
+        )
+        patterns.append(rf"^[ \t]*(?:{heading})\b[^\n.:]{{0,30}}:")
+    if phrases:
+        patterns.append(rf"\b(?:{_alternatives(phrases)})\b")
+    return re.compile("|".join(patterns), re.IGNORECASE | re.MULTILINE)
+
+
+def count_paragraphs(text: str) -> int:
+    """Blank-line separated blocks of at least PARAGRAPH_MIN_WORDS words."""
+    return sum(
+        1
+        for block in re.split(r"\n[ \t]*\n", text)
+        if count_words(block) >= PARAGRAPH_MIN_WORDS
+    )
+
+
+@dataclass
+class GateDecision:
+    task: str
+    passed: bool
+    word_count: int
+    paragraph_count: int
+    missing_sections: list[str] = field(default_factory=list)
+    fit_keywords: list[str] = field(default_factory=list)
+    reasons: list[str] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+
+
+class QualityGate:
+    """Cue patterns are compiled once; `check` is a handful of regex scans."""
+
+    def __init__(
+        self,
+        max_words: int,
+        min_words: int,
+        min_paragraphs: int,
+        required_sections: Mapping[str, Mapping[str, Sequence[str]]],
+        fit_keywords: Sequence[str],
+        min_fit_keywords: int,
+        enabled: bool = True,
+        log_path: Path | None = None,
+    ) -> None:
+        self.max_words = max_words
+        self.min_words = min_words
+        self.min_paragraphs = min_paragraphs
+        self.min_fit_keywords = min_fit_keywords
+        self.enabled = enabled
+        self.log_path = log_path
+        self._sections = {
+            name: _section_pattern(name, cues)
+            for name, cues in required_sections.items()
+        }
+        self._fit_keywords = {
+            keyword.lower(): _cue_pattern([keyword]) for keyword in fit_keywords
+        }
+        self._log_lock = threading.Lock()
+
+    @classmethod
+    def from_yaml(cls, path: Path, log_path: Path | None = None) -> QualityGate:
+        with path.open(encoding="utf-8") as config_file:
+            config: dict[str, Any] = yaml.safe_load(config_file) or {}
+        return cls(
+            max_words=int(config.get("max_words", 200)),
+            min_words=int(config.get("min_words", 0)),
+            min_paragraphs=int(config.get("min_paragraphs", 0)),
+            required_sections=config.get("required_sections") or {},
+            fit_keywords=config.get("fit_keywords") or [],
+            min_fit_keywords=int(config.get("min_fit_keywords", 0)),
+            enabled=bool(config.get("enabled", True)),
+            log_path=log_path,
+        )
+
+    def check(self, text: str, task: str = "") -> GateDecision:
+        word_count = count_words(text)
+        paragraph_count = count_paragraphs(text)
+        missing = [name for name, cue in self._sections.items() if not cue.search(text)]
+        fit = [
+            keyword for keyword, cue in self._fit_keywords.items() if cue.search(text)
+        ]
+        reasons: list[str] = []
+        if word_count > self.max_words:
+            reasons.append(f"{word_count} words > {self.max_words}")
+        if word_count < self.min_words:
+            reasons.append(f"{word_count} words < {self.min_words}")
+        if paragraph_count < self.min_paragraphs:
+            reasons.append(f"{paragraph_count} paragraphs < {self.min_paragraphs}")
+        if missing:
+            reasons.append(f"missing sections: {', '.join(missing)}")
+        if len(fit) < self.min_fit_keywords:
+            reasons.append(f"{len(fit)} fit keywords < {self.min_fit_keywords}")
+        return GateDecision(
+            task=task,
+            passed=not reasons,
+            word_count=word_count,
+            paragraph_count=paragraph_count,
+            missing_sections=missing,
+            fit_keywords=fit,
+            reasons=reasons,
+        )
+
+    def should_refine(self, draft: TaskOutput, task: str = "") -> bool:
+        """ConditionalTask condition: refine unless the draft passes every check."""
+        if not self.enabled:
+            return True
+        decision = self.check(draft.raw or "", task)
+        self._record(decision)
+        return not decision.passed
+
+    def condition_for(self, task_name: str) -> Any:
+        return lambda draft: self.should_refine(draft, task_name)
+
+    def _record(self, decision: GateDecision) -> None:
+        metrics.increment("Quality gate", "skipped" if decision.passed else "refined")
+        if decision.passed:
+            click.secho(
+                f"Quality gate passed ({decision.word_count} words, "
+                f"{len(decision.fit_keywords)} fit keywords): skipping {decision.task}",
+                fg="green",
+            )
+        else:
+            click.secho(
+                f"Quality gate failed ({'; '.join(decision.reasons)}): "
+                f"running {decision.task}",
+                fg="yellow",
+            )
+        if self.log_path is None:
+            return
+        try:
+            with self._log_lock:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.log_path.open("a", encoding="utf-8") as log_file:
+                    log_file.write(json.dumps(asdict(decision)) + "\n")
+        except OSError as e:
+            click.secho(f"Quality gate log skipped: {e}", fg="yellow")
+
+
+def default_gate_log() -> Path | None:
+    """TWIN_CREW_QUALITY_GATE_LOG if set; decisions are not written to disk otherwise."""
+    configured = os.getenv(QUALITY_GATE_LOG_ENV_VAR)
+    return Path(configured).expanduser() if configured else None
+
+
+@lru_cache(maxsize=1)
+def load_quality_gate() -> QualityGate:
+    """Process-wide gate from TWIN_CREW_QUALITY_GATE_CONFIG or the packaged config."""
+    configured = os.getenv(QUALITY_GATE_CONFIG_ENV_VAR)
+    return QualityGate.from_yaml(
+        Path(configured) if configured else DEFAULT_QUALITY_GATE_CONFIG,
+        log_path=default_gate_log(),
+    )
+
+
+class GatedCrew(Crew):
+    """
+    Crew whose conditional tasks are gated on the output just before them.
+
+    Written against crewAI 0.100.0 (pinned in pyproject.toml): it overrides
+    the private `Crew._handle_conditional_task` and re-types the objects that
+    `Crew.copy` returns, so check both whenever crewAI is upgraded.
+
+    crewAI 0.100 looks up that output as `task_outputs[task_index - 1]`, but a
+    sequential crew only keeps the latest output, so a conditional third task
+    raises IndexError. `Crew.copy` also rebuilds plain `Crew`/`Task` objects,
+    which would drop the conditions; `copy` restores them.
+    """
+
+    def _handle_conditional_task(
+        self,
+        task: ConditionalTask,
+        task_outputs: list[TaskOutput],
+        futures: list[Any],
+        task_index: int,
+        was_replayed: bool,
+    ) -> TaskOutput | None:
+        if futures:
+            task_outputs = self._process_async_tasks(futures, was_replayed)
+            futures.clear()
+        previous_output = task_outputs[-1] if task_outputs else None
+        if previous_output is not None and not task.should_execute(previous_output):
+            skipped_task_output = task.get_skipped_task_output()
+            if not was_replayed:
+                self._store_execution_log(task, skipped_task_output, task_index)
+            return skipped_task_output
+        return None
+
+    def copy(self) -> GatedCrew:
+        copied: GatedCrew = super().copy()
+        # Same fields, only the behavior differs, so the instances can be re-typed
+        # (true of crewAI 0.100.0; recheck on upgrade)
+        copied.__class__ = GatedCrew
+        for original, clone in zip(self.tasks, copied.tasks, strict=True):
+            if isinstance(original, ConditionalTask):
+                _restore_condition(clone, original)
+        return copied
+
+
+def _restore_condition(clone: Task, original: ConditionalTask) -> None:
+    clone.__class__ = ConditionalTask
+    clone.condition = original.condition
@@ -0,0 +1,265 @@
+"""
+Process-wide token-bucket rate limiter and concurrency governor for provider calls.
+
+Every chat LLM, crew agent, evaluator and STT/TTS call acquires a permit from
+one shared `RateGovernor` that enforces requests-per-minute and tokens-per-minute budgets
+plus a concurrency cap. Waiting callers are served by priority class, so
+interactive chat turns go ahead of batch crew work. Queue waits are recorded
+in the shared resilience metrics. `GovernedLLM` is the crewAI LLM that takes
+a permit for every call; `governed` converts any other LLM into one.
+"""
+
+from __future__ import annotations
+
+import heapq
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import yaml
+from crewai.llm import LLM
+
+from twin_crew.resilience import metrics
+
+LIMITS_CONFIG_ENV_VAR = "TWIN_CREW_LIMITS_CONFIG"
+LIMITS_SHARE_ENV_VAR = "TWIN_CREW_LIMITS_SHARE"
+DEFAULT_LIMITS_CONFIG = Path(__file__).parent / "config" / "limits.yaml"
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "twin_crew_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """
+    Run provider calls made in this block at `priority`. New threads do not
+    inherit it; start them under `contextvars.copy_context().run` instead.
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def estimate_tokens(*payloads: Any) -> int:
+    """Rough token count (~4 characters per token) of request payloads."""
+    characters = sum(
+        len(payload)
+        if isinstance(payload, str)
+        else len(json.dumps(payload, default=str))
+        for payload in payloads
+        if payload
+    )
+    return max(1, characters // 4)
+
+
+class TokenBucket:
+    """Refills continuously at `capacity` per minute; may go negative on settle."""
+
+    def __init__(self, capacity_per_minute: float) -> None:
+        self.capacity = float(capacity_per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(
+            self.capacity,
+            self.level + (now - self._updated_at) * self.refill_per_second,
+        )
+        self._updated_at = now
+
+    def seconds_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Refund (positive) or charge (negative) after the real usage is known."""
+        self._refill()
+        self.level = min(self.capacity, self.level + delta)
+
+
+@dataclass
+class Permit:
+    priority: Priority
+    estimated_tokens: int
+    waited_seconds: float
+    holds_slot: bool
+
+
+class RateGovernor:
+    """Priority-ordered admission against RPM, TPM and concurrency budgets."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int,
+        interactive_reserve: int = 0,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.interactive_reserve = min(interactive_reserve, max_concurrency - 1)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+    def _slot_limit(self, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return self.max_concurrency
+        return self.max_concurrency - self.interactive_reserve
+
+    @contextmanager
+    def acquire(
+        self,
+        estimated_tokens: int,
+        priority: Priority | None = None,
+        hold_slot: bool = True,
+    ) -> Iterator[Permit]:
+        """
+        Block until the call may start. `hold_slot=False` charges the rate budgets
+        without occupying a concurrency slot, for calls that run tools (and so
+        possibly a whole crew) inside them.
+        """
+        priority = _current_priority.get() if priority is None else priority
+        waiter = (int(priority), next(self._sequence))
+        enqueued_at = time.monotonic()
+
+        with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    wait_seconds: float | None = None
+                    if self._waiters[0] == waiter and (
+                        not hold_slot or self.in_flight < self._slot_limit(priority)
+                    ):
+                        wait_seconds = max(
+                            self.requests.seconds_until(1),
+                            self.tokens.seconds_until(estimated_tokens),
+                        )
+                        if wait_seconds == 0.0:
+                            break
+                    self._condition.wait(timeout=wait_seconds)
+            finally:
+                # Also leave the queue when the wait is interrupted, or the
+                # waiter would stay at the head and block every later caller
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            if hold_slot:
+                self.in_flight += 1
+
+        waited = time.monotonic() - enqueued_at
+        metrics.record_latency(f"Governor wait ({priority.name.lower()})", waited)
+        if waited > 0.05:
+            metrics.increment("Governor", f"queued_{priority.name.lower()}")
+        permit = Permit(priority, estimated_tokens, waited, hold_slot)
+        try:
+            yield permit
+        finally:
+            with self._condition:
+                if hold_slot:
+                    self.in_flight -= 1
+                self._condition.notify_all()
+
+    def settle(self, permit: Permit, actual_tokens: int) -> None:
+        """Correct the token budget once the response size is known."""
+        with self._condition:
+            self.tokens.adjust(permit.estimated_tokens - actual_tokens)
+            self._condition.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "requests_available": round(self.requests.level, 1),
+                "tokens_available": round(self.tokens.level, 1),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_governor() -> RateGovernor:
+    """
+    Process-wide governor from TWIN_CREW_LIMITS_CONFIG or config/limits.yaml.
+    Worker processes that split one account's budget set TWIN_CREW_LIMITS_SHARE
+    to the fraction of the limits each of them may use.
+    """
+    configured = os.getenv(LIMITS_CONFIG_ENV_VAR)
+    path = Path(configured) if configured else DEFAULT_LIMITS_CONFIG
+    with path.open(encoding="utf-8") as config_file:
+        limits: dict[str, Any] = yaml.safe_load(config_file) or {}
+    share = float(os.getenv(LIMITS_SHARE_ENV_VAR) or 1.0)
+    return RateGovernor(
+        requests_per_minute=float(limits.get("requests_per_minute", 500)) * share,
+        tokens_per_minute=float(limits.get("tokens_per_minute", 150000)) * share,
+        max_concurrency=max(1, int(int(limits.get("max_concurrency", 8)) * share)),
+        interactive_reserve=int(limits.get("interactive_reserve", 0)),
+    )
+
+
+class GovernedLLM(LLM):
+    """crewAI LLM whose every call takes a permit from the process-wide governor."""
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str:
+        governor = get_governor()
+        # A call that can run tools must not pin a concurrency slot while the
+        # crew (whose agents need slots too) runs inside it.
+        with governor.acquire(
+            estimate_tokens(messages, tools), hold_slot=not available_functions
+        ) as permit:
+            response = super().call(messages, tools, callbacks, available_functions)
+            governor.settle(permit, estimate_tokens(messages, tools, response))
+        return str(response)
+
+
+# LLM.__init__ keeps each of its arguments as an attribute of the same name
+_LLM_INIT_ARGS: tuple[str, ...] = tuple(inspect.signature(LLM.__init__).parameters)[1:]
+
+
+def governed(llm: LLM) -> GovernedLLM:
+    """`llm` itself if it is already governed, else a governed LLM with its settings."""
+    if isinstance(llm, GovernedLLM):
+        return llm
+    return GovernedLLM(
+        **{name: getattr(llm, name) for name in _LLM_INIT_ARGS if hasattr(llm, name)}
+    )
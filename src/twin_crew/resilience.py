@@ -0,0 +1,452 @@
+"""
+Shared retry/timeout policy for STT, TTS and chat LLM calls.
+
+Provides deadline-aware per-attempt timeouts, retryable-error classification,
+full-jitter exponential backoff, a per-operation circuit breaker, hedged
+requests for latency-sensitive calls, and in-process latency/retry metrics.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from queue import Empty, SimpleQueue
+from typing import Any, TypeVar
+
+import click
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying; any other 4xx is a client error that cannot succeed.
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({408, 409, 425, 429})
+# Exception class names used by openai/litellm/httpx for transient failures.
+RETRYABLE_ERROR_NAMES: tuple[str, ...] = (
+    "Timeout",
+    "RateLimit",
+    "APIConnection",
+    "ServiceUnavailable",
+    "InternalServer",
+    "RemoteProtocol",
+    "ReadError",
+    "ConnectError",
+)
+
+
+class AttemptTimeoutError(TimeoutError):
+    """A single attempt took longer than its timeout."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Calls are short-circuited because the operation keeps failing."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How an operation is retried, timed out and hedged."""
+
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 8.0
+    # Per-attempt timeout; None leaves attempts unbounded (e.g. calls running tools).
+    attempt_timeout_seconds: float | None = 30.0
+    # Overall budget across attempts and backoff sleeps.
+    deadline_seconds: float | None = 90.0
+    # Launch a duplicate attempt if the first has not finished after this delay.
+    hedge_after_seconds: float | None = None
+    # When False the attempt runs on the caller's thread and only the timeout
+    # forwarded to the SDK bounds it, so nothing keeps running once we give up.
+    abandon_on_timeout: bool = True
+
+
+STT_POLICY = RetryPolicy(
+    attempt_timeout_seconds=30.0, deadline_seconds=60.0, hedge_after_seconds=4.0
+)
+TTS_POLICY = RetryPolicy(attempt_timeout_seconds=30.0, deadline_seconds=60.0)
+CHAT_POLICY = RetryPolicy(attempt_timeout_seconds=60.0, deadline_seconds=150.0)
+# Tool-calling turns run the whole crew inside the call: each LLM request is
+# bounded by the forwarded timeout, but the crew run itself is never abandoned.
+CHAT_TOOL_POLICY = RetryPolicy(
+    attempt_timeout_seconds=60.0, deadline_seconds=None, abandon_on_timeout=False
+)
+
+
+def status_code_of(exc: BaseException) -> int | None:
+    """Best-effort HTTP status of an SDK exception."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Retry transient failures (timeouts, connection errors, 429, 5xx) only."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = status_code_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    if isinstance(exc, TimeoutError | ConnectionError):
+        return True
+    return any(
+        name in klass.__name__
+        for klass in type(exc).__mro__
+        for name in RETRYABLE_ERROR_NAMES
+    )
+
+
+def full_jitter_delay(attempt: int, policy: RetryPolicy) -> float:
+    """AWS-style full jitter: uniform in [0, min(cap, base * 2**(attempt-1))]."""
+    ceiling = min(
+        policy.max_delay_seconds, policy.base_delay_seconds * (2 ** (attempt - 1))
+    )
+    return random.uniform(0.0, ceiling)
+
+
+class ResilienceMetrics:
+    """Thread-safe rolling latency samples and retry counters per operation."""
+
+    def __init__(self, window: int = 512) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def increment(self, operation_name: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(operation_name, {})
+            counters[counter] = counters.get(counter, 0) + amount
+
+    def record_latency(self, operation_name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.setdefault(
+                operation_name, deque(maxlen=self._window)
+            )
+            samples.append(seconds)
+
+    def percentile(
+        self, operation_name: str, quantile: float, min_samples: int = 1
+    ) -> float | None:
+        with self._lock:
+            samples = sorted(self._latencies.get(operation_name, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(quantile * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Counters plus p50/p95/p99 latency (seconds) for every operation."""
+        with self._lock:
+            names = set(self._latencies) | set(self._counters)
+            counters = {name: dict(self._counters.get(name, {})) for name in names}
+        report: dict[str, dict[str, Any]] = {}
+        for name in sorted(names):
+            report[name] = {
+                **counters[name],
+                "p50_s": self.percentile(name, 0.50),
+                "p95_s": self.percentile(name, 0.95),
+                "p99_s": self.percentile(name, 0.99),
+            }
+        return report
+
+    def summary_lines(self) -> list[str]:
+        """One human-readable line per operation, for end-of-session reports."""
+        lines: list[str] = []
+        for name, stats in self.snapshot().items():
+            counters = ", ".join(
+                f"{key}={value}"
+                for key, value in sorted(stats.items())
+                if not key.endswith("_s")
+            )
+            latencies = ", ".join(
+                f"{key[:-2]}={stats[key]:.2f}s"
+                for key in ("p50_s", "p95_s", "p99_s")
+                if stats[key] is not None
+            )
+            lines.append(
+                f"{name}: " + "; ".join(part for part in (counters, latencies) if part)
+            )
+        return lines
+
+
+metrics = ResilienceMetrics()
+
+
+def print_metrics_summary() -> None:
+    """Print retry counters and latency percentiles collected this session."""
+    lines = metrics.summary_lines()
+    if not lines:
+        return
+    click.secho("\nCall metrics this session:", fg="white")
+    for line in lines:
+        click.secho(f"  {line}", fg="white")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures and rejects
+    calls until `reset_timeout_seconds` pass; then lets one trial call through.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self) -> bool:
+        """Raise while open; True when this call is the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout_seconds or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"{self.name} circuit is open after repeated failures; "
+                    f"retry in {max(0.0, self.reset_timeout_seconds - elapsed):.0f}s."
+                )
+            # Half-open: allow a single trial call
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a trial that gave no verdict, so the next call can be the trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if (
+                self._opened_at is not None
+                or self._consecutive_failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                metrics.increment(self.name, "circuit_opened")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(operation_name: str) -> CircuitBreaker:
+    """Process-wide circuit breaker shared by every call of an operation."""
+    with _breakers_lock:
+        if operation_name not in _breakers:
+            _breakers[operation_name] = CircuitBreaker(operation_name)
+        return _breakers[operation_name]
+
+
+def run_with_timeout(func: Callable[[], T], timeout_seconds: float | None) -> T:
+    """
+    Run `func` on a helper thread and stop waiting after `timeout_seconds`.
+    Python threads cannot be killed, so a timed-out call is abandoned, not
+    cancelled; `func` must also pass the timeout to the SDK so the abandoned
+    request is aborted at the same moment instead of running on.
+    """
+    if timeout_seconds is None:
+        return func()
+
+    outcome: SimpleQueue[tuple[bool, Any]] = SimpleQueue()
+
+    def target() -> None:
+        try:
+            outcome.put((True, func()))
+        except BaseException as exc:  # noqa: BLE001
+            outcome.put((False, exc))
+
+    # Carry context variables (e.g. the rate governor priority) into the thread
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), daemon=True).start()
+    try:
+        succeeded, value = outcome.get(timeout=max(0.0, timeout_seconds))
+    except Empty:
+        raise AttemptTimeoutError(
+            f"Attempt timed out after {timeout_seconds:.1f}s"
+        ) from None
+    if not succeeded:
+        raise value
+    result: T = value
+    return result
+
+
+def hedged(
+    func: Callable[[], T], hedge_after_seconds: float, timeout_seconds: float | None
+) -> T:
+    """
+    Start `func`; if it has not finished after `hedge_after_seconds`, start a
+    duplicate and return whichever succeeds first. Fails only if both fail.
+    """
+    outcome: SimpleQueue[tuple[bool, Any]] = SimpleQueue()
+
+    def target() -> None:
+        try:
+            outcome.put((True, func()))
+        except BaseException as exc:  # noqa: BLE001
+            outcome.put((False, exc))
+
+    def launch() -> None:
+        # Each copy runs in its own snapshot of the caller's context variables
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(target,), daemon=True).start()
+
+    start_time = time.monotonic()
+    launch()
+    launched = 1
+    failures = 0
+
+    while True:
+        elapsed = time.monotonic() - start_time
+        if timeout_seconds is not None and elapsed >= timeout_seconds:
+            raise AttemptTimeoutError(
+                f"Hedged attempt timed out after {timeout_seconds:.1f}s"
+            )
+        waits: list[float] = []
+        if timeout_seconds is not None:
+            waits.append(timeout_seconds - elapsed)
+        if launched == 1:
+            waits.append(hedge_after_seconds - elapsed)
+        try:
+            succeeded, value = outcome.get(
+                timeout=max(0.0, min(waits)) if waits else None
+            )
+        except Empty:
+            if launched == 1 and time.monotonic() - start_time >= hedge_after_seconds:
+                launched = 2
+                metrics.increment("hedge", "launched")
+                launch()
+            continue
+        if succeeded:
+            result: T = value
+            return result
+        failures += 1
+        # Keep waiting while the other copy is still in flight
+        if failures >= launched:
+            raise value
+
+
+def call_with_resilience(
+    operation_name: str,
+    func: Callable[[float | None], T],
+    policy: RetryPolicy = RetryPolicy(),
+    retryable: Callable[[BaseException], bool] = is_retryable,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    """
+    Call `func(timeout_seconds)` under `policy`. `func` receives the time left
+    for the attempt so it can forward it to the SDK; the timeout is enforced
+    here as well. Non-retryable errors propagate immediately.
+    """
+    breaker = breaker or breaker_for(operation_name)
+    deadline = (
+        None
+        if policy.deadline_seconds is None
+        else time.monotonic() + policy.deadline_seconds
+    )
+
+    for attempt in range(1, policy.max_attempts + 1):
+        is_trial = breaker.before_call()
+
+        attempt_timeout = policy.attempt_timeout_seconds
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            attempt_timeout = (
+                remaining
+                if attempt_timeout is None
+                else min(attempt_timeout, remaining)
+            )
+
+        def attempt_call(timeout: float | None = attempt_timeout) -> T:
+            return func(timeout)
+
+        start_time = time.monotonic()
+        try:
+            if policy.hedge_after_seconds is not None:
+                # Hedge at the observed p95 once we have enough samples
+                hedge_delay = (
+                    metrics.percentile(operation_name, 0.95, min_samples=20)
+                    or policy.hedge_after_seconds
+                )
+                result = hedged(attempt_call, hedge_delay, attempt_timeout)
+            elif not policy.abandon_on_timeout:
+                result = attempt_call()
+            else:
+                result = run_with_timeout(attempt_call, attempt_timeout)
+        except Exception as exc:
+            should_retry = retryable(exc)
+            if should_retry:
+                breaker.record_failure()
+            else:
+                # A client error still proves the provider is reachable
+                breaker.record_success()
+            metrics.increment(
+                operation_name, "retryable_errors" if should_retry else "fatal_errors"
+            )
+            out_of_time = deadline is not None and time.monotonic() >= deadline
+            if not should_retry or attempt == policy.max_attempts or out_of_time:
+                click.secho(
+                    f"{operation_name} failed (attempt {attempt}/{policy.max_attempts}): {exc}",
+                    fg="red" if not should_retry else "yellow",
+                )
+                raise
+
+            sleep_seconds = full_jitter_delay(attempt, policy)
+            if deadline is not None and sleep_seconds >= deadline - time.monotonic():
+                # The backoff would use up the budget; no time is left to retry
+                click.secho(
+                    f"{operation_name} failed (attempt {attempt}/{policy.max_attempts}): {exc}; "
+                    "no time left to retry",
+                    fg="yellow",
+                )
+                raise
+            metrics.increment(operation_name, "retries")
+            click.secho(
+                f"{operation_name} failed (attempt {attempt}/{policy.max_attempts}): {exc}; "
+                f"retrying in {sleep_seconds:.2f}s",
+                fg="yellow",
+            )
+            time.sleep(sleep_seconds)
+            if deadline is not None and time.monotonic() >= deadline:
+                # Never start an attempt with a non-positive timeout
+                raise
+            continue
+        else:
+            latency = time.monotonic() - start_time
+            breaker.record_success()
+            metrics.increment(operation_name, "successes")
+            p95 = metrics.percentile(operation_name, 0.95, min_samples=20)
+            if p95 is not None and latency > p95:
+                metrics.increment(operation_name, "tail_latency_calls")
+            metrics.record_latency(operation_name, latency)
+            return result
+        finally:
+            if is_trial:
+                # Covers KeyboardInterrupt/SystemExit too, which record no
+                # verdict; a stuck trial would keep the breaker half-open
+                breaker.release_trial()
+
+    raise RuntimeError(f"{operation_name}: retry policy allows no attempts")
@@ -0,0 +1,255 @@
+"""
+Semantic cache of chat replies to standalone, off-topic questions.
+
+Questions such as "who are you?" or "what can you do?" recur across turns and
+sessions, in many phrasings, and each one would otherwise cost a full-history
+chat LLM call. A question is embedded locally with a signed hashing vectorizer
+(word unigrams, word bigrams and in-word character trigrams, L2-normalized)
+and compared by cosine similarity against a float32 matrix of example
+phrasings of each META_QUESTIONS intent. The best-matching intent above the
+threshold is the cache key, so "who exactly are you?" is served the reply
+given to "who are you?".
+
+The cache is opt-in (TWIN_CREW_RESPONSE_CACHE=1) and only answers context-free
+meta questions: a message may only use words from the phrasings of the intent
+it matches (plus FILLER_WORDS), must not answer a crew proposal, and its reply
+must not have called the crew tool or be a proposal itself. Because those
+questions do not depend on the conversation, entries are keyed by the system
+message and intent: a reply is reused in later turns and in other sessions of
+the same crew. The least recently used entry is evicted when the cache is full.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from twin_crew.speculation import looks_like_crew_proposal
+
+RESPONSE_CACHE_ENV_VAR = "TWIN_CREW_RESPONSE_CACHE"
+DEFAULT_DIMENSIONS = 2048
+DEFAULT_CAPACITY = 512
+# Calibrated on held-out phrasings that pass the vocabulary check: paraphrases
+# of a meta question mostly score 0.7-1.0 against their closest example, while
+# vague questions built from the same words ("tell me", "what about you?")
+# score at most 0.65.
+DEFAULT_THRESHOLD = 0.7
+# Longer messages usually carry details of their own; they are never cached.
+DEFAULT_MAX_QUESTION_WORDS = 16
+
+# Questions whose answer does not depend on the conversation so far, by intent.
+# A message may only use words from the phrasings of the intent it matches.
+META_QUESTIONS: dict[str, tuple[str, ...]] = {
+    "identity": (
+        "who are you",
+        "what are you",
+        "who is this",
+        "tell me who you are",
+        "tell me about yourself",
+        "introduce yourself",
+    ),
+    "name": (
+        "what is your name",
+        "what's your name",
+        "what should i call you",
+        "what do i call you",
+    ),
+    "real_person": (
+        "are you a bot",
+        "are you an ai",
+        "are you a real person",
+        "are you human",
+        "am i talking to a bot",
+        "is this a bot",
+    ),
+    "creator": ("who made you", "who built you", "who created you", "who made this"),
+    "occupation": ("what do you do", "what do you do for work"),
+    "capabilities": (
+        "what can you do",
+        "what can you do for me",
+        "what are you able to do",
+        "what can you help me with",
+        "how can you help me",
+        "how could you help me",
+        "what can i ask you",
+    ),
+    "how_it_works": ("how does this work", "what is this", "how do i use this", "help"),
+}
+# Words that never change which question is asked: they may be added to any
+# phrasing and are dropped before embedding. Any other word outside the
+# matched phrasings is a detail the cached reply would not address ("who are
+# your investors?").
+FILLER_WORDS = frozenset(
+    "actually again and anyway exactly hello hey hi just ok okay or please quick "
+    "really so the then um well".split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class HashingVectorizer:
+    """Stateless text embedding: hashed, signed n-gram counts in `dimensions` bins."""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS) -> None:
+        self.dimensions = dimensions
+
+    @staticmethod
+    def features(text: str) -> list[str]:
+        words = _TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        features += [
+            f"b:{first} {second}"
+            for first, second in zip(words, words[1:], strict=False)
+        ]
+        for word in words:
+            padded = f" {word} "
+            features += [f"c:{padded[i : i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) for feature in self.features(text)),
+            dtype=np.uint32,
+        )
+        if hashes.size == 0:
+            return vector
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dimensions, signs)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    # The question the cached reply was given to, not the one just asked
+    question: str
+    response: str
+    similarity: float
+
+
+def last_assistant_turn(messages: list[dict[str, str]]) -> str:
+    return next(
+        (
+            message.get("content") or ""
+            for message in reversed(messages)
+            if message.get("role") == "assistant"
+        ),
+        "",
+    )
+
+
+def cache_namespace(system_message: str) -> int:
+    """Key for the persona and crew a reply was given under."""
+    return zlib.crc32(system_message.encode("utf-8"))
+
+
+class SemanticResponseCache:
+    """Bounded LRU of replies, keyed by the meta question intent a message matches."""
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_question_words: int = DEFAULT_MAX_QUESTION_WORDS,
+        vectorizer: HashingVectorizer | None = None,
+        meta_questions: dict[str, tuple[str, ...]] = META_QUESTIONS,
+    ) -> None:
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_question_words = max_question_words
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._lock = threading.Lock()
+        self._intents: list[str] = []
+        self._vocabularies: dict[str, frozenset[str]] = {}
+        examples = []
+        for intent, questions in meta_questions.items():
+            words = [_TOKEN_PATTERN.findall(question) for question in questions]
+            self._vocabularies[intent] = FILLER_WORDS.union(*words)
+            self._intents += [intent] * len(questions)
+            examples += [self._embed(question_words) for question_words in words]
+        self._examples = np.stack(examples)
+        self._entries: OrderedDict[tuple[int, str], tuple[str, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, question: str) -> tuple[str, float] | None:
+        """The meta question intent `question` paraphrases, with its similarity."""
+        words = _TOKEN_PATTERN.findall(question.lower())
+        if len(words) > self.max_question_words:
+            return None
+        vector = self._embed(words)
+        if not vector.any():
+            return None
+        similarities = self._examples @ vector
+        best = int(np.argmax(similarities))
+        intent, similarity = self._intents[best], float(similarities[best])
+        if similarity < self.threshold:
+            return None
+        if not self._vocabularies[intent].issuperset(words):
+            return None
+        return intent, similarity
+
+    def _embed(self, words: list[str]) -> np.ndarray:
+        return self.vectorizer.transform(
+            " ".join(word for word in words if word not in FILLER_WORDS)
+        )
+
+    def eligible(self, messages: list[dict[str, str]], user_input: str) -> bool:
+        """A meta question that does not answer a crew proposal."""
+        if looks_like_crew_proposal(last_assistant_turn(messages)):
+            return False
+        return self.match(user_input) is not None
+
+    def lookup(self, namespace: int, question: str) -> CacheHit | None:
+        matched = self.match(question)
+        if matched is None:
+            return None
+        intent, similarity = matched
+        with self._lock:
+            entry = self._entries.get((namespace, intent))
+            if entry is None:
+                return None
+            self._entries.move_to_end((namespace, intent))
+        cached_question, response = entry
+        return CacheHit(cached_question, response, similarity)
+
+    def store(self, namespace: int, question: str, response: str) -> None:
+        if looks_like_crew_proposal(response):
+            return
+        matched = self.match(question)
+        if matched is None:
+            return
+        intent, _ = matched
+        with self._lock:
+            self._entries[(namespace, intent)] = (question, response)
+            self._entries.move_to_end((namespace, intent))
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+
+_response_cache: SemanticResponseCache | None = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> SemanticResponseCache | None:
+    """Process-wide reply cache; only enabled with TWIN_CREW_RESPONSE_CACHE=1."""
+    global _response_cache
+    if os.getenv(RESPONSE_CACHE_ENV_VAR, "").strip().lower() not in {
+        "1",
+        "true",
+        "yes",
+    }:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = SemanticResponseCache()
+        return _response_cache
@@ -0,0 +1,244 @@
+"""
+Durable, append-only log of chat sessions in SQLite (WAL mode).
+
+A session row stores the warm chat context built by crew analysis (chat
+inputs, tool schema, system prompt, greeting, speaker label); message rows are
+appended as each turn happens and never rewritten. Both tables are keyed by
+session id, so resuming a session is an indexed lookup that restores the
+context and transcript without replaying history or calling the LLM.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import click
+from crewai.types.crew_chat import ChatInputs
+
+SESSION_DB_ENV_VAR = "TWIN_CREW_SESSION_DB"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    crew_name TEXT NOT NULL,
+    chat_inputs TEXT NOT NULL,
+    tool_schema TEXT NOT NULL,
+    system_message TEXT NOT NULL,
+    introductory_message TEXT NOT NULL,
+    speaker_label TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id),
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def default_session_db() -> Path:
+    """TWIN_CREW_SESSION_DB, else sessions.db under XDG_DATA_HOME/twin_crew."""
+    configured = os.getenv(SESSION_DB_ENV_VAR)
+    if configured:
+        return Path(configured).expanduser()
+    xdg_data = os.getenv("XDG_DATA_HOME")
+    base = Path(xdg_data).expanduser() if xdg_data else Path.home() / ".local/share"
+    return base / "twin_crew" / "sessions.db"
+
+
+class SessionNotFoundError(KeyError):
+    """Raised when resuming a session id that is not in the store."""
+
+
+@dataclass(frozen=True)
+class StoredSession:
+    session_id: str
+    chat_inputs: ChatInputs
+    tool_schema: dict[str, Any]
+    system_message: str
+    introductory_message: str
+    speaker_label: str
+    messages: list[dict[str, str]]
+
+
+class SessionStore:
+    """Thread-safe SQLite session log; one connection shared under a lock."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_session_db()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a committed turn survives a crash of this process
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._persisted: dict[str, int] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def create_session(
+        self,
+        chat_inputs: ChatInputs,
+        tool_schema: dict[str, Any],
+        system_message: str,
+        introductory_message: str,
+        speaker_label: str,
+    ) -> str:
+        session_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO sessions (session_id, created_at, updated_at, crew_name, "
+                "chat_inputs, tool_schema, system_message, introductory_message, "
+                "speaker_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    now,
+                    now,
+                    chat_inputs.crew_name,
+                    chat_inputs.model_dump_json(),
+                    json.dumps(tool_schema),
+                    system_message,
+                    introductory_message,
+                    speaker_label,
+                ),
+            )
+            self._persisted[session_id] = 0
+        return session_id
+
+    def sync(self, session_id: str, messages: list[dict[str, str]]) -> int:
+        """
+        Append the messages not yet stored, in one transaction. The transcript
+        is append-only, so only the tail past the stored count is written.
+        Returns the number of rows appended.
+        """
+        with self._lock:
+            stored = self._persisted.get(session_id)
+            if stored is None:
+                stored = self._message_count(session_id)
+            pending = messages[stored:]
+            if not pending:
+                return 0
+            now = time.time()
+            with self._transaction():
+                self._connection.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            session_id,
+                            stored + offset,
+                            message.get("role", ""),
+                            message.get("content") or "",
+                            now,
+                        )
+                        for offset, message in enumerate(pending)
+                    ],
+                )
+                self._connection.execute(
+                    "UPDATE sessions SET message_count = ?, updated_at = ? "
+                    "WHERE session_id = ?",
+                    (stored + len(pending), now, session_id),
+                )
+            self._persisted[session_id] = stored + len(pending)
+            return len(pending)
+
+    def load(self, session_id: str) -> StoredSession:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT chat_inputs, tool_schema, system_message, introductory_message, "
+                "speaker_label, message_count FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                raise SessionNotFoundError(session_id)
+            rows = self._connection.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+            self._persisted[session_id] = row[5]
+        return StoredSession(
+            session_id=session_id,
+            chat_inputs=ChatInputs.model_validate_json(row[0]),
+            tool_schema=json.loads(row[1]),
+            system_message=row[2],
+            introductory_message=row[3],
+            speaker_label=row[4],
+            messages=[{"role": role, "content": content} for role, content in rows],
+        )
+
+    def list_sessions(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Most recently active sessions first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT session_id, crew_name, updated_at, message_count FROM sessions "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "session_id": session_id,
+                "crew_name": crew_name,
+                "updated_at": updated_at,
+                "message_count": message_count,
+            }
+            for session_id, crew_name, updated_at, message_count in rows
+        ]
+
+    def _message_count(self, session_id: str) -> int:
+        row = self._connection.execute(
+            "SELECT message_count FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise SessionNotFoundError(session_id)
+        return int(row[0])
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+@dataclass
+class SessionLog:
+    """A live session bound to its store; `sync` after each transcript change."""
+
+    store: SessionStore
+    session_id: str
+
+    def sync(self, messages: list[dict[str, str]]) -> None:
+        self.store.sync(self.session_id, messages)
+
+
+def open_session_store(path: Path | None = None) -> SessionStore | None:
+    """The session store, or None (with the reason logged) when it cannot be opened."""
+    try:
+        return SessionStore(path)
+    except (OSError, sqlite3.Error) as e:
+        click.secho(f"Session history disabled: {e}", fg="yellow")
+        return None
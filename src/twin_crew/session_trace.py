@@ -0,0 +1,442 @@
+"""
+Record/replay of every LLM, STT and TTS request made during a session.
+
+A recorded session is stored as a JSONL "cassette": one header line followed by
+one line per intercepted call, in the order the calls were started. Replaying a
+cassette serves the recorded responses from a local stub that sleeps for the
+recorded latency, so `chat` and `run` sessions can be re-run offline and
+deterministically to benchmark changes in `custom_chat` and `audio_utils`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+import click
+
+from twin_crew.resilience import status_code_of
+
+T = TypeVar("T")
+
+CASSETTE_VERSION = 1
+RECORD_ENV_VAR = "TWIN_CREW_RECORD"
+REPLAY_ENV_VAR = "TWIN_CREW_REPLAY"
+
+_MISSING: Any = object()
+_active_trace: SessionTrace | None = None
+
+
+class CassetteMismatchError(RuntimeError):
+    """Raised when a replayed session diverges from the recorded cassette."""
+
+
+class CassetteExhaustedError(CassetteMismatchError):
+    """Raised when a replayed session asks for more calls than were recorded."""
+
+
+def request_fingerprint(request: dict[str, Any]) -> str:
+    """Stable short hash of a request payload, used to detect replay divergence."""
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def describe_error(exc: BaseException) -> dict[str, Any]:
+    """Cassette fields from which `replayed_error` rebuilds `exc`."""
+    return {
+        "error": repr(exc),
+        "error_module": type(exc).__module__,
+        "error_type": type(exc).__qualname__,
+        "error_message": str(exc),
+        "error_status": status_code_of(exc),
+    }
+
+
+def _recorded_message(exc: BaseException) -> str:
+    return str(exc.args[0]) if exc.args else ""
+
+
+_replay_classes: dict[type[Exception], type[Exception]] = {}
+
+
+def _replay_class(error_class: type[Exception]) -> type[Exception]:
+    # SDK exceptions format themselves from attributes their __init__ sets
+    # (request, model, retries...); the replayed copy prints the recorded text
+    if error_class in _replay_classes:
+        return _replay_classes[error_class]
+    replay_class = type(
+        error_class.__name__,
+        (error_class,),
+        {
+            "__module__": error_class.__module__,
+            "__qualname__": error_class.__qualname__,
+            "__str__": _recorded_message,
+            "__repr__": _recorded_message,
+        },
+    )
+    return _replay_classes.setdefault(error_class, replay_class)
+
+
+def replayed_error(entry: dict[str, Any]) -> Exception:
+    """
+    An exception of the recorded class with the recorded message and HTTP
+    status, so retry classification sees the same error as the live run.
+    SDK exceptions need request/response objects that are not recorded, so it
+    is built without calling the class's `__init__`. Falls back to
+    RuntimeError when the class cannot be imported.
+    """
+    message = entry.get("error_message", entry["error"])
+    try:
+        error_class: Any = importlib.import_module(entry["error_module"])
+        for name in entry["error_type"].split("."):
+            error_class = getattr(error_class, name)
+        if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+            raise TypeError(f"{entry['error_type']} is not an exception class")
+        replay_class = _replay_class(error_class)
+        exc: Exception = replay_class.__new__(replay_class)
+        Exception.__init__(exc, message)
+        exc.message = message  # type: ignore[attr-defined]
+        if entry.get("error_status") is not None:
+            exc.status_code = entry["error_status"]  # type: ignore[attr-defined]
+        return exc
+    except (KeyError, ImportError, AttributeError, TypeError):
+        return RuntimeError(f"Replayed error: {entry['error']}")
+
+
+class SessionTrace(ABC):
+    """Base class for the recorder and the replayer."""
+
+    mode: str = ""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def intercept(self, kind: str, request: dict[str, Any], func: Callable[[], T]) -> T:
+        """Record or replay one STT, TTS or input call made through `func`."""
+
+    @abstractmethod
+    def intercept_llm(
+        self,
+        request: dict[str, Any],
+        available_functions: dict[str, Any] | None,
+        func: Callable[[dict[str, Any] | None], str],
+    ) -> str:
+        """Record or replay one LLM call, including the tools it invoked."""
+
+    def close(self) -> None:  # noqa: B027 - optional hook, a no-op by default
+        """Flush any pending state; called when the traced session ends."""
+
+
+class SessionRecorder(SessionTrace):
+    """Passes calls through and records request, response and latency."""
+
+    mode = "record"
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._entries: list[dict[str, Any] | None] = []
+
+    def _reserve_slot(self) -> int:
+        # Slots are reserved when a call starts so nested calls (e.g. crew agents
+        # running inside a chat tool call) are ordered the way replay requests them.
+        with self._lock:
+            self._entries.append(None)
+            return len(self._entries) - 1
+
+    def _fill_slot(self, slot: int, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[slot] = entry
+
+    def intercept(self, kind: str, request: dict[str, Any], func: Callable[[], T]) -> T:
+        slot = self._reserve_slot()
+        start_time = time.monotonic()
+        entry: dict[str, Any] = {
+            "kind": kind,
+            "fingerprint": request_fingerprint(request),
+            "request": request,
+        }
+        try:
+            response = func()
+        except Exception as exc:
+            entry.update(
+                latency_s=time.monotonic() - start_time,
+                response=None,
+                **describe_error(exc),
+            )
+            self._fill_slot(slot, entry)
+            raise
+        entry.update(latency_s=time.monotonic() - start_time, response=response)
+        self._fill_slot(slot, entry)
+        return response
+
+    def intercept_llm(
+        self,
+        request: dict[str, Any],
+        available_functions: dict[str, Any] | None,
+        func: Callable[[dict[str, Any] | None], str],
+    ) -> str:
+        tool_calls: list[dict[str, Any]] = []
+        tool_seconds: list[float] = []
+
+        def wrap(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+            def recorded_tool(**kwargs: Any) -> Any:
+                tool_calls.append({"name": name, "arguments": dict(kwargs)})
+                tool_start = time.monotonic()
+                try:
+                    return function(**kwargs)
+                finally:
+                    tool_seconds.append(time.monotonic() - tool_start)
+
+            return recorded_tool
+
+        wrapped_functions = (
+            {name: wrap(name, fn) for name, fn in available_functions.items()}
+            if available_functions
+            else available_functions
+        )
+
+        slot = self._reserve_slot()
+        start_time = time.monotonic()
+        entry: dict[str, Any] = {
+            "kind": "llm",
+            "fingerprint": request_fingerprint(request),
+            "request": request,
+        }
+        try:
+            response = func(wrapped_functions)
+        except Exception as exc:
+            entry.update(response=None, **describe_error(exc))
+            raise
+        else:
+            entry["response"] = response
+        finally:
+            latency_s = time.monotonic() - start_time
+            # Tool time is replayed by re-running the tool, so only keep the
+            # model's own share of the latency.
+            entry.update(
+                latency_s=latency_s,
+                self_latency_s=max(0.0, latency_s - sum(tool_seconds)),
+                tool_calls=tool_calls,
+            )
+            self._fill_slot(slot, entry)
+        return response
+
+    def close(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "version": CASSETTE_VERSION,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self.path.open("w", encoding="utf-8") as cassette:
+            cassette.write(json.dumps(header) + "\n")
+            for entry in self._entries:
+                if entry is not None:
+                    cassette.write(json.dumps(entry, default=str) + "\n")
+        click.secho(
+            f"Session recorded to {self.path} ({len(self._entries)} calls)", fg="white"
+        )
+
+
+class SessionReplayer(SessionTrace):
+    """Serves recorded responses in order, sleeping for the recorded latency."""
+
+    mode = "replay"
+
+    def __init__(
+        self, path: str | Path, latency_scale: float = 1.0, strict: bool = False
+    ) -> None:
+        super().__init__(path)
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.mismatches = 0
+        self._queues: dict[str, deque[dict[str, Any]]] = {}
+
+        with self.path.open(encoding="utf-8") as cassette:
+            header = json.loads(cassette.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(
+                    f"Unsupported cassette version in {self.path}: {header.get('version')}"
+                )
+            for line in cassette:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._queues.setdefault(entry["kind"], deque()).append(entry)
+
+    def _next_entry(self, kind: str, request: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            queue = self._queues.get(kind)
+            if not queue:
+                raise CassetteExhaustedError(f"No recorded '{kind}' calls left.")
+            entry = queue.popleft()
+            if entry["fingerprint"] != request_fingerprint(request):
+                self.mismatches += 1
+                if self.strict:
+                    raise CassetteMismatchError(
+                        f"Replayed '{kind}' request differs from the recorded one."
+                    )
+        return entry
+
+    def _replay_latency(self, seconds: float) -> None:
+        if self.latency_scale > 0 and seconds > 0:
+            time.sleep(seconds * self.latency_scale)
+
+    def intercept(self, kind: str, request: dict[str, Any], func: Callable[[], T]) -> T:
+        entry = self._next_entry(kind, request)
+        self._replay_latency(entry["latency_s"])
+        if entry.get("error"):
+            raise replayed_error(entry)
+        response: T = entry["response"]
+        return response
+
+    def intercept_llm(
+        self,
+        request: dict[str, Any],
+        available_functions: dict[str, Any] | None,
+        func: Callable[[dict[str, Any] | None], str],
+    ) -> str:
+        entry = self._next_entry("llm", request)
+        for tool_call in entry.get("tool_calls", []):
+            function = (available_functions or {}).get(tool_call["name"])
+            if function is None:
+                raise CassetteMismatchError(
+                    f"Recorded tool '{tool_call['name']}' is not available on replay."
+                )
+            function(**tool_call["arguments"])
+        self._replay_latency(entry.get("self_latency_s", entry["latency_s"]))
+        if entry.get("error"):
+            raise replayed_error(entry)
+        return str(entry["response"])
+
+    def close(self) -> None:
+        remaining = sum(len(queue) for queue in self._queues.values())
+        click.secho(
+            f"Replay finished: {self.mismatches} diverging requests, "
+            f"{remaining} recorded calls unused.",
+            fg="white",
+        )
+
+
+def active_trace() -> SessionTrace | None:
+    """Return the recorder/replayer for the running session, if any."""
+    return _active_trace
+
+
+def is_replaying() -> bool:
+    return _active_trace is not None and _active_trace.mode == "replay"
+
+
+def traced(
+    kind: str,
+    request: dict[str, Any],
+    func: Callable[[], T],
+    on_exhausted: Any = _MISSING,
+) -> T:
+    """
+    Run `func` through the active trace. Without a trace this is just `func()`.
+    When replaying past the end of the cassette, `on_exhausted` is returned if given.
+    """
+    trace = _active_trace
+    if trace is None:
+        return func()
+    try:
+        return trace.intercept(kind, request, func)
+    except CassetteExhaustedError:
+        if on_exhausted is _MISSING:
+            raise
+        result: T = on_exhausted
+        return result
+
+
+def _install_llm_hook() -> Callable[[], None]:
+    """Route crewAI's LLM.call (chat LLM and crew agents alike) through the trace."""
+    from crewai.llm import LLM
+
+    original_call = LLM.call
+
+    def traced_call(
+        self: LLM,
+        messages: Any,
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str:
+        trace = _active_trace
+        if trace is None:
+            return str(
+                original_call(self, messages, tools, callbacks, available_functions)
+            )
+        request = {"model": self.model, "messages": messages, "tools": tools}
+        return trace.intercept_llm(
+            request,
+            available_functions,
+            lambda functions: original_call(
+                self, messages, tools, callbacks, functions
+            ),
+        )
+
+    LLM.call = traced_call
+
+    def uninstall() -> None:
+        LLM.call = original_call
+
+    return uninstall
+
+
+@contextmanager
+def _activate(trace: SessionTrace) -> Iterator[SessionTrace]:
+    global _active_trace
+    if _active_trace is not None:
+        raise RuntimeError("A session trace is already active.")
+    uninstall = _install_llm_hook()
+    _active_trace = trace
+    try:
+        yield trace
+    finally:
+        _active_trace = None
+        uninstall()
+        trace.close()
+
+
+def recording(path: str | Path) -> AbstractContextManager[SessionTrace]:
+    """Record every LLM/STT/TTS call made inside the block to a cassette."""
+    return _activate(SessionRecorder(path))
+
+
+def replaying(
+    path: str | Path, latency_scale: float = 1.0, strict: bool = False
+) -> AbstractContextManager[SessionTrace]:
+    """Replay a cassette; no network calls are made inside the block."""
+    return _activate(SessionReplayer(path, latency_scale=latency_scale, strict=strict))
+
+
+def session_trace(
+    record_path: str | None = None,
+    replay_path: str | None = None,
+    latency_scale: float = 1.0,
+) -> AbstractContextManager[Any]:
+    """
+    Pick the trace mode from explicit paths, falling back to the
+    TWIN_CREW_RECORD / TWIN_CREW_REPLAY environment variables.
+    """
+    record_path = record_path or os.getenv(RECORD_ENV_VAR)
+    replay_path = replay_path or os.getenv(REPLAY_ENV_VAR)
+    if record_path and replay_path:
+        raise ValueError("Cannot record and replay a session at the same time.")
+    if record_path:
+        return recording(record_path)
+    if replay_path:
+        return replaying(replay_path, latency_scale=latency_scale)
+    return nullcontext()
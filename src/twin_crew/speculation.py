@@ -0,0 +1,320 @@
+"""
+Speculative pre-warming of the crew while the user confirms a crew call.
+
+The chat manager always asks for confirmation before calling the crew tool.
+While the user reads and answers, we predict the tool inputs and run the
+crew's first task in the background. If the user confirms and the model calls
+the crew with the same user-provided inputs, the remaining tasks run as a
+fresh crew with the warm first output as context; otherwise the speculative
+work is discarded.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any
+
+import click
+from crewai import Crew
+from crewai.llm import LLM
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+
+from twin_crew.rate_limiter import Priority, priority_scope
+
+# Inputs the assistant writes about itself on every call (see build_system_message).
+# They are reworded each time, so they are not compared when matching a speculation.
+SELF_AUTHORED_INPUTS: frozenset[str] = frozenset({"enrique_background"})
+# Phrases the assistant uses when it proposes a crew call and asks to confirm.
+CONFIRMATION_CUES: tuple[str, ...] = (
+    "confirm",
+    "shall i",
+    "should i",
+    "go ahead",
+    "proceed",
+    "want me to",
+    "ready for me",
+    "is that fine",
+    "is that okay",
+)
+PREDICTION_WAIT_SECONDS = 10.0
+# How long a confirmed call waits for an unfinished first task before running
+# the crew normally instead.
+FIRST_TASK_WAIT_SECONDS = 120.0
+
+
+def looks_like_crew_proposal(assistant_text: str) -> bool:
+    """Heuristic: the assistant is asking the user to confirm a crew call."""
+    text = assistant_text.lower()
+    return "?" in text and any(cue in text for cue in CONFIRMATION_CUES)
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value).split()).lower()
+
+
+def same_user_inputs(predicted: dict[str, Any], actual: dict[str, Any]) -> bool:
+    """Compare tool inputs, ignoring fields the assistant authors about itself."""
+    ignored = SELF_AUTHORED_INPUTS | {"crew_chat_messages"}
+    keys = (set(predicted) | set(actual)) - ignored
+    return all(
+        _normalize(predicted.get(key, "")) == _normalize(actual.get(key, ""))
+        for key in keys
+    )
+
+
+def interpolate_crew_inputs(crew: Crew, inputs: dict[str, Any]) -> None:
+    """
+    Fill `inputs` into the crew's agents and tasks, as `Crew.kickoff` does
+    before running them.
+
+    Written against crewAI 0.100.0 (pinned in pyproject.toml): it calls the
+    private `Crew._interpolate_inputs`, so check it whenever crewAI is
+    upgraded; tests/test_speculation.py pins the behavior.
+    """
+    crew._interpolate_inputs(inputs)
+
+
+def run_first_task(crew: Crew, inputs: dict[str, Any]) -> TaskOutput:
+    """
+    Interpolate `inputs` into `crew` and execute only its first task. The task
+    runs outside `Crew.kickoff`, so kickoff callbacks and crew usage metrics
+    do not cover it; the later kickoff of the remaining tasks does run them.
+    """
+    interpolate_crew_inputs(crew, inputs)
+    first_task = crew.tasks[0]
+    agent = first_task.agent
+    agent.crew = crew
+    return first_task.execute_sync(agent=agent)
+
+
+def kickoff_after_first_task(
+    crew: Crew, inputs: dict[str, Any], first_output: TaskOutput
+) -> Any:
+    """
+    Kick off the crew's remaining tasks as a fresh crew. The first task keeps
+    its speculative output and is listed as context, so later tasks see what a
+    sequential run of the whole crew would have given them.
+    """
+    first_task, *remaining = crew.tasks
+    if remaining and isinstance(remaining[0], ConditionalTask):
+        # crewAI rejects a crew that starts with a conditional task, so run the
+        # whole crew and let it gate that task on a fresh first output
+        return crew.kickoff(inputs=inputs)
+    first_task.output = first_output
+    for index, task in enumerate(remaining):
+        if not task.context:
+            task.context = [first_task, *remaining[:index]]
+    rest = type(crew)(
+        agents=crew.agents,
+        tasks=remaining,
+        process=crew.process,
+        verbose=crew.verbose,
+    )
+    return rest.kickoff(inputs=inputs)
+
+
+@dataclass
+class WarmStart:
+    """A crew copy whose first task has already been executed."""
+
+    crew: Crew
+    inputs: dict[str, Any]
+    first_output: TaskOutput
+    saved_seconds: float
+
+    def kickoff(self, inputs: dict[str, Any]) -> Any:
+        # Keep the speculative self-authored fields so later tasks see the same
+        # background the first task was run with.
+        merged = {
+            **inputs,
+            **{k: v for k, v in self.inputs.items() if k in SELF_AUTHORED_INPUTS},
+        }
+        return kickoff_after_first_task(self.crew, merged, self.first_output)
+
+
+@dataclass
+class _Speculation:
+    inputs_ready: threading.Event = field(default_factory=threading.Event)
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    result: "Future[TaskOutput | None]" = field(default_factory=Future)
+    inputs: dict[str, Any] | None = None
+    crew: Crew | None = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+
+class CrewSpeculator:
+    """Runs the crew's first task ahead of the user's confirmation."""
+
+    def __init__(self, crew: Crew, chat_llm: LLM, tool_schema: dict[str, Any]) -> None:
+        self.crew = crew
+        self.chat_llm = chat_llm
+        self.tool_schema = tool_schema
+        self._lock = threading.Lock()
+        self._current: _Speculation | None = None
+        # Inputs of the last confirmed crew call, reused when a proposal repeats them
+        self._last_inputs: dict[str, Any] | None = None
+
+    def observe(self, messages: list[dict[str, str]]) -> None:
+        """Called after each assistant reply; speculates when a crew call is proposed."""
+        last = messages[-1] if messages else {}
+        if last.get("role") != "assistant" or not looks_like_crew_proposal(
+            last.get("content", "")
+        ):
+            self.discard()
+            return
+
+        speculation = _Speculation()
+        with self._lock:
+            previous, self._current = self._current, speculation
+        threading.Thread(
+            target=self._speculate,
+            args=(speculation, list(messages), previous),
+            daemon=True,
+        ).start()
+
+    def discard(self) -> None:
+        with self._lock:
+            speculation, self._current = self._current, None
+        if speculation is not None:
+            speculation.cancelled.set()
+            click.secho("Speculative crew run discarded", fg="white")
+
+    def claim(self, inputs: dict[str, Any]) -> WarmStart | None:
+        """Return the warm crew if it was speculated with the same inputs."""
+        with self._lock:
+            speculation, self._current = self._current, None
+        if speculation is None:
+            return None
+        self._last_inputs = dict(inputs)
+        if not speculation.inputs_ready.wait(PREDICTION_WAIT_SECONDS) or not (
+            speculation.inputs and same_user_inputs(speculation.inputs, inputs)
+        ):
+            speculation.cancelled.set()
+            click.secho("Speculative crew run discarded (inputs changed)", fg="white")
+            return None
+
+        # The first task is already under way, so waiting beats starting over
+        try:
+            first_output = speculation.result.result(timeout=FIRST_TASK_WAIT_SECONDS)
+        except FutureTimeoutError:
+            speculation.cancelled.set()
+            click.secho(
+                "Speculative first task is still running; starting the crew normally",
+                fg="white",
+            )
+            return None
+        if first_output is None or speculation.crew is None:
+            return None
+        finished_at = speculation.finished_at or time.monotonic()
+        saved_seconds = finished_at - speculation.started_at
+        click.secho(
+            f"Reusing speculative first task ({saved_seconds:.1f}s of crew work)",
+            fg="white",
+        )
+        return WarmStart(
+            crew=speculation.crew,
+            inputs=speculation.inputs,
+            first_output=first_output,
+            saved_seconds=saved_seconds,
+        )
+
+    def heuristic_inputs(self, messages: list[dict[str, str]]) -> dict[str, Any] | None:
+        """
+        Reuse the last confirmed inputs when the proposal restates every
+        user-provided value, e.g. when offering to run the crew again.
+        """
+        if not self._last_inputs or not messages:
+            return None
+        proposal = _normalize(messages[-1].get("content", ""))
+        values = [
+            _normalize(value)
+            for key, value in self._last_inputs.items()
+            if key not in SELF_AUTHORED_INPUTS | {"crew_chat_messages"}
+        ]
+        if values and all(value and value in proposal for value in values):
+            return dict(self._last_inputs)
+        return None
+
+    def predict_inputs(self, messages: list[dict[str, str]]) -> dict[str, Any] | None:
+        """
+        Predict the tool inputs for a confirmed call. The model is asked only
+        when the heuristic finds nothing, to keep speculation cheap.
+        """
+        heuristic = self.heuristic_inputs(messages)
+        if heuristic is not None:
+            return heuristic
+
+        captured: dict[str, Any] = {}
+
+        def capture(**kwargs: Any) -> str:
+            captured.update(kwargs)
+            return "[speculative] Crew call captured, not executed."
+
+        probe = messages + [{"role": "user", "content": "Yes, that's fine. Go ahead."}]
+        self.chat_llm.call(
+            messages=probe,
+            tools=[self.tool_schema],
+            available_functions={self.tool_schema["function"]["name"]: capture},
+        )
+        return captured or None
+
+    def _speculate(
+        self,
+        speculation: _Speculation,
+        messages: list[dict[str, str]],
+        previous: _Speculation | None,
+    ) -> None:
+        # Speculative work is optional, so it never competes with live turns
+        with priority_scope(Priority.BATCH):
+            self._speculate_in_background(speculation, messages, previous)
+
+    def _speculate_in_background(
+        self,
+        speculation: _Speculation,
+        messages: list[dict[str, str]],
+        previous: _Speculation | None,
+    ) -> None:
+        try:
+            inputs = self.predict_inputs(messages)
+            speculation.inputs = inputs
+            speculation.inputs_ready.set()
+
+            if (
+                previous is not None
+                and not previous.cancelled.is_set()
+                and previous.inputs
+                and inputs
+                and same_user_inputs(previous.inputs, inputs)
+            ):
+                # Same proposal again: keep the run already in flight
+                speculation.inputs = previous.inputs
+                speculation.crew = previous.crew
+                speculation.started_at = previous.started_at
+                first_output = previous.result.result()
+                speculation.finished_at = previous.finished_at
+                speculation.result.set_result(first_output)
+                return
+            if previous is not None:
+                previous.cancelled.set()
+
+            if inputs is None or speculation.cancelled.is_set():
+                speculation.result.set_result(None)
+                return
+
+            click.secho("Speculatively starting the crew's first task", fg="white")
+            speculation.crew = self.crew.copy()
+            first_output = run_first_task(speculation.crew, inputs)
+            speculation.finished_at = time.monotonic()
+            # Python threads cannot be interrupted; cancelled work is just dropped
+            speculation.result.set_result(
+                None if speculation.cancelled.is_set() else first_output
+            )
+        except Exception as e:  # noqa: BLE001
+            speculation.inputs_ready.set()
+            if not speculation.result.done():
+                speculation.result.set_result(None)
+            click.secho(f"Speculative crew run failed: {e}", fg="yellow")
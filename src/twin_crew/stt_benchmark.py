@@ -0,0 +1,115 @@
+"""
+Benchmark of Speech-to-Text upload formats.
+
+For each WAV clip and format, reports the bytes sent, the in-process encode
+time, the upload time on a simulated link and (unless `--encode-only`) the
+end-to-end latency of a real transcription request: encode plus request.
+"""
+
+import time
+
+import click
+from openai import OpenAI
+
+from twin_crew.stt_encoding import (
+    STT_FORMATS,
+    SttAudioFormat,
+    encode_audio,
+    native_sample_rate,
+    prepare_for_stt,
+    read_wav_float32,
+    soundfile_available,
+)
+
+
+def _median(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2] if ordered else 0.0
+
+
+@click.command()
+@click.argument("wav_paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--format",
+    "formats",
+    type=click.Choice(STT_FORMATS),
+    multiple=True,
+    help="Formats to compare (repeatable). Defaults to every available format.",
+)
+@click.option("--model", "model_name", default="whisper-1", show_default=True)
+@click.option("--repeats", default=3, show_default=True, help="Requests per format.")
+@click.option(
+    "--link-kbps",
+    default=256.0,
+    show_default=True,
+    help="Uplink bandwidth used to estimate upload time.",
+)
+@click.option(
+    "--encode-only",
+    is_flag=True,
+    default=False,
+    help="Skip the STT requests (no network or API spend).",
+)
+def main(
+    wav_paths: tuple[str, ...],
+    formats: tuple[SttAudioFormat, ...],
+    model_name: str,
+    repeats: int,
+    link_kbps: float,
+    encode_only: bool,
+) -> None:
+    if not formats:
+        formats = STT_FORMATS if soundfile_available() else ("wav",)
+        if not soundfile_available():
+            click.secho(
+                "soundfile is not installed; only WAV is benchmarked. "
+                "Install it with: pip install 'twin_crew[audio]'",
+                fg="yellow",
+            )
+
+    client = None if encode_only else OpenAI()
+    target_rate = native_sample_rate(model_name)
+    for wav_path in wav_paths:
+        source_rate, source_audio = read_wav_float32(wav_path)
+        clip_seconds = len(source_audio) / source_rate
+        raw_bytes = source_audio.size * 2
+        click.secho(
+            f"\n{wav_path}: {clip_seconds:.1f}s, {source_rate} Hz, "
+            f"{source_audio.shape[1]} ch, {raw_bytes / 1024:.0f} KiB as 16-bit PCM",
+            fg="cyan",
+        )
+        click.echo(
+            f"{'format':<6} {'bytes':>10} {'vs PCM':>7} {'encode':>9} "
+            f"{'upload@' + f'{link_kbps:g}kbps':>16} {'end-to-end p50':>15}"
+        )
+        for audio_format in formats:
+            encode_seconds: list[float] = []
+            end_to_end_seconds: list[float] = []
+            payload = b""
+            for _ in range(max(1, repeats)):
+                start_time = time.monotonic()
+                rate, audio = prepare_for_stt(source_audio, source_rate, target_rate)
+                upload_name, payload = encode_audio(audio, rate, audio_format)
+                encode_seconds.append(time.monotonic() - start_time)
+                if client is not None:
+                    client.audio.transcriptions.create(
+                        model=model_name, file=(upload_name, payload)
+                    )
+                    end_to_end_seconds.append(time.monotonic() - start_time)
+
+            upload_seconds = len(payload) * 8 / (link_kbps * 1000)
+            end_to_end = (
+                f"{_median(end_to_end_seconds) * 1000:.0f} ms"
+                if end_to_end_seconds
+                else "-"
+            )
+            click.echo(
+                f"{audio_format:<6} {len(payload):>10} "
+                f"{len(payload) / raw_bytes:>7.1%} "
+                f"{_median(encode_seconds) * 1000:>6.1f} ms "
+                f"{upload_seconds * 1000:>13.0f} ms {end_to_end:>15}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+In-process encoding of captured speech before Speech-to-Text upload.
+
+Raw 16-bit PCM WAV costs about 1.9 MB per minute of speech, and on slow links
+the upload dominates transcription latency. Audio is downmixed to mono,
+resampled to the STT model's native rate and encoded to FLAC (lossless) or
+Opus in Ogg (lossy, far smaller) before upload.
+
+FLAC and Opus need the optional `soundfile` package (`pip install
+"twin_crew[audio]"`); without it uploads fall back to WAV, with a one-time
+warning so the missing compression is noticed.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from math import gcd
+from pathlib import Path
+from typing import Literal
+
+import click
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+STT_FORMAT_ENV_VAR = "TWIN_CREW_STT_FORMAT"
+
+SttAudioFormat = Literal["wav", "flac", "opus"]
+STT_FORMATS: tuple[SttAudioFormat, ...] = ("wav", "flac", "opus")
+
+# Whisper-family models resample everything to 16 kHz mono internally, so
+# sending more samples than that only costs upload time.
+STT_NATIVE_SAMPLE_RATES: dict[str, int] = {
+    "whisper-1": 16000,
+    "gpt-4o-transcribe": 16000,
+    "gpt-4o-mini-transcribe": 16000,
+}
+DEFAULT_STT_SAMPLE_RATE_HZ = 16000
+
+_FILE_SUFFIXES: dict[SttAudioFormat, str] = {
+    "wav": "wav",
+    "flac": "flac",
+    "opus": "ogg",
+}
+
+_wav_fallback_warned = False
+
+
+def soundfile_available() -> bool:
+    try:
+        import soundfile  # noqa: F401
+    except (ImportError, OSError):
+        # OSError: the package is installed but libsndfile is missing
+        return False
+    return True
+
+
+def default_stt_format() -> SttAudioFormat:
+    """TWIN_CREW_STT_FORMAT if set, else FLAC when `soundfile` is installed, else WAV."""
+    configured = os.getenv(STT_FORMAT_ENV_VAR, "").strip().lower()
+    if configured:
+        for audio_format in STT_FORMATS:
+            if configured == audio_format:
+                return audio_format
+        raise ValueError(
+            f"{STT_FORMAT_ENV_VAR} must be one of {', '.join(STT_FORMATS)}, "
+            f"got '{configured}'."
+        )
+    if soundfile_available():
+        return "flac"
+    _warn_wav_fallback()
+    return "wav"
+
+
+def _warn_wav_fallback() -> None:
+    global _wav_fallback_warned
+    if _wav_fallback_warned:
+        return
+    _wav_fallback_warned = True
+    click.secho(
+        "STT uploads are uncompressed WAV because 'soundfile' is not installed; "
+        "install it for FLAC uploads: pip install 'twin_crew[audio]'",
+        fg="yellow",
+    )
+
+
+def native_sample_rate(model_name: str) -> int:
+    return STT_NATIVE_SAMPLE_RATES.get(model_name, DEFAULT_STT_SAMPLE_RATE_HZ)
+
+
+def read_wav_float32(path: str | Path) -> tuple[int, np.ndarray]:
+    """Read a WAV file as (sample rate, float32 frames of shape (frames, channels))."""
+    sample_rate_hz, data = wavfile.read(Path(path))
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    audio = np.asarray(data, dtype=np.float32)
+    if audio.ndim == 1:
+        audio = audio[:, np.newaxis]
+    return int(sample_rate_hz), audio
+
+
+def resample_audio(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Polyphase resampling along the frame axis."""
+    if source_rate == target_rate:
+        return audio
+    divisor = gcd(source_rate, target_rate)
+    resampled = resample_poly(
+        audio, target_rate // divisor, source_rate // divisor, axis=0
+    )
+    return np.asarray(resampled, dtype=np.float32)
+
+
+def prepare_for_stt(
+    audio: np.ndarray,
+    sample_rate_hz: int,
+    target_rate_hz: int | None = DEFAULT_STT_SAMPLE_RATE_HZ,
+    downmix: bool = True,
+) -> tuple[int, np.ndarray]:
+    """Downmix to mono and resample to `target_rate_hz` (None keeps the rate)."""
+    if downmix and audio.ndim == 2 and audio.shape[1] > 1:
+        audio = audio.mean(axis=1, keepdims=True)
+    if target_rate_hz:
+        audio = resample_audio(audio, sample_rate_hz, target_rate_hz)
+        sample_rate_hz = target_rate_hz
+    return sample_rate_hz, audio
+
+
+def encode_audio(
+    audio: np.ndarray, sample_rate_hz: int, audio_format: SttAudioFormat
+) -> tuple[str, bytes]:
+    """Encode float32 frames; returns (upload file name, encoded bytes)."""
+    buffer = io.BytesIO()
+    clipped = np.clip(audio, -1.0, 1.0)
+    if audio_format == "wav":
+        wavfile.write(buffer, sample_rate_hz, np.int16(clipped * 32767))
+    else:
+        try:
+            import soundfile
+        except (ImportError, OSError) as e:
+            raise RuntimeError(
+                f"Encoding STT audio as {audio_format} needs the optional "
+                "'soundfile' package: pip install 'twin_crew[audio]'"
+            ) from e
+        if audio_format == "flac":
+            soundfile.write(
+                buffer, clipped, sample_rate_hz, format="FLAC", subtype="PCM_16"
+            )
+        else:
+            soundfile.write(
+                buffer, clipped, sample_rate_hz, format="OGG", subtype="OPUS"
+            )
+    return f"speech.{_FILE_SUFFIXES[audio_format]}", buffer.getvalue()
+
+
+def encode_wav_for_stt(
+    wav_path: str | Path,
+    model_name: str = "whisper-1",
+    audio_format: SttAudioFormat | None = None,
+    downmix: bool = True,
+) -> tuple[str, bytes]:
+    """Read a captured WAV and encode it at the model's native rate for upload."""
+    sample_rate_hz, audio = read_wav_float32(wav_path)
+    sample_rate_hz, audio = prepare_for_stt(
+        audio, sample_rate_hz, native_sample_rate(model_name), downmix
+    )
+    return encode_audio(audio, sample_rate_hz, audio_format or default_stt_format())
@@ -2,6 +2,11 @@ from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
 
+def count_words(text: str) -> int:
+    """Whitespace-separated word count, the measure used for the pitch word limit."""
+    return len(text.split())
+
+
 class WordCounterInput(BaseModel):
     """Input schema for WordCounterTool."""
 
@@ -26,9 +31,7 @@ class WordCounterTool(BaseTool):
                 # If JSON parsing fails, fall back to raw text
                 pass
 
-        # Count the number of words in the text
-        word_count = len(text.split())
-        return word_count
+        return count_words(text)
 
 
 if __name__ == "__main__":
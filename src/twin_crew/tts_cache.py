@@ -0,0 +1,216 @@
+"""
+Content-addressed cache of synthesized speech for repeated phrases.
+
+Entries are the final (speed-adjusted) encoded audio files, keyed by a hash of
+(text, model, voice, applied speed), so a repeated greeting or confirmation
+plays from disk without a network call. The cache is opt-in
+(TWIN_CREW_TTS_CACHE=1). A phrase is only written on its second sighting,
+since most replies are never spoken twice; sightings are kept in a small
+append-only index next to the entries, so a phrase spoken once per launch
+(such as the greeting) is cached on the next launch. The cache is bounded in
+bytes with LRU eviction and entries expire after `max_age_seconds`; recency
+and age survive restarts through the files' modification times.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR_ENV_VAR = "TWIN_CREW_CACHE_DIR"
+TTS_CACHE_ENV_VAR = "TWIN_CREW_TTS_CACHE"
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+# Phrases seen once, remembered so a second sighting is cached
+DEFAULT_MAX_SIGHTINGS = 1024
+# One phrase key per line; a dotfile, so it is never mistaken for an entry
+SIGHTINGS_FILE = ".sightings"
+# Long, one-off replies would only churn the cache; short phrases are what repeat.
+DEFAULT_MAX_TEXT_CHARS = 400
+
+
+def cache_dir() -> Path:
+    """Root directory for on-disk caches (TWIN_CREW_CACHE_DIR or ~/.cache/twin_crew)."""
+    configured = os.getenv(CACHE_DIR_ENV_VAR)
+    if configured:
+        return Path(configured).expanduser()
+    xdg_cache = os.getenv("XDG_CACHE_HOME")
+    base = Path(xdg_cache).expanduser() if xdg_cache else Path.home() / ".cache"
+    return base / "twin_crew"
+
+
+def phrase_key(text: str, model_name: str, voice_name: str, speed: float | None) -> str:
+    """Content address of a synthesized phrase; `speed` is the speed applied."""
+    payload = json.dumps(
+        {"text": text, "model": model_name, "voice": voice_name, "speed": speed},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """Size-bounded LRU cache of encoded audio files."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_sightings: int = DEFAULT_MAX_SIGHTINGS,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_text_chars = max_text_chars
+        self.max_age_seconds = max_age_seconds
+        self.max_sightings = max_sightings
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._sightings: OrderedDict[str, None] = OrderedDict()
+        self._sightings_path = directory / SIGHTINGS_FILE
+        self._sighting_lines = 0
+        self._total_bytes = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_sightings()
+        existing = sorted(
+            (
+                path
+                for path in self.directory.iterdir()
+                if path.is_file() and not path.name.startswith(".")
+            ),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for path in existing:
+            if self._expired(path):
+                path.unlink(missing_ok=True)
+                continue
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def accepts(self, text: str) -> bool:
+        return len(text) <= self.max_text_chars
+
+    def admit(self, key: str) -> bool:
+        """Note a sighting of `key`; True from the second sighting on, across restarts."""
+        with self._lock:
+            if key in self._sightings:
+                self._sightings.move_to_end(key)
+                return True
+            self._sightings[key] = None
+            if len(self._sightings) > self.max_sightings:
+                self._sightings.popitem(last=False)
+            self._append_sighting(key)
+            return False
+
+    def _load_sightings(self) -> None:
+        try:
+            lines = self._sightings_path.read_text(encoding="utf-8").split()
+        except OSError:
+            return
+        self._sighting_lines = len(lines)
+        for key in lines:
+            self._sightings[key] = None
+            self._sightings.move_to_end(key)
+        while len(self._sightings) > self.max_sightings:
+            self._sightings.popitem(last=False)
+
+    def _append_sighting(self, key: str) -> None:
+        """Append `key` to the index, compacting it once it doubles the limit."""
+        try:
+            if self._sighting_lines >= 2 * self.max_sightings:
+                temporary = self._sightings_path.with_name(f"{SIGHTINGS_FILE}.tmp")
+                temporary.write_text(
+                    "".join(f"{known}\n" for known in self._sightings),
+                    encoding="utf-8",
+                )
+                os.replace(temporary, self._sightings_path)
+                self._sighting_lines = len(self._sightings)
+                return
+            with self._sightings_path.open("a", encoding="utf-8") as index:
+                index.write(f"{key}\n")
+            self._sighting_lines += 1
+        except OSError:
+            # Losing a sighting only delays caching that phrase
+            pass
+
+    def _expired(self, path: Path) -> bool:
+        return time.time() - path.stat().st_mtime > self.max_age_seconds
+
+    def get(self, key: str, suffix: str = ".mp3") -> Path | None:
+        """Return the cached file for `key` and mark it most recently used."""
+        name = f"{key}{suffix}"
+        with self._lock:
+            if name not in self._entries:
+                return None
+            path = self.directory / name
+            if not path.exists():
+                self._total_bytes -= self._entries.pop(name)
+                return None
+            if self._expired(path):
+                self._total_bytes -= self._entries.pop(name)
+                path.unlink(missing_ok=True)
+                return None
+            self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, source: Path) -> Path:
+        """
+        Copy `source` into the cache under `key` and return the cached path.
+        Files larger than the whole budget are not cached; `source` is returned.
+        """
+        if source.stat().st_size > self.max_bytes:
+            return source
+        name = f"{key}{source.suffix}"
+        destination = self.directory / name
+        temporary = destination.with_name(f".{name}.tmp")
+        shutil.copyfile(source, temporary)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(temporary, destination)
+        size = destination.stat().st_size
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._total_bytes += size
+            self._evict()
+        return destination
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                (self.directory / name).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+_phrase_cache: PhraseCache | None = None
+_phrase_cache_lock = threading.Lock()
+
+
+def get_phrase_cache() -> PhraseCache | None:
+    """Process-wide TTS cache; only enabled with TWIN_CREW_TTS_CACHE=1."""
+    global _phrase_cache
+    if os.getenv(TTS_CACHE_ENV_VAR, "").strip().lower() not in {"1", "true", "yes"}:
+        return None
+    with _phrase_cache_lock:
+        if _phrase_cache is None:
+            try:
+                _phrase_cache = PhraseCache(cache_dir() / "tts")
+            except OSError:
+                # An unwritable cache directory only costs us the speed-up
+                return None
+        return _phrase_cache
@@ -0,0 +1,5 @@
+"""
+Test support for twin_crew: fakes, the chat server load test and the voice soak
+test. Not part of the `twin_crew` wheel; it is importable from a source
+checkout (`uv sync` installs the project in editable mode) and by the tests.
+"""
@@ -0,0 +1,273 @@
+"""
+Offline stand-ins for the chat LLM, the crew, the microphone and the speech API.
+
+They reproduce the call shapes `custom_chat`, `audio_capture` and `audio_utils`
+rely on, with configurable latencies, so load and soak tests can run without
+network, audio devices or API spend.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from crewai.types.crew_chat import ChatInputField, ChatInputs
+
+from twin_crew.stt_encoding import prepare_for_stt, read_wav_float32
+
+MOCK_CREW_NAME = "MockCrew"
+CONFIRMATION_WORDS: tuple[str, ...] = ("yes", "confirm", "go ahead", "sure")
+
+
+class MockChatLLM:
+    """
+    Mimics `LLM.call`: replies after `latency_seconds`, and when the last user
+    message is a confirmation it calls the first available tool like a real
+    tool-calling model would, returning the tool's result. Like crewAI 0.100,
+    a tool that raises yields an empty reply rather than an exception.
+    """
+
+    def __init__(self, latency_seconds: float = 0.05, model: str = "mock-llm") -> None:
+        self.latency_seconds = latency_seconds
+        self.model = model
+        self.calls = 0
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str:
+        self.calls += 1
+        time.sleep(self.latency_seconds)
+        if isinstance(messages, str):
+            return f"Mock reply to: {messages[:40]}"
+
+        last_user = next(
+            (m["content"] for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        if tools and available_functions and _is_confirmation(last_user):
+            function = next(iter(available_functions.values()))
+            try:
+                return str(
+                    function(
+                        startup_idea="An AI agent marketplace for small businesses.",
+                        enrique_background="ML engineer focused on agentic systems.",
+                    )
+                )
+            except Exception:  # noqa: BLE001
+                return ""
+        if tools:
+            return "Here is my plan. Shall I run the crew to draft your pitch?"
+        return "Hi, I'm the mock assistant. Tell me about your startup idea."
+
+
+def _is_confirmation(text: str) -> bool:
+    lowered = text.strip().lower()
+    return any(lowered.startswith(word) for word in CONFIRMATION_WORDS)
+
+
+class MockCrew:
+    """Crew stand-in whose kickoff sleeps for `kickoff_seconds`."""
+
+    def __init__(self, kickoff_seconds: float = 0.5) -> None:
+        self.kickoff_seconds = kickoff_seconds
+        self.kickoffs = 0
+
+    def copy(self) -> "MockCrew":
+        return MockCrew(self.kickoff_seconds)
+
+    def kickoff(self, inputs: dict[str, Any] | None = None) -> str:
+        self.kickoffs += 1
+        time.sleep(self.kickoff_seconds)
+        idea = (inputs or {}).get("startup_idea", "your idea")
+        return f"Mock pitch for: {idea}"
+
+
+def mock_chat_inputs() -> ChatInputs:
+    """ChatInputs matching the real crew's tool, without analyzing a crew."""
+    return ChatInputs(
+        crew_name=MOCK_CREW_NAME,
+        crew_description="Drafts a co-founder pitch for a startup idea.",
+        inputs=[
+            ChatInputField(name="startup_idea", description="The user's startup idea."),
+            ChatInputField(
+                name="enrique_background",
+                description="Enrique's professional background.",
+            ),
+        ],
+    )
+
+
+def load_wav_float32(
+    path: str | Path, sample_rate_hz: int, channels: int = 1
+) -> np.ndarray:
+    """Read a WAV file as float32 frames (frames, channels) at `sample_rate_hz`."""
+    source_rate, audio = read_wav_float32(path)
+    _, mono = prepare_for_stt(audio, source_rate, sample_rate_hz)
+    return np.repeat(mono, channels, axis=1)
+
+
+class FakeInputStream:
+    """
+    sounddevice-style input stream that feeds `audio` to `callback` in blocks
+    from a background thread, then silence until stopped.
+    """
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        samplerate: float,
+        channels: int,
+        callback: Callable[[np.ndarray, int, Any, Any], None],
+        blocksize: int = 0,
+        realtime: bool = True,
+        **_: Any,
+    ) -> None:
+        self.audio = audio
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or max(1, int(samplerate) // 50)
+        self.realtime = realtime
+        self.frames_delivered = 0
+        self.closed = False
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def _feed(self) -> None:
+        block_seconds = self.blocksize / self.samplerate
+        silence = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        while not self._stop_event.is_set():
+            start = self.frames_delivered
+            block = self.audio[start : start + self.blocksize]
+            if len(block) < self.blocksize:
+                block = np.concatenate([block, silence[len(block) :]], axis=0)
+            self.callback(block, len(block), None, None)
+            self.frames_delivered += len(block)
+            # Without realtime pacing, yield briefly so readers are not starved
+            self._stop_event.wait(block_seconds if self.realtime else 0.0005)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        self.closed = True
+
+
+class FakeSoundDevice:
+    """
+    Drop-in for the `sounddevice` module that replays WAV files as microphone
+    input, for `AudioCaptureService(backend=FakeSoundDevice([...]))`.
+    """
+
+    def __init__(self, wav_paths: Sequence[str | Path], realtime: bool = True) -> None:
+        self.wav_paths = list(wav_paths)
+        self.realtime = realtime
+        self.streams: list[FakeInputStream] = []
+
+    def InputStream(  # noqa: N802
+        self,
+        *,
+        samplerate: float,
+        channels: int,
+        dtype: str = "float32",
+        callback: Callable[[np.ndarray, int, Any, Any], None],
+        **kwargs: Any,
+    ) -> FakeInputStream:
+        clips = [
+            load_wav_float32(path, int(samplerate), channels) for path in self.wav_paths
+        ]
+        audio = (
+            np.concatenate(clips, axis=0)
+            if clips
+            else np.zeros((0, channels), dtype=np.float32)
+        )
+        stream = FakeInputStream(
+            audio, samplerate, channels, callback, realtime=self.realtime, **kwargs
+        )
+        self.streams.append(stream)
+        return stream
+
+
+class FakeOpenAI:
+    """
+    OpenAI client stand-in for the speech endpoints `audio_utils` uses:
+    each new upload is transcribed as the next of `transcripts` (an empty string
+    once they run out, which ends an audio chat), and speech writes `speech_bytes` of
+    placeholder audio. The first `transcription_failures` transcription attempts
+    raise ConnectionError, to exercise retries. Install it with
+    `audio_backends(client_factory=...)`.
+    """
+
+    def __init__(
+        self,
+        transcripts: Iterable[str],
+        latency_seconds: float = 0.0,
+        speech_bytes: int = 4096,
+        transcription_failures: int = 0,
+    ) -> None:
+        self._transcripts: Iterator[str] = iter(transcripts)
+        self.transcription_failures = transcription_failures
+        self._lock = threading.Lock()
+        self.latency_seconds = latency_seconds
+        self.speech_bytes = speech_bytes
+        self.transcriptions = 0
+        self.speeches = 0
+        self._last_upload: Any = None
+        self._last_text = ""
+        self.audio = SimpleNamespace(
+            transcriptions=SimpleNamespace(create=self._transcribe),
+            speech=SimpleNamespace(
+                with_streaming_response=SimpleNamespace(create=self._speech)
+            ),
+        )
+
+    def __call__(self) -> "FakeOpenAI":
+        # Usable directly as the client factory
+        return self
+
+    def with_options(self, **_: Any) -> "FakeOpenAI":
+        return self
+
+    def _transcribe(self, model: str, file: Any, **_: Any) -> SimpleNamespace:
+        time.sleep(self.latency_seconds)
+        with self._lock:
+            self.transcriptions += 1
+            if self.transcriptions <= self.transcription_failures:
+                raise ConnectionError("fake transcription failure")
+            # Hedges and retries re-send the same upload: same audio, same text
+            if file is not self._last_upload:
+                self._last_upload = file
+                self._last_text = next(self._transcripts, "")
+            return SimpleNamespace(text=self._last_text)
+
+    @contextmanager
+    def _speech(
+        self,
+        model: str,
+        voice: str,
+        input: str,
+        **_: Any,  # noqa: A002
+    ) -> Iterator[Any]:
+        time.sleep(self.latency_seconds)
+        with self._lock:
+            self.speeches += 1
+        payload = bytes(self.speech_bytes)
+        yield SimpleNamespace(
+            stream_to_file=lambda path: Path(path).write_bytes(payload)
+        )
@@ -0,0 +1,185 @@
+"""
+Load test for the chat server against a local mock LLM and mock crew.
+
+Starts a `ChatServer` in-process on a free port, drives it with concurrent
+simulated users over HTTP and reports sessions/sec and turn latency percentiles.
+The `overload` scenario shrinks the crew job queue so confirmations are
+rejected with 429, and checks that no rejected turn left an empty reply.
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any
+
+import click
+
+from twin_crew.chat_server import ChatServer, CrewJobQueue
+from twin_crew.custom_chat import (
+    ChatContext,
+    build_system_message,
+    generate_crew_tool_schema,
+)
+from twin_crew_testing.fakes import MockChatLLM, MockCrew, mock_chat_inputs
+
+# Queue sizes for the overload scenario: one running crew job and one waiting.
+OVERLOAD_CREW_JOBS = 1
+OVERLOAD_QUEUED_CREW_JOBS = 1
+OVERLOAD_CREW_SECONDS = 2.0
+
+SCRIPTED_TURNS: tuple[str, ...] = (
+    "Hi! I have a startup idea I'd like to pitch to you.",
+    "An AI agent marketplace for small businesses.",
+    "Yes, go ahead.",
+    "Thanks, that looks great.",
+)
+
+
+def _request(
+    base_url: str, method: str, path: str, payload: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(
+        f"{base_url}{path}",
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        result: dict[str, Any] = json.loads(response.read())
+        return result
+
+
+def _percentile(samples: list[float], quantile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(quantile * (len(ordered) - 1))))]
+
+
+def mock_chat_context(llm_latency: float, crew_seconds: float) -> ChatContext:
+    chat_inputs = mock_chat_inputs()
+    return ChatContext(
+        crew=MockCrew(crew_seconds),
+        chat_llm=MockChatLLM(llm_latency),
+        chat_inputs=chat_inputs,
+        tool_schema=generate_crew_tool_schema(chat_inputs),
+        system_message=build_system_message(chat_inputs, None),
+        introductory_message="Hi, I'm the mock assistant.",
+        speaker_label="Assistant",
+    )
+
+
+@click.command()
+@click.option("--sessions", default=200, show_default=True, help="Total sessions.")
+@click.option("--concurrency", default=20, show_default=True, help="Parallel users.")
+@click.option(
+    "--llm-latency", default=0.05, show_default=True, help="Mock LLM delay (s)."
+)
+@click.option(
+    "--crew-seconds", default=0.5, show_default=True, help="Mock crew run (s)."
+)
+@click.option("--max-crew-jobs", default=4, show_default=True)
+@click.option("--max-queued-crew-jobs", default=32, show_default=True)
+@click.option(
+    "--scenario",
+    type=click.Choice(["steady", "overload"]),
+    default="steady",
+    show_default=True,
+    help="'overload' shrinks the crew queue until confirmations get 429.",
+)
+def main(
+    sessions: int,
+    concurrency: int,
+    llm_latency: float,
+    crew_seconds: float,
+    max_crew_jobs: int,
+    max_queued_crew_jobs: int,
+    scenario: str,
+) -> None:
+    """Report sessions/sec and p95 turn latency for the chat server."""
+    if scenario == "overload":
+        max_crew_jobs = OVERLOAD_CREW_JOBS
+        max_queued_crew_jobs = OVERLOAD_QUEUED_CREW_JOBS
+        crew_seconds = max(crew_seconds, OVERLOAD_CREW_SECONDS)
+    server = ChatServer(
+        ("127.0.0.1", 0),
+        mock_chat_context(llm_latency, crew_seconds),
+        CrewJobQueue(max_crew_jobs, max_queued_crew_jobs),
+    )
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    turn_latencies: list[float] = []
+    errors: list[str] = []
+    rejected_turns = 0
+    empty_replies = 0
+    results_lock = threading.Lock()
+    remaining = iter(range(sessions))
+    remaining_lock = threading.Lock()
+
+    def simulated_user() -> None:
+        nonlocal rejected_turns, empty_replies
+        while True:
+            with remaining_lock:
+                if next(remaining, None) is None:
+                    return
+            try:
+                session_id = _request(base_url, "POST", "/sessions")["session_id"]
+                for turn in SCRIPTED_TURNS:
+                    start_time = time.monotonic()
+                    try:
+                        reply = _request(
+                            base_url,
+                            "POST",
+                            f"/sessions/{session_id}/messages",
+                            {"content": turn},
+                        )["reply"]
+                    except urllib.error.HTTPError as e:
+                        if e.code != 429:
+                            raise
+                        with results_lock:
+                            rejected_turns += 1
+                        continue
+                    with results_lock:
+                        turn_latencies.append(time.monotonic() - start_time)
+                        empty_replies += not reply
+                _request(base_url, "DELETE", f"/sessions/{session_id}")
+            except (urllib.error.URLError, OSError, KeyError) as e:
+                with results_lock:
+                    errors.append(str(e))
+
+    start_time = time.monotonic()
+    users = [
+        threading.Thread(target=simulated_user, daemon=True) for _ in range(concurrency)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - start_time
+    server.shutdown()
+    server.server_close()
+
+    completed = sessions - len(errors)
+    click.secho("Chat server load test", fg="green")
+    click.echo(f"  sessions:        {completed}/{sessions} in {elapsed:.2f}s")
+    click.echo(f"  sessions/sec:    {completed / elapsed:.2f}")
+    click.echo(f"  turns:           {len(turn_latencies)}")
+    click.echo(f"  rejected (429):  {rejected_turns}")
+    click.echo(f"  empty replies:   {empty_replies}")
+    click.echo(f"  p50 turn (ms):   {_percentile(turn_latencies, 0.50) * 1000:.0f}")
+    click.echo(f"  p95 turn (ms):   {_percentile(turn_latencies, 0.95) * 1000:.0f}")
+    click.echo(f"  p99 turn (ms):   {_percentile(turn_latencies, 0.99) * 1000:.0f}")
+    if errors:
+        click.secho(f"  errors: {len(errors)} (first: {errors[0]})", fg="yellow")
+    if scenario == "overload" and (not rejected_turns or empty_replies):
+        raise click.ClickException(
+            "Overload scenario expected 429 rejections and no empty replies."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Offline soak test of the voice chat loop.
+
+Runs `audio_chat_loop` for many turns against fakes: a WAV-replaying
+microphone, a fake OpenAI speech client, a no-op audio player, the mock chat
+LLM and the mock crew. A `ResourceMonitor` samples every turn, and the run
+exits non-zero when any metric grows faster per turn than its leak threshold.
+"""
+
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import click
+import numpy as np
+from scipy.io import wavfile
+
+from twin_crew.audio_capture import AudioCaptureService
+from twin_crew.audio_utils import audio_backends
+from twin_crew.custom_chat import audio_chat_loop, create_tool_function
+from twin_crew.instrumentation import ResourceMonitor, TurnSample
+from twin_crew.rate_limiter import LIMITS_CONFIG_ENV_VAR, get_governor
+from twin_crew.semantic_cache import RESPONSE_CACHE_ENV_VAR
+from twin_crew.session_store import SessionLog, SessionStore
+from twin_crew.tts_cache import CACHE_DIR_ENV_VAR, TTS_CACHE_ENV_VAR
+from twin_crew_testing.fakes import FakeOpenAI, FakeSoundDevice
+from twin_crew_testing.loadtest import SCRIPTED_TURNS, mock_chat_context
+
+SAMPLE_RATE_HZ = 16000
+# The fakes cost nothing, so the soak must not be throttled by the real budget
+UNLIMITED_LIMITS = (
+    "requests_per_minute: 1000000000\n"
+    "tokens_per_minute: 1000000000\n"
+    "max_concurrency: 64\n"
+    "interactive_reserve: 0\n"
+)
+# Pause before each scripted Enter so the fake microphone delivers audio
+# between the presses; the pre-roll is cleared after every reply
+ENTER_DELAY_SECONDS = 0.01
+
+
+class _ScriptedEnterPresses(io.StringIO):
+    """stdin for `record_audio`: `presses` Enter presses, each after a short pause."""
+
+    def __init__(self, presses: int) -> None:
+        super().__init__("\n" * presses)
+
+    def readline(self, size: int | None = -1, /) -> str:  # type: ignore[override]
+        time.sleep(ENTER_DELAY_SECONDS)
+        return super().readline(-1 if size is None else size)
+
+
+def _write_utterance(path: Path, seconds: float = 1.0) -> None:
+    times = np.arange(int(SAMPLE_RATE_HZ * seconds)) / SAMPLE_RATE_HZ
+    tone = 0.2 * np.sin(2 * np.pi * 220.0 * times)
+    wavfile.write(path, SAMPLE_RATE_HZ, np.int16(tone * 32767))
+
+
+def _report_progress(every: int) -> Callable[[TurnSample], None]:
+    def report(sample: TurnSample) -> None:
+        if sample.turn % every:
+            return
+        rss = f"{sample.rss_bytes / 2**20:.0f} MiB" if sample.rss_bytes else "-"
+        click.echo(
+            f"turn {sample.turn}: traced {sample.traced_bytes / 2**20:.1f} MiB, "
+            f"rss {rss}, threads {sample.threads}, temp files {sample.temp_files}, "
+            f"transcript {sample.transcript_messages} messages"
+            + (f", leaks {sorted(sample.leaks)}" if sample.leaks else ""),
+            err=True,
+        )
+
+    return report
+
+
+@click.command()
+@click.option("--turns", default=1000, show_default=True, help="Voice turns to run.")
+@click.option(
+    "--metrics-path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSONL metrics file [default: soak_metrics_<timestamp>.jsonl].",
+)
+@click.option(
+    "--llm-latency", default=0.0, show_default=True, help="Mock LLM delay (s)."
+)
+@click.option(
+    "--crew-seconds", default=0.0, show_default=True, help="Mock crew run (s)."
+)
+@click.option(
+    "--warmup-turns",
+    default=20,
+    show_default=True,
+    help="Turns before growth is measured and the allocation baseline is taken.",
+)
+@click.option(
+    "--snapshot-every",
+    default=1,
+    show_default=True,
+    help="Turns between tracemalloc snapshots (leaking turns always snapshot).",
+)
+@click.option("--progress-every", default=100, show_default=True)
+@click.option("--verbose", is_flag=True, help="Show the chat output of every turn.")
+def main(
+    turns: int,
+    metrics_path: str | None,
+    llm_latency: float,
+    crew_seconds: float,
+    warmup_turns: int,
+    snapshot_every: int,
+    progress_every: int,
+    verbose: bool,
+) -> None:
+    """Run a long offline voice session and flag per-turn resource growth."""
+    output_path = Path(
+        metrics_path or f"soak_metrics_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+    ).resolve()
+
+    with tempfile.TemporaryDirectory(prefix="twin_crew_soak_") as workdir:
+        work = Path(workdir)
+        utterance = work / "utterance.wav"
+        _write_utterance(utterance)
+        (work / "limits.yaml").write_text(UNLIMITED_LIMITS, encoding="utf-8")
+        os.environ[LIMITS_CONFIG_ENV_VAR] = str(work / "limits.yaml")
+        # The scripted turns repeat, so cache hits would skip the chat LLM and
+        # TTS work of most turns; every turn must exercise the full pipeline
+        os.environ[RESPONSE_CACHE_ENV_VAR] = "0"
+        os.environ[TTS_CACHE_ENV_VAR] = "0"
+        os.environ[CACHE_DIR_ENV_VAR] = str(work / "cache")
+        get_governor.cache_clear()
+
+        context = mock_chat_context(llm_latency, crew_seconds)
+        messages = context.new_messages()
+        available_functions = {
+            context.chat_inputs.crew_name: create_tool_function(context.crew, messages)
+        }
+        store = SessionStore(work / "sessions.db")
+        session_log = SessionLog(
+            store,
+            store.create_session(
+                context.chat_inputs,
+                context.tool_schema,
+                context.system_message,
+                context.introductory_message,
+                context.speaker_label,
+            ),
+        )
+        speech_api = FakeOpenAI(
+            itertools.islice(itertools.cycle(SCRIPTED_TURNS), turns)
+        )
+        capture = AudioCaptureService(
+            SAMPLE_RATE_HZ, backend=FakeSoundDevice([utterance], realtime=False)
+        )
+        monitor = ResourceMonitor(
+            output_path,
+            warmup_turns=warmup_turns,
+            snapshot_every=snapshot_every,
+            on_sample=_report_progress(progress_every),
+        )
+
+        click.secho(f"Soaking {turns} voice turns offline...", fg="cyan", err=True)
+        previous_cwd, previous_stdin = os.getcwd(), sys.stdin
+        # TTS files are written to the working directory; record_audio waits
+        # for Enter twice per turn
+        os.chdir(work)
+        sys.stdin = _ScriptedEnterPresses(2 * turns + 2)
+        start_time = time.monotonic()
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as devnull:
+                chat_output = sys.stdout if verbose else devnull
+                with (
+                    redirect_stdout(chat_output),
+                    audio_backends(client_factory=speech_api, player=lambda _: None),
+                    capture,
+                    monitor,
+                ):
+                    # Let the stream fill the pre-roll before the first turn
+                    time.sleep(capture.pre_roll_frames / SAMPLE_RATE_HZ + 0.1)
+                    audio_chat_loop(
+                        context.chat_llm,
+                        messages,
+                        context.tool_schema,
+                        available_functions,
+                        context.speaker_label,
+                        capture=capture,
+                        session_log=session_log,
+                        monitor=monitor,
+                    )
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+            store.close()
+        elapsed = time.monotonic() - start_time
+
+    summary = monitor.summary()
+    click.secho("Voice session soak test", fg="green")
+    click.echo(f"  turns:           {summary['turns']}/{turns} in {elapsed:.1f}s")
+    click.echo(f"  metrics:         {output_path}")
+    for name, slope in summary["growth_per_turn"].items():
+        flag = "  LEAK" if name in summary["leaks"] else ""
+        click.echo(f"  {name + ' / turn:':<24} {slope:+.3f}{flag}")
+    for site in summary["top_allocations"]:
+        click.echo(f"  grew: {site}")
+    if summary["turns"] < turns or summary["leaks"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
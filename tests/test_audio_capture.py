@@ -0,0 +1,110 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from twin_crew.audio_capture import AudioCaptureService, AudioRingBuffer
+from twin_crew_testing.fakes import FakeInputStream, FakeSoundDevice
+
+SAMPLE_RATE_HZ = 16000
+PRE_ROLL_SECONDS = 0.25
+PRE_ROLL_FRAMES = int(PRE_ROLL_SECONDS * SAMPLE_RATE_HZ)
+INT16_MAX = float(np.iinfo(np.int16).max)
+
+
+@pytest.fixture
+def ramp_wav(tmp_path: Path) -> Path:
+    """Two seconds of int16 samples 0, 1, 2, ... so positions can be read back."""
+    path = tmp_path / "ramp.wav"
+    wavfile.write(path, SAMPLE_RATE_HZ, np.arange(2 * SAMPLE_RATE_HZ, dtype=np.int16))
+    return path
+
+
+def sample_indices(audio: np.ndarray) -> np.ndarray:
+    return np.rint(audio[:, 0] * INT16_MAX).astype(np.int64)
+
+
+def wait_for_frames(stream: FakeInputStream, frames: int) -> None:
+    deadline = time.monotonic() + 5.0
+    while stream.frames_delivered < frames:
+        assert time.monotonic() < deadline, "fake stream stopped delivering audio"
+        time.sleep(0.005)
+
+
+def make_capture(wav_path: Path) -> tuple[AudioCaptureService, FakeSoundDevice]:
+    backend = FakeSoundDevice([wav_path])
+    capture = AudioCaptureService(
+        sample_rate_hz=SAMPLE_RATE_HZ,
+        pre_roll_seconds=PRE_ROLL_SECONDS,
+        buffer_seconds=1.0,
+        backend=backend,
+    )
+    return capture, backend
+
+
+def test_ring_buffer_wraps_and_clears() -> None:
+    ring = AudioRingBuffer(capacity_frames=4)
+    ring.write(np.arange(6, dtype=np.float32)[:, np.newaxis])
+
+    assert ring.latest(3)[:, 0].tolist() == [3.0, 4.0, 5.0]
+    assert ring.latest(10)[:, 0].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+    ring.clear()
+    assert len(ring.latest(3)) == 0
+
+
+def test_turn_starts_with_pre_roll_from_before_the_trigger(ramp_wav: Path) -> None:
+    capture, backend = make_capture(ramp_wav)
+    with capture:
+        stream = backend.streams[0]
+        wait_for_frames(stream, 2 * PRE_ROLL_FRAMES)
+        capture.begin_turn()
+        triggered_at = stream.frames_delivered
+        wait_for_frames(stream, triggered_at + PRE_ROLL_FRAMES)
+        turn = capture.end_turn()
+
+    indices = sample_indices(turn)
+    # One contiguous stretch of the source, reaching a full pre-roll back
+    assert np.all(np.diff(indices) == 1)
+    assert indices[0] <= triggered_at - PRE_ROLL_FRAMES
+    assert indices[-1] >= triggered_at + PRE_ROLL_FRAMES - 1
+
+
+def test_turns_are_framed_by_begin_and_end(ramp_wav: Path) -> None:
+    capture, backend = make_capture(ramp_wav)
+    with capture:
+        stream = backend.streams[0]
+        assert len(capture.end_turn()) == 0
+
+        wait_for_frames(stream, PRE_ROLL_FRAMES)
+        capture.begin_turn()
+        wait_for_frames(stream, stream.frames_delivered + 800)
+        first = sample_indices(capture.end_turn())
+
+        wait_for_frames(stream, stream.frames_delivered + PRE_ROLL_FRAMES)
+        capture.begin_turn()
+        wait_for_frames(stream, stream.frames_delivered + 800)
+        second = sample_indices(capture.end_turn())
+
+    assert capture.is_running is False
+    assert stream.closed
+    # Audio between the turns is only reachable through the second pre-roll
+    assert second[0] > first[-1]
+    assert len(second) >= PRE_ROLL_FRAMES
+
+
+def test_clear_pre_roll_drops_audio_heard_before_it(ramp_wav: Path) -> None:
+    capture, backend = make_capture(ramp_wav)
+    with capture:
+        stream = backend.streams[0]
+        wait_for_frames(stream, 2 * PRE_ROLL_FRAMES)
+        cleared_at = stream.frames_delivered
+        capture.clear_pre_roll()
+        capture.begin_turn()
+        wait_for_frames(stream, stream.frames_delivered + 800)
+        turn = sample_indices(capture.end_turn())
+
+    # At most the block being delivered while clearing can precede the clear
+    assert turn[0] >= cleared_at - stream.blocksize
@@ -0,0 +1,78 @@
+import dataclasses
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from twin_crew.chat_server import ChatServer, SessionLimitError
+from twin_crew_testing.loadtest import mock_chat_context
+
+
+@pytest.fixture
+def server() -> Iterator[ChatServer]:
+    chat_server = ChatServer(
+        ("127.0.0.1", 0),
+        mock_chat_context(llm_latency=0.0, crew_seconds=0.0),
+        max_sessions=1,
+        session_ttl_seconds=60.0,
+    )
+    yield chat_server
+    chat_server.server_close()
+
+
+def test_idle_sessions_are_evicted_to_make_room(server: ChatServer) -> None:
+    abandoned = server.create_session()
+    with pytest.raises(SessionLimitError):
+        server.create_session()
+
+    abandoned.last_active -= 120.0
+    fresh = server.create_session()
+    assert server.get_session(abandoned.session_id) is None
+    assert server.get_session(fresh.session_id) is fresh
+
+
+def test_session_in_a_turn_is_not_evicted(server: ChatServer) -> None:
+    busy = server.create_session()
+    busy.last_active -= 120.0
+    with busy.lock, pytest.raises(SessionLimitError):
+        server.create_session()
+    assert server.get_session(busy.session_id) is busy
+
+
+def test_session_limit_is_reported_as_unavailable(server: ChatServer) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/sessions"
+    try:
+        urllib.request.urlopen(urllib.request.Request(url, method="POST"))
+        with pytest.raises(urllib.error.HTTPError) as rejected:
+            urllib.request.urlopen(urllib.request.Request(url, method="POST"))
+    finally:
+        server.shutdown()
+    assert rejected.value.code == 503
+    assert "sessions" in json.loads(rejected.value.read())["error"]
+
+
+class FailingLLM:
+    """Chat LLM whose every call fails with a non-retryable error."""
+
+    model = "failing-llm"
+    timeout: float | None = None
+
+    def call(self, *_: Any, **__: Any) -> str:
+        raise ValueError("invalid request")
+
+
+def test_failed_turn_leaves_the_transcript_unchanged(server: ChatServer) -> None:
+    server.context = dataclasses.replace(server.context, chat_llm=FailingLLM())
+    session = server.create_session()
+    before = list(session.messages)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            server.handle_turn(session, "Hi, I have a startup idea.")
+    # A resent message is not stored twice
+    assert session.messages == before
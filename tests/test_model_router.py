@@ -0,0 +1,133 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from crewai.llm import LLM
+
+from twin_crew.model_router import (
+    MODELS_CONFIG_ENV_VAR,
+    ModelRouter,
+    ModelTier,
+    RoutedLLM,
+    llm_for_call_site,
+    load_model_router,
+)
+
+CONFIG = """\
+tiers:
+  fast:
+    model: test-fast
+    latency_budget_seconds: 2
+    fallback: heavy
+  heavy:
+    model: test-heavy
+call_sites:
+  presenter: fast
+  dialogue: heavy
+agents:
+  pitch_writer: heavy
+"""
+
+
+class ProviderStub:
+    """Stands in for `LLM.call`; the `fast` model always times out."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, float | None]] = []
+
+    def call(self, llm: LLM, *_: Any, **__: Any) -> str:
+        self.calls.append((llm.model, llm.timeout))
+        if llm.model == "test-fast":
+            raise TimeoutError("request timed out")
+        if llm.model == "test-broken":
+            raise ValueError("invalid request")
+        return f"answer from {llm.model}"
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> ProviderStub:
+    stub = ProviderStub()
+    monkeypatch.setattr(
+        LLM, "call", lambda self, *args, **kwargs: stub.call(self, *args, **kwargs)
+    )
+    return stub
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    path = tmp_path / "models.yaml"
+    path.write_text(CONFIG)
+    monkeypatch.setenv(MODELS_CONFIG_ENV_VAR, str(path))
+    load_model_router.cache_clear()
+    yield path
+    load_model_router.cache_clear()
+
+
+def test_packaged_config_routes_call_sites_and_agents(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv(MODELS_CONFIG_ENV_VAR, raising=False)
+    load_model_router.cache_clear()
+    try:
+        router = load_model_router()
+        assert router.tiers["fast"].fallback == "heavy"
+        presenter = router.for_call_site("presenter")
+        dialogue = router.for_call_site("dialogue")
+        assert presenter is not None and dialogue is not None
+        assert presenter.model != dialogue.model
+        assert router.for_agent("unmapped_agent") is None
+    finally:
+        load_model_router.cache_clear()
+
+
+def test_config_override_and_call_site_resolution(config_file: Path) -> None:
+    router = load_model_router()
+    dialogue = router.for_call_site("dialogue")
+    assert isinstance(dialogue, RoutedLLM)
+    assert dialogue.model == "test-heavy"
+    assert router.for_agent("pitch_writer") is dialogue  # one LLM per tier
+    assert llm_for_call_site(dialogue, "presenter").model == "test-fast"
+    # Unrouted call sites keep the chat LLM
+    assert llm_for_call_site(dialogue, "unknown") is dialogue
+    # LLMs that did not come from the router are used as they are
+    plain = LLM(model="custom")
+    assert llm_for_call_site(plain, "presenter") is plain
+
+
+def test_timeout_on_the_fast_tier_is_answered_by_the_fallback(
+    config_file: Path, provider: ProviderStub
+) -> None:
+    presenter = load_model_router().for_call_site("presenter")
+    assert presenter is not None
+
+    answer = presenter.call([{"role": "user", "content": "Present this."}])
+
+    assert answer == "answer from test-heavy"
+    assert [model for model, _ in provider.calls] == ["test-fast", "test-heavy"]
+    # The primary request was sent with the tier's budget as its timeout
+    _, primary_timeout = provider.calls[0]
+    assert primary_timeout == 2
+
+
+def test_other_errors_are_not_sent_to_the_fallback(provider: ProviderStub) -> None:
+    router = ModelRouter(
+        {
+            "fast": ModelTier("fast", "test-broken", 2, "heavy"),
+            "heavy": ModelTier("heavy", "test-heavy"),
+        },
+        {"presenter": "fast"},
+        {},
+    )
+    presenter = router.for_call_site("presenter")
+    assert presenter is not None
+    with pytest.raises(ValueError):
+        presenter.call([{"role": "user", "content": "Present this."}])
+    assert [model for model, _ in provider.calls] == ["test-broken"]
+
+
+def test_routes_to_unknown_tiers_are_rejected() -> None:
+    with pytest.raises(ValueError, match="unknown tier"):
+        ModelRouter(
+            {"heavy": ModelTier("heavy", "test-heavy")}, {"presenter": "fast"}, {}
+        )
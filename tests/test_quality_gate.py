@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from twin_crew.quality_gate import (
+    DEFAULT_QUALITY_GATE_CONFIG,
+    QUALITY_GATE_LOG_ENV_VAR,
+    QualityGate,
+    default_gate_log,
+)
+
+PASSING_DRAFT = """\
+## The Problem
+Small robotics teams struggle to ship reliable agentic systems because their
+data pipelines break whenever models, sensors or customers change.
+
+## Our Solution
+We are building an orchestration layer on scalable infrastructure that
+schedules training, evaluation and deployment jobs, so a team of three can
+run what used to need a dedicated platform group.
+
+## Market Opportunity
+The market for robotics software is growing quickly, with thousands of new
+teams every year that need machine learning operations they cannot build.
+
+## Why Enrique
+Enrique brings years of MLOps work with Kubeflow and Airflow, plus research
+at Harvard and MIT, exactly the mix this company needs as co-founder.
+"""
+
+# Long enough and on topic, but a single paragraph with no sections
+FAILING_DRAFT = " ".join(["We are excited about agentic machine learning."] * 20)
+
+
+@pytest.fixture
+def gate() -> QualityGate:
+    return QualityGate.from_yaml(DEFAULT_QUALITY_GATE_CONFIG)
+
+
+def test_complete_draft_passes(gate: QualityGate) -> None:
+    decision = gate.check(PASSING_DRAFT, "refine")
+    assert decision.reasons == []
+    assert decision.passed
+    assert decision.paragraph_count == 4
+    assert {"agentic", "kubeflow", "airflow"} <= set(decision.fit_keywords)
+
+
+def test_unstructured_draft_fails(gate: QualityGate) -> None:
+    decision = gate.check(FAILING_DRAFT, "refine")
+    assert not decision.passed
+    assert decision.paragraph_count == 1
+    assert set(decision.missing_sections) == {
+        "problem",
+        "solution",
+        "market",
+        "cofounder_fit",
+    }
+    assert gate.should_refine(SimpleNamespace(raw=FAILING_DRAFT))
+
+
+def test_decisions_are_logged_only_when_opted_in(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv(QUALITY_GATE_LOG_ENV_VAR, raising=False)
+    assert default_gate_log() is None
+
+    log_path = tmp_path / "gate.jsonl"
+    monkeypatch.setenv(QUALITY_GATE_LOG_ENV_VAR, str(log_path))
+    gate = QualityGate.from_yaml(DEFAULT_QUALITY_GATE_CONFIG, default_gate_log())
+    assert not gate.should_refine(SimpleNamespace(raw=PASSING_DRAFT), "refine")
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [(entry["task"], entry["passed"]) for entry in entries] == [("refine", True)]
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from twin_crew.rate_limiter import (
+    LIMITS_CONFIG_ENV_VAR,
+    LIMITS_SHARE_ENV_VAR,
+    Priority,
+    RateGovernor,
+    get_governor,
+)
+
+
+def unlimited(max_concurrency: int, interactive_reserve: int = 0) -> RateGovernor:
+    """A governor whose rate budgets never make anyone wait."""
+    return RateGovernor(
+        requests_per_minute=1e6,
+        tokens_per_minute=1e9,
+        max_concurrency=max_concurrency,
+        interactive_reserve=interactive_reserve,
+    )
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def start_caller(
+    governor: RateGovernor, priority: Priority, admitted: list[Priority]
+) -> threading.Thread:
+    def call() -> None:
+        with governor.acquire(1, priority):
+            admitted.append(priority)
+
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_interactive_caller_overtakes_a_waiting_batch_caller() -> None:
+    governor = unlimited(max_concurrency=1)
+    admitted: list[Priority] = []
+    with governor.acquire(1, Priority.BATCH):
+        batch = start_caller(governor, Priority.BATCH, admitted)
+        wait_until(lambda: governor.stats()["waiting"] == 1)
+        interactive = start_caller(governor, Priority.INTERACTIVE, admitted)
+        wait_until(lambda: governor.stats()["waiting"] == 2)
+    batch.join(2.0)
+    interactive.join(2.0)
+    assert admitted == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+def test_reserved_slots_are_kept_for_interactive_calls() -> None:
+    governor = unlimited(max_concurrency=2, interactive_reserve=1)
+    admitted: list[Priority] = []
+    with governor.acquire(1, Priority.BATCH):
+        batch = start_caller(governor, Priority.BATCH, admitted)
+        wait_until(lambda: governor.stats()["waiting"] == 1)
+        # The batch caller waits for the reserved slot, so it is not served
+        # ahead of the interactive caller that can use it
+        interactive = start_caller(governor, Priority.INTERACTIVE, admitted)
+        interactive.join(2.0)
+        assert admitted == [Priority.INTERACTIVE]
+        assert batch.is_alive()
+    batch.join(2.0)
+    assert admitted == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+def test_tool_calls_do_not_take_a_concurrency_slot() -> None:
+    governor = unlimited(max_concurrency=1)
+    with governor.acquire(1), governor.acquire(1, hold_slot=False) as permit:
+        assert not permit.holds_slot
+        assert governor.stats()["in_flight"] == 1
+    assert governor.stats()["in_flight"] == 0
+
+
+def test_interrupted_wait_leaves_the_queue(monkeypatch: pytest.MonkeyPatch) -> None:
+    governor = unlimited(max_concurrency=1)
+    with governor.acquire(1):
+
+        def interrupted_wait(timeout: float | None = None) -> bool:
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(governor._condition, "wait", interrupted_wait)
+        with pytest.raises(KeyboardInterrupt):
+            with governor.acquire(1):
+                pass
+        monkeypatch.undo()
+        assert governor.stats()["waiting"] == 0
+
+    admitted: list[Priority] = []
+    start_caller(governor, Priority.BATCH, admitted).join(2.0)
+    assert admitted == [Priority.BATCH]
+
+
+@pytest.fixture
+def fresh_governor() -> Iterator[None]:
+    get_governor.cache_clear()
+    yield
+    get_governor.cache_clear()
+
+
+def test_worker_share_scales_the_limits(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fresh_governor: None
+) -> None:
+    limits = tmp_path / "limits.yaml"
+    limits.write_text(
+        "requests_per_minute: 400\n"
+        "tokens_per_minute: 100000\n"
+        "max_concurrency: 8\n"
+        "interactive_reserve: 2\n"
+    )
+    monkeypatch.setenv(LIMITS_CONFIG_ENV_VAR, str(limits))
+    monkeypatch.setenv(LIMITS_SHARE_ENV_VAR, "0.25")
+
+    governor = get_governor()
+    assert governor.requests.capacity == 100
+    assert governor.tokens.capacity == 25000
+    assert governor.max_concurrency == 2
+    # The reserve never takes every slot, or batch work could never run
+    assert governor.interactive_reserve == 1
@@ -0,0 +1,233 @@
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from twin_crew.audio_utils import audio_backends, encode_wav_for_stt, transcribe_audio
+from twin_crew.resilience import (
+    AttemptTimeoutError,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_resilience,
+    full_jitter_delay,
+    hedged,
+    is_retryable,
+    metrics,
+    run_with_timeout,
+)
+from twin_crew_testing.fakes import FakeOpenAI
+
+NO_BACKOFF = RetryPolicy(base_delay_seconds=0.0, attempt_timeout_seconds=5.0)
+
+
+def http_error(status: int) -> Exception:
+    error = Exception(f"HTTP {status}")
+    error.response = SimpleNamespace(status_code=status)  # type: ignore[attr-defined]
+    return error
+
+
+def test_full_jitter_delay_is_bounded_by_the_capped_exponential() -> None:
+    policy = RetryPolicy(base_delay_seconds=0.5, max_delay_seconds=3.0)
+    for attempt, ceiling in [(1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (8, 3.0)]:
+        delays = [full_jitter_delay(attempt, policy) for _ in range(200)]
+        assert min(delays) >= 0.0
+        assert max(delays) <= ceiling
+        # Full jitter spreads over the whole range, not just near the ceiling
+        assert min(delays) < ceiling / 2
+
+
+@pytest.mark.parametrize(
+    ("error", "retryable"),
+    [
+        (TimeoutError(), True),
+        (ConnectionError(), True),
+        (http_error(429), True),
+        (http_error(503), True),
+        (http_error(400), False),
+        (ValueError("bad input"), False),
+        (CircuitOpenError("open"), False),
+    ],
+)
+def test_is_retryable(error: Exception, retryable: bool) -> None:
+    assert is_retryable(error) is retryable
+
+
+def test_transient_errors_are_retried_until_success() -> None:
+    calls: list[float | None] = []
+
+    def flaky(timeout: float | None) -> str:
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    name = "test retry success"
+    assert call_with_resilience(name, flaky, NO_BACKOFF) == "ok"
+    assert len(calls) == 3
+    # Each attempt is told how long it may take
+    assert all(timeout is not None and timeout <= 5.0 for timeout in calls)
+    assert metrics.snapshot()[name]["retries"] == 2
+
+
+def test_fatal_errors_are_not_retried() -> None:
+    calls = 0
+
+    def invalid(_: float | None) -> str:
+        nonlocal calls
+        calls += 1
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_resilience("test fatal", invalid, NO_BACKOFF)
+    assert calls == 1
+
+
+def test_backoff_past_the_deadline_reraises_without_another_attempt(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        "twin_crew.resilience.full_jitter_delay", lambda attempt, policy: 1.0
+    )
+    policy = RetryPolicy(attempt_timeout_seconds=5.0, deadline_seconds=0.2)
+    timeouts: list[float | None] = []
+
+    def unreachable(timeout: float | None) -> str:
+        timeouts.append(timeout)
+        raise ConnectionError("reset")
+
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        call_with_resilience("test deadline", unreachable, policy)
+    assert time.monotonic() - start < 0.5
+    assert len(timeouts) == 1
+
+
+def test_circuit_breaker_opens_rejects_and_recovers_through_one_trial() -> None:
+    breaker = CircuitBreaker(
+        "test breaker", failure_threshold=2, reset_timeout_seconds=0.05
+    )
+    breaker.before_call()
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # half-open: the trial call is let through
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # ...but only one at a time
+    breaker.record_failure()  # a failed trial reopens at once
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_call()
+
+
+def test_open_circuit_short_circuits_calls() -> None:
+    breaker = CircuitBreaker("test open", failure_threshold=1, reset_timeout_seconds=60)
+    breaker.record_failure()
+    calls = 0
+
+    def never(_: float | None) -> str:
+        nonlocal calls
+        calls += 1
+        return "unreachable"
+
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience("test open", never, NO_BACKOFF, breaker=breaker)
+    assert calls == 0
+
+
+def test_interrupted_trial_call_does_not_leave_the_breaker_half_open() -> None:
+    breaker = CircuitBreaker(
+        "test interrupted trial", failure_threshold=1, reset_timeout_seconds=0.01
+    )
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    def interrupted(_: float | None) -> str:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call_with_resilience(
+            "test interrupted trial", interrupted, NO_BACKOFF, breaker=breaker
+        )
+    # The next call becomes the trial instead of being rejected
+    assert (
+        call_with_resilience(
+            "test interrupted trial", lambda _: "ok", NO_BACKOFF, breaker=breaker
+        )
+        == "ok"
+    )
+    assert not breaker.is_open
+
+
+def test_run_with_timeout_stops_waiting() -> None:
+    release = threading.Event()
+    with pytest.raises(AttemptTimeoutError):
+        run_with_timeout(lambda: release.wait(5.0), timeout_seconds=0.05)
+    release.set()
+
+
+def test_hedge_returns_the_first_copy_to_succeed() -> None:
+    launched = 0
+    lock = threading.Lock()
+
+    def slow_then_fast() -> str:
+        nonlocal launched
+        with lock:
+            launched += 1
+            copy = launched
+        if copy == 1:
+            time.sleep(1.0)
+            return "first"
+        return "hedge"
+
+    start = time.monotonic()
+    assert (
+        hedged(slow_then_fast, hedge_after_seconds=0.05, timeout_seconds=5.0) == "hedge"
+    )
+    assert time.monotonic() - start < 0.5
+    assert launched == 2
+
+
+def test_hedge_fails_only_when_both_copies_fail() -> None:
+    attempts = 0
+    lock = threading.Lock()
+
+    def failing() -> str:
+        nonlocal attempts
+        with lock:
+            attempts += 1
+            copy = attempts
+        time.sleep(0.1 if copy == 1 else 0.0)
+        raise ConnectionError(f"copy {copy}")
+
+    with pytest.raises(ConnectionError):
+        hedged(failing, hedge_after_seconds=0.02, timeout_seconds=5.0)
+    assert attempts == 2
+
+
+def test_stt_bytes_are_counted_for_every_attempt(tmp_path: Path) -> None:
+    wav_path = tmp_path / "turn.wav"
+    wavfile.write(wav_path, 16000, np.zeros(16000, dtype=np.int16))
+    upload_bytes = len(encode_wav_for_stt(wav_path, "whisper-1", None)[1])
+    speech_api = FakeOpenAI(["hello"], transcription_failures=1)
+
+    before = metrics.snapshot().get("Speech-to-Text", {}).get("bytes_sent", 0)
+    with audio_backends(client_factory=speech_api):
+        assert transcribe_audio(str(wav_path)) == "hello"
+    after = metrics.snapshot()["Speech-to-Text"]["bytes_sent"]
+
+    assert speech_api.transcriptions == 2
+    assert after - before == 2 * upload_bytes
@@ -0,0 +1,108 @@
+from collections.abc import Iterator
+
+import pytest
+
+from twin_crew import semantic_cache
+from twin_crew.custom_chat import handle_user_input
+
+SYSTEM_MESSAGE = "You are Enrique's digital twin."
+INTRODUCTION = "Hi, I'm Enrique's twin. What are you building?"
+PROPOSAL = "Got it. Shall I run the crew to draft your pitch?"
+
+
+class ScriptedLLM:
+    """Answers with `replies` in order and records every call it receives."""
+
+    def __init__(self, replies: list[str]) -> None:
+        # Shared with the shallow copies made to forward request timeouts
+        self.replies = replies
+        self.calls: list[str] = []
+        self.model = "scripted-llm"
+        self.timeout: float | None = None
+
+    def call(self, messages: list[dict[str, str]], **_: object) -> str:
+        self.calls.append(messages[-1]["content"])
+        return self.replies.pop(0)
+
+
+def new_session() -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "assistant", "content": INTRODUCTION},
+    ]
+
+
+def ask(llm: ScriptedLLM, messages: list[dict[str, str]], text: str) -> str | None:
+    return handle_user_input(text, llm, messages, {}, {}, "Twin", suppress_print=True)
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv(semantic_cache.RESPONSE_CACHE_ENV_VAR, "1")
+    monkeypatch.setattr(semantic_cache, "_response_cache", None)
+    yield
+
+
+def test_repeated_meta_question_is_served_without_the_llm() -> None:
+    llm = ScriptedLLM(["I'm Enrique's digital twin.", "Tell me more about it."])
+    messages = new_session()
+    assert ask(llm, messages, "Who are you?") == "I'm Enrique's digital twin."
+    ask(llm, messages, "We are building a marketplace for robotics data.")
+
+    # A later turn, after a different assistant reply, still hits
+    assert ask(llm, messages, "who are you") == "I'm Enrique's digital twin."
+    assert messages[-1]["content"] == "I'm Enrique's digital twin."
+    # ...and so does another session of the same crew
+    assert ask(llm, new_session(), "Who are you?") == "I'm Enrique's digital twin."
+    assert len(llm.calls) == 2
+
+
+def test_paraphrase_hits_and_off_topic_question_misses() -> None:
+    llm = ScriptedLLM(
+        [
+            "I'm Enrique's digital twin.",
+            "Our investors are not public.",
+            "I was built by Enrique.",
+        ]
+    )
+    messages = new_session()
+    ask(llm, messages, "Who are you?")
+
+    # A different wording of the same question is served from the cache
+    assert (
+        ask(llm, messages, "So who exactly are you?") == "I'm Enrique's digital twin."
+    )
+    assert (
+        ask(llm, new_session(), "tell me who you are") == "I'm Enrique's digital twin."
+    )
+    assert len(llm.calls) == 1
+
+    # A close wording that asks for something else goes to the LLM
+    assert (
+        ask(llm, messages, "Who are your investors?") == "Our investors are not public."
+    )
+    # ...and so does another meta question, which has a reply of its own
+    assert ask(llm, messages, "Who made you?") == "I was built by Enrique."
+    assert llm.calls == ["Who are you?", "Who are your investors?", "Who made you?"]
+
+
+def test_questions_outside_the_allowlist_always_call_the_llm() -> None:
+    llm = ScriptedLLM(["Sounds promising.", "Sounds promising."])
+    messages = new_session()
+    for _ in range(2):
+        ask(llm, messages, "What do you think of my idea?")
+    assert len(llm.calls) == 2
+
+
+def test_proposal_turns_are_never_cached() -> None:
+    llm = ScriptedLLM([PROPOSAL, PROPOSAL, "I draft pitches.", "I draft pitches."])
+    messages = new_session()
+    # A reply that proposes a crew run is not stored
+    ask(llm, messages, "help")
+    ask(llm, messages, "help")
+    assert len(llm.calls) == 2
+
+    # An answer to a proposal is not stored, so asking again still misses
+    ask(llm, messages, "What can you do?")
+    ask(llm, messages, "What can you do?")
+    assert len(llm.calls) == 4
@@ -0,0 +1,128 @@
+import itertools
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from twin_crew import session_store
+from twin_crew.session_store import SessionNotFoundError, SessionStore
+from twin_crew_testing.fakes import mock_chat_inputs
+
+TOOL_SCHEMA = {"type": "function", "function": {"name": "Pitch_Crew"}}
+GREETING = "Hi, I'm Enrique. What are you building?"
+
+
+class Clock:
+    """Stands in for the `time` module so updated_at is strictly increasing."""
+
+    def __init__(self) -> None:
+        self._ticks = itertools.count(1_000_000)
+
+    def time(self) -> float:
+        return float(next(self._ticks))
+
+
+@pytest.fixture
+def db_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(session_store, "time", Clock())
+    return tmp_path / "sessions.db"
+
+
+@pytest.fixture
+def store(db_path: Path) -> Iterator[SessionStore]:
+    store = SessionStore(db_path)
+    yield store
+    store.close()
+
+
+def create_session(store: SessionStore) -> str:
+    session_id: str = store.create_session(
+        mock_chat_inputs(), TOOL_SCHEMA, "You are Enrique.", GREETING, "Enrique"
+    )
+    return session_id
+
+
+def transcript(turns: int) -> list[dict[str, str]]:
+    messages = [
+        {"role": "system", "content": "You are Enrique."},
+        {"role": "assistant", "content": GREETING},
+    ]
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"Question {turn}"})
+        messages.append({"role": "assistant", "content": f"Answer {turn}"})
+    return messages
+
+
+def test_appended_turns_are_resumed_after_reopening(db_path: Path) -> None:
+    store = SessionStore(db_path)
+    session_id = create_session(store)
+    messages = transcript(turns=1)
+    assert store.sync(session_id, messages) == 4
+    # Only the new turn is written on the next sync
+    messages = transcript(turns=2)
+    assert store.sync(session_id, messages) == 2
+    assert store.sync(session_id, messages) == 0
+    store.close()
+
+    reopened = SessionStore(db_path)
+    resumed = reopened.load(session_id)
+    assert resumed.messages == messages
+    assert resumed.chat_inputs == mock_chat_inputs()
+    assert resumed.tool_schema == TOOL_SCHEMA
+    assert resumed.introductory_message == GREETING
+    assert resumed.speaker_label == "Enrique"
+
+    # The resumed session keeps appending after the stored turns
+    messages.append({"role": "user", "content": "One more question"})
+    assert reopened.sync(session_id, messages) == 1
+    assert reopened.load(session_id).messages == messages
+    reopened.close()
+
+
+def test_unknown_session_id_is_not_found(store: SessionStore) -> None:
+    with pytest.raises(SessionNotFoundError):
+        store.load("missing")
+    with pytest.raises(SessionNotFoundError):
+        store.sync("missing", transcript(turns=1))
+
+
+def test_latest_session_is_listed_first(store: SessionStore) -> None:
+    older = create_session(store)
+    newer = create_session(store)
+    store.sync(newer, transcript(turns=1))
+    # A new turn in the older session makes it the most recently active
+    store.sync(older, transcript(turns=2))
+
+    sessions = store.list_sessions()
+    assert [session["session_id"] for session in sessions] == [older, newer]
+    assert sessions[0]["message_count"] == 6
+    assert sessions[0]["crew_name"] == mock_chat_inputs().crew_name
+    assert store.list_sessions(limit=1)[0]["session_id"] == older
+
+
+def test_two_stores_share_one_database_file(db_path: Path) -> None:
+    writer = SessionStore(db_path)
+    reader = SessionStore(db_path)
+    journal_mode = reader._connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+
+    session_id = create_session(writer)
+    writer.sync(session_id, transcript(turns=1))
+    # The second connection sees the committed turn without reopening
+    assert reader.load(session_id).messages == transcript(turns=1)
+
+    # Concurrent writers to different sessions each keep their own transcript
+    other_id = create_session(reader)
+    threads = [
+        threading.Thread(target=writer.sync, args=(session_id, transcript(turns=3))),
+        threading.Thread(target=reader.sync, args=(other_id, transcript(turns=2))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert reader.load(session_id).messages == transcript(turns=3)
+    assert writer.load(other_id).messages == transcript(turns=2)
+    writer.close()
+    reader.close()
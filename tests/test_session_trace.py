@@ -0,0 +1,55 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+import openai
+import pytest
+
+from twin_crew.resilience import is_retryable
+from twin_crew.session_trace import SessionRecorder, SessionReplayer
+
+
+def provider_response(status: int) -> Any:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return httpx.Response(status, request=request)
+
+
+def rate_limit_error() -> Exception:
+    return openai.RateLimitError(
+        "Rate limit reached", response=provider_response(429), body=None
+    )
+
+
+def bad_request_error() -> Exception:
+    return openai.BadRequestError(
+        "Invalid file", response=provider_response(400), body=None
+    )
+
+
+def raise_error(error: Exception) -> str:
+    raise error
+
+
+@pytest.mark.parametrize(
+    "make_error", [rate_limit_error, bad_request_error, lambda: TimeoutError("slow")]
+)
+def test_replayed_errors_keep_their_type_and_retry_class(
+    tmp_path: Path, make_error: Callable[[], Exception]
+) -> None:
+    error = make_error()
+    cassette = tmp_path / "session.jsonl"
+    recorder = SessionRecorder(cassette)
+    with pytest.raises(type(error)):
+        recorder.intercept("stt", {"model": "whisper-1"}, lambda: raise_error(error))
+    recorder.close()
+
+    replayer = SessionReplayer(cassette, latency_scale=0.0)
+    with pytest.raises(type(error)) as replayed:
+        replayer.intercept("stt", {"model": "whisper-1"}, lambda: "unused")
+
+    assert str(replayed.value) == str(error)
+    assert is_retryable(replayed.value) is is_retryable(error)
+    assert getattr(replayed.value, "status_code", None) == getattr(
+        error, "status_code", None
+    )
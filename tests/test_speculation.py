@@ -0,0 +1,130 @@
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from crewai import Agent, Crew, Process, Task
+from crewai.llm import LLM
+
+from twin_crew import speculation
+from twin_crew.custom_chat import create_tool_function, generate_crew_tool_schema
+from twin_crew.speculation import CrewSpeculator
+from twin_crew_testing.fakes import MockChatLLM, mock_chat_inputs
+
+# What MockChatLLM passes to the crew tool when the user confirms
+PREDICTED_IDEA = "An AI agent marketplace for small businesses."
+PROPOSAL = "Got it. Shall I run the crew to draft your pitch?"
+
+
+class CrewLLM:
+    """Stands in for `LLM.call` of every crew agent and records the prompts."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.lock = threading.Lock()
+        # When set, the first outline call waits for `release`
+        self.hold_first_outline = False
+        self.release = threading.Event()
+
+    def call(self, llm: LLM, messages: Any, *_: Any, **__: Any) -> str:
+        prompt = "\n".join(message["content"] for message in messages)
+        with self.lock:
+            self.prompts.append(prompt)
+            is_outline = "Outline the pitch" in prompt
+            hold = is_outline and self.hold_first_outline
+            self.hold_first_outline = self.hold_first_outline and not is_outline
+        if hold:
+            self.release.wait(5.0)
+        answer = "outline ready" if is_outline else "pitch ready"
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def outline_prompts(self) -> list[str]:
+        with self.lock:
+            return [p for p in self.prompts if "Outline the pitch" in p]
+
+
+@pytest.fixture
+def crew_llm(monkeypatch: pytest.MonkeyPatch) -> Iterator[CrewLLM]:
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    stub = CrewLLM()
+    monkeypatch.setattr(
+        LLM, "call", lambda self, messages, *args, **kwargs: stub.call(self, messages)
+    )
+    yield stub
+    stub.release.set()
+
+
+def make_crew() -> Crew:
+    llm = LLM(model="gpt-4o-mini")
+    strategist = Agent(role="Strategist", goal="Plan", backstory="Plans.", llm=llm)
+    writer = Agent(role="Writer", goal="Write", backstory="Writes.", llm=llm)
+    return Crew(
+        agents=[strategist, writer],
+        tasks=[
+            Task(
+                description="Outline the pitch for {startup_idea}.",
+                expected_output="An outline.",
+                agent=strategist,
+            ),
+            Task(
+                description="Write the pitch for {startup_idea}.",
+                expected_output="A pitch.",
+                agent=writer,
+            ),
+        ],
+        process=Process.sequential,
+    )
+
+
+def propose(crew: Crew) -> tuple[CrewSpeculator, list[dict[str, str]]]:
+    messages = [
+        {"role": "system", "content": "You are Enrique's twin."},
+        {"role": "user", "content": f"My idea: {PREDICTED_IDEA}"},
+        {"role": "assistant", "content": PROPOSAL},
+    ]
+    schema = generate_crew_tool_schema(mock_chat_inputs())
+    speculator = CrewSpeculator(crew, MockChatLLM(latency_seconds=0.0), schema)
+    speculator.observe(messages)
+    return speculator, messages
+
+
+def test_confirmed_call_with_the_same_inputs_reuses_the_first_task(
+    crew_llm: CrewLLM,
+) -> None:
+    crew = make_crew()
+    speculator, messages = propose(crew)
+    tool = create_tool_function(crew, messages, speculator)
+
+    # The self-authored background is reworded; only the idea must match
+    result = tool(startup_idea=PREDICTED_IDEA, enrique_background="Reworded.")
+
+    assert result == "pitch ready"
+    outlines = crew_llm.outline_prompts()
+    assert len(outlines) == 1
+    assert PREDICTED_IDEA in outlines[0]
+    # The writer saw the speculative outline as context
+    assert any(
+        "outline ready" in p and "Write the pitch" in p for p in crew_llm.prompts
+    )
+
+
+def test_changed_inputs_discard_the_speculation(crew_llm: CrewLLM) -> None:
+    crew = make_crew()
+    speculator, _ = propose(crew)
+    assert speculator.claim({"startup_idea": "A drone delivery service."}) is None
+
+
+def test_unfinished_first_task_falls_back_to_a_normal_kickoff(
+    crew_llm: CrewLLM, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(speculation, "FIRST_TASK_WAIT_SECONDS", 0.2)
+    crew_llm.hold_first_outline = True
+    crew = make_crew()
+    speculator, messages = propose(crew)
+    tool = create_tool_function(crew, messages, speculator)
+
+    assert tool(startup_idea=PREDICTED_IDEA, enrique_background="Reworded.") == (
+        "pitch ready"
+    )
+    # The stuck speculative outline plus the one run by the full kickoff
+    assert len(crew_llm.outline_prompts()) == 2
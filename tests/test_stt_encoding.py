@@ -0,0 +1,108 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from twin_crew import stt_encoding
+from twin_crew.stt_encoding import (
+    STT_FORMAT_ENV_VAR,
+    default_stt_format,
+    encode_wav_for_stt,
+    prepare_for_stt,
+    read_wav_float32,
+)
+
+CAPTURE_RATE_HZ = 48000
+TONE_HZ = 440.0
+
+
+def tone(seconds: float = 1.0, rate_hz: int = CAPTURE_RATE_HZ) -> np.ndarray:
+    times = np.arange(int(seconds * rate_hz)) / rate_hz
+    return (0.5 * np.sin(2 * np.pi * TONE_HZ * times)).astype(np.float32)
+
+
+def dominant_frequency(mono: np.ndarray, rate_hz: int) -> float:
+    spectrum = np.abs(np.fft.rfft(mono))
+    return float(np.fft.rfftfreq(len(mono), 1 / rate_hz)[np.argmax(spectrum)])
+
+
+@pytest.fixture
+def no_soundfile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(STT_FORMAT_ENV_VAR, raising=False)
+    monkeypatch.setattr(stt_encoding, "soundfile_available", lambda: False)
+    monkeypatch.setattr(stt_encoding, "_wav_fallback_warned", False)
+
+
+def test_stereo_is_downmixed_to_mono() -> None:
+    left = tone()
+    stereo = np.stack([left, -left], axis=1)
+    rate_hz, mono = prepare_for_stt(stereo, CAPTURE_RATE_HZ, target_rate_hz=None)
+    assert rate_hz == CAPTURE_RATE_HZ
+    assert mono.shape == (len(left), 1)
+    assert np.allclose(mono, 0.0)
+
+
+def test_resampling_keeps_the_signal() -> None:
+    rate_hz, audio = prepare_for_stt(tone()[:, np.newaxis], CAPTURE_RATE_HZ, 16000)
+    assert rate_hz == 16000
+    assert audio.shape == (16000, 1)
+    assert audio.dtype == np.float32
+    assert dominant_frequency(audio[:, 0], rate_hz) == pytest.approx(TONE_HZ, abs=2)
+
+
+def test_int16_wav_is_read_as_float32(tmp_path: Path) -> None:
+    path = tmp_path / "turn.wav"
+    wavfile.write(path, 16000, np.array([0, 16384, -32767], dtype=np.int16))
+    rate_hz, audio = read_wav_float32(path)
+    assert rate_hz == 16000
+    assert audio.shape == (3, 1)
+    assert np.allclose(audio[:, 0], [0.0, 0.5, -1.0], atol=1e-4)
+
+
+@pytest.mark.parametrize("configured", ["wav", "FLAC", " opus "])
+def test_configured_format_is_used(
+    configured: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(STT_FORMAT_ENV_VAR, configured)
+    assert default_stt_format() == configured.strip().lower()
+
+
+def test_unknown_format_is_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(STT_FORMAT_ENV_VAR, "mp3")
+    with pytest.raises(ValueError, match=STT_FORMAT_ENV_VAR):
+        default_stt_format()
+
+
+def test_flac_is_the_default_with_soundfile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(STT_FORMAT_ENV_VAR, raising=False)
+    monkeypatch.setattr(stt_encoding, "soundfile_available", lambda: True)
+    assert default_stt_format() == "flac"
+
+
+def test_wav_fallback_warns_once(
+    no_soundfile: None, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert default_stt_format() == "wav"
+    assert "soundfile" in capsys.readouterr().out
+    assert default_stt_format() == "wav"
+    assert capsys.readouterr().out == ""
+
+
+def test_wav_fallback_uploads_mono_at_the_native_rate(
+    tmp_path: Path, no_soundfile: None
+) -> None:
+    path = tmp_path / "turn.wav"
+    stereo = np.stack([tone(), tone()], axis=1)
+    wavfile.write(path, CAPTURE_RATE_HZ, np.int16(stereo * 32767))
+
+    name, payload = encode_wav_for_stt(path, "whisper-1")
+
+    assert name == "speech.wav"
+    rate_hz, decoded = wavfile.read(io.BytesIO(payload))
+    assert rate_hz == 16000
+    assert decoded.dtype == np.int16
+    assert decoded.shape == (16000,)  # mono
+    # A third of the capture's samples and half its channels
+    assert len(payload) < path.stat().st_size / 5
@@ -0,0 +1,160 @@
+import os
+import shutil
+import subprocess
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from twin_crew import audio_utils, tts_cache
+from twin_crew.audio_utils import audio_backends, speak_text
+from twin_crew.tts_cache import PhraseCache, get_phrase_cache
+from twin_crew_testing.fakes import FakeOpenAI
+
+PHRASE = "Hi, I'm Enrique. What are you building?"
+
+
+class Speaker:
+    """Runs speak_text against a fake speech API and records what was played."""
+
+    def __init__(self) -> None:
+        self.speech_api = FakeOpenAI([])
+        self.played: list[Path] = []
+
+    def say(self, text: str, playback_speed: float | None = 1.2) -> Path:
+        with audio_backends(client_factory=self.speech_api, player=self.played.append):
+            speak_text(text, playback_speed=playback_speed)
+        return self.played[-1]
+
+
+@pytest.fixture
+def speaker(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Speaker]:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(tts_cache.CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    monkeypatch.setenv(tts_cache.TTS_CACHE_ENV_VAR, "1")
+    monkeypatch.setattr(tts_cache, "_phrase_cache", None)
+    set_ffmpeg(monkeypatch, available=False)
+    yield Speaker()
+
+
+def set_ffmpeg(monkeypatch: pytest.MonkeyPatch, available: bool) -> None:
+    def fake_ffmpeg(args: list[str], **_: Any) -> None:
+        # Stands in for the atempo filter: input file to output file
+        shutil.copyfile(args[3], args[-1])
+
+    monkeypatch.setattr(
+        audio_utils.shutil, "which", lambda _: "/usr/bin/ffmpeg" if available else None
+    )
+    monkeypatch.setattr(audio_utils.subprocess, "run", fake_ffmpeg)
+
+
+def test_cache_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tts_cache, "_phrase_cache", None)
+    monkeypatch.delenv(tts_cache.TTS_CACHE_ENV_VAR, raising=False)
+    assert get_phrase_cache() is None
+
+
+def test_phrase_is_cached_on_its_second_sighting(speaker: Speaker) -> None:
+    cache = get_phrase_cache()
+    assert cache is not None
+
+    speaker.say(PHRASE)
+    assert not list(cache.directory.glob("*.mp3"))
+    speaker.say(PHRASE)
+    assert speaker.speech_api.speeches == 2
+    assert len(list(cache.directory.glob("*.mp3"))) == 1
+
+    hit = speaker.say(PHRASE)
+    assert speaker.speech_api.speeches == 2
+    assert hit.parent == cache.directory
+
+
+def test_different_phrase_misses(speaker: Speaker) -> None:
+    for _ in range(2):
+        speaker.say(PHRASE)
+    speaker.say("Shall I run the crew now?")
+    assert speaker.speech_api.speeches == 3
+
+
+def test_unsped_audio_is_not_served_for_a_sped_up_request(
+    speaker: Speaker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Without ffmpeg the audio plays at normal speed and is cached as such
+    for _ in range(3):
+        speaker.say(PHRASE)
+    assert speaker.speech_api.speeches == 2
+
+    set_ffmpeg(monkeypatch, available=True)
+    played = speaker.say(PHRASE)
+    assert speaker.speech_api.speeches == 3
+    assert "_x1.2" in played.name
+
+    speaker.say(PHRASE)
+    hit = speaker.say(PHRASE)
+    assert speaker.speech_api.speeches == 4
+    assert hit.parent == get_phrase_cache().directory  # type: ignore[union-attr]
+    # Working files, sped-up copies included, never outlive playback
+    assert not list(Path.cwd().glob("tts_*.mp3"))
+
+
+def test_failed_speed_adjustment_leaves_no_partial_output(
+    speaker: Speaker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    set_ffmpeg(monkeypatch, available=True)
+
+    def failing_ffmpeg(args: list[str], **_: Any) -> None:
+        Path(args[-1]).write_bytes(b"partial")
+        raise subprocess.CalledProcessError(1, args)
+
+    monkeypatch.setattr(audio_utils.subprocess, "run", failing_ffmpeg)
+    played = speaker.say(PHRASE)
+    assert "_x" not in played.name
+    assert not list(Path.cwd().glob("tts_*.mp3"))
+
+
+def test_expired_entries_are_dropped(tmp_path: Path) -> None:
+    source = tmp_path / "phrase.mp3"
+    source.write_bytes(b"audio")
+    cache = PhraseCache(tmp_path / "cache", max_age_seconds=60)
+    cached = cache.put("key", source)
+    assert cache.get("key") == cached
+
+    an_hour_ago = time.time() - 3600
+    os.utime(cached, (an_hour_ago, an_hour_ago))
+    assert cache.get("key") is None
+    assert not cached.exists()
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path: Path) -> None:
+    source = tmp_path / "phrase.mp3"
+    source.write_bytes(b"1234")
+    cache = PhraseCache(tmp_path / "cache", max_bytes=10)
+    first = cache.put("first", source)
+    second = cache.put("second", source)
+    assert cache.get("first") == first  # now the most recently used
+
+    third = cache.put("third", source)
+    assert cache.get("second") is None
+    assert not second.exists()
+    assert first.exists() and third.exists()
+
+
+def test_sightings_survive_a_restart(tmp_path: Path) -> None:
+    # The greeting is spoken once per launch, so its repeat is in a new process
+    assert not PhraseCache(tmp_path / "cache").admit("greeting")
+    restarted = PhraseCache(tmp_path / "cache")
+    assert restarted.admit("greeting")
+    assert not restarted.admit("one-off reply")
+
+
+def test_sightings_index_is_compacted(tmp_path: Path) -> None:
+    cache = PhraseCache(tmp_path / "cache", max_sightings=2)
+    for key in ["a", "b", "c", "d", "e"]:
+        cache.admit(key)
+    index = (tmp_path / "cache" / tts_cache.SIGHTINGS_FILE).read_text().split()
+    assert len(index) <= 4
+    restarted = PhraseCache(tmp_path / "cache", max_sightings=2)
+    assert restarted.admit("e")
+    assert not restarted.admit("a")